@@ -0,0 +1,61 @@
+"""XOR 比较基准测试。
+
+生成一个由倒角环阵列组成的稠密版图，以不同倒角精度各写出一份，
+对比不同线程数和分块大小下 compare_layouts 的耗时。
+
+用法:
+    python benchmarks/bench_compare.py [阵列边长] [环数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gds_utils import GDS, Frame, Region
+from gds_utils.compare import compare_layouts
+from gds_utils.generators import generate_vertices
+from gds_utils.utils import setup_logging
+
+# (线程数, 分块边长 um)
+VARIANTS = [(1, 100000.0), (1, 200.0), (os.cpu_count() or 1, 200.0), (os.cpu_count() or 1, 50.0)]
+
+
+def write_array(path, size, ring_num, precision):
+    vertices = [tuple(p) for p in generate_vertices(
+        {"shape_type": "star", "outer_radius": 50, "inner_radius": 25, "points": 8}).tolist()]
+    fillet = {"type": "adaptive", "convex_radius": 5, "concave_radius": 5,
+              "precision": precision, "interactive": False}
+    region = Region.create_rings(Frame(vertices), ring_width=2, ring_space=1,
+                                 ring_num=ring_num, fillet_config=fillet)
+    gds = GDS(cell_name="TOP")
+    cell = gds.get_cell("TOP")
+    dbu = gds.kdb_layout.dbu
+    for i in range(size):
+        for j in range(size):
+            moved = region.get_klayout_region().moved(int(i * 150 / dbu), int(j * 150 / dbu))
+            cell.kdb_cell.shapes(gds.kdb_layout.layer(1, 0)).insert(moved)
+    return gds.save(path, save_mapping=False)
+
+
+def main():
+    setup_logging(False)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    ring_num = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    with tempfile.TemporaryDirectory() as tmp:
+        a = write_array(os.path.join(tmp, "a.gds"), size, ring_num, 0.01)
+        b = write_array(os.path.join(tmp, "b.gds"), size, ring_num, 0.005)
+        print(f"{size}x{size} 阵列, {ring_num} 环, 文件 {os.path.getsize(a) / 1e6:.1f} MB / {os.path.getsize(b) / 1e6:.1f} MB")
+        print(f"{'线程':>4} {'分块(um)':>10} {'耗时(s)':>8} {'差异面积(um^2)':>16}")
+        for threads, tile_size in VARIANTS:
+            start = time.perf_counter()
+            result = compare_layouts(a, b, threads=threads, tile_size=tile_size, tolerance=0.01)
+            elapsed = time.perf_counter() - start
+            area = sum(layer['area'] for layer in result['layers'])
+            print(f"{threads:>4} {tile_size:>10.0f} {elapsed:>8.2f} {area:>16.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""输出格式基准测试。
+
+用倒角后的多环阵列生成稠密版图，对比 GDS、gzip GDS 与不同 OASIS 选项的
+文件大小、写出时间和读回时间。
+
+用法:
+    python benchmarks/bench_output_formats.py [环数] [倒角精度]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import klayout.db as db
+
+from gds_utils import GDS, Frame, Region
+from gds_utils.generators import generate_vertices
+from gds_utils.utils import setup_logging
+
+# (名称, 输出文件名, gds.output 配置)
+VARIANTS = [
+    ("GDS", "out.gds", {}),
+    ("GDS + gzip", "out.gds", {"gzip": True}),
+    ("OASIS 无 CBLOCK", "out.oas", {"cblocks": False, "compression_level": 0}),
+    ("OASIS CBLOCK", "out.oas", {"compression_level": 0}),
+    ("OASIS CBLOCK + 重复检测", "out.oas", {"compression_level": 2}),
+    ("OASIS CBLOCK + 重复检测(10)", "out.oas", {"compression_level": 10}),
+    ("OASIS 非严格模式", "out.oas", {"strict": False}),
+]
+
+
+def build_layout(ring_num, precision):
+    vertices = [tuple(p) for p in generate_vertices(
+        {"shape_type": "star", "outer_radius": 50, "inner_radius": 25, "points": 8}).tolist()]
+    fillet = {"type": "adaptive", "convex_radius": 5, "concave_radius": 5,
+              "precision": precision, "interactive": False}
+    region = Region.create_rings(Frame(vertices), ring_width=2, ring_space=1,
+                                 ring_num=ring_num, fillet_config=fillet)
+    gds = GDS(cell_name="TOP")
+    gds.get_cell("TOP").add_region(region, (1, 0))
+    return gds
+
+
+def bench(gds, tmp, filename, options, repeat=3):
+    output_file = os.path.join(tmp, filename)
+    write = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output_file = gds.save(output_file, save_mapping=False, options=options)
+        write = min(write, time.perf_counter() - start)
+    start = time.perf_counter()
+    db.Layout().read(output_file)
+    read = time.perf_counter() - start
+    return os.path.getsize(output_file), write, read
+
+
+def main():
+    setup_logging(False)
+    ring_num = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    precision = float(sys.argv[2]) if len(sys.argv) > 2 else 0.005
+    gds = build_layout(ring_num, precision)
+    points = sum(s.polygon.num_points() for s in gds.get_cell("TOP").kdb_cell.each_shape(gds.kdb_layout.layer(1, 0)))
+    print(f"环数 {ring_num}, 倒角精度 {precision}, 共 {points} 个点")
+    print(f"{'格式':<28} {'大小(KB)':>10} {'相对GDS':>8} {'写出(ms)':>10} {'读回(ms)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = None
+        for name, filename, options in VARIANTS:
+            size, write, read = bench(gds, tmp, filename, options)
+            baseline = baseline or size
+            print(f"{name:<28} {size / 1024:>10.1f} {size / baseline:>8.2f} {write * 1e3:>10.1f} {read * 1e3:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
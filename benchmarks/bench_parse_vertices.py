@@ -0,0 +1,67 @@
+"""顶点字符串解析基准测试。
+
+对比旧的逐对 Python 解析实现与 gds_utils.vertices 中的批量解析实现。
+
+用法:
+    python benchmarks/bench_parse_vertices.py [顶点数 ...]
+"""
+
+import math
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gds_utils.vertices import parse_vertex_string, ensure_counterclockwise
+
+
+def legacy_parse_vertices(vertices_str):
+    """基线实现：与重构前 main.parse_vertices 相同的逐对解析"""
+    vertices = []
+    for pair in vertices_str.split(':'):
+        x, y = map(float, pair.split(','))
+        vertices.append((float(x), float(y)))
+
+    def is_counterclockwise(pts):
+        area = 0
+        for i in range(len(pts)):
+            j = (i + 1) % len(pts)
+            area += pts[i][0] * pts[j][1]
+            area -= pts[j][0] * pts[i][1]
+        return area > 0
+
+    if not is_counterclockwise(vertices):
+        vertices.reverse()
+    return vertices
+
+
+def bulk_parse_vertices(vertices_str):
+    return ensure_counterclockwise(parse_vertex_string(vertices_str))
+
+
+def make_vertex_string(n):
+    # 顺时针圆，确保两种实现都会走方向修正分支
+    return ':'.join(
+        f"{100 * math.cos(-2 * math.pi * i / n):.4f},{100 * math.sin(-2 * math.pi * i / n):.4f}"
+        for i in range(n)
+    )
+
+
+def bench(n, repeat=5):
+    text = make_vertex_string(n)
+    legacy = min(timeit.repeat(lambda: legacy_parse_vertices(text), number=1, repeat=repeat))
+    bulk = min(timeit.repeat(lambda: bulk_parse_vertices(text), number=1, repeat=repeat))
+    return legacy, bulk
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    print(f"{'顶点数':>10} {'旧实现(ms)':>12} {'批量解析(ms)':>14} {'加速比':>8}")
+    for n in sizes:
+        legacy, bulk = bench(n, repeat=3 if n >= 1_000_000 else 5)
+        print(f"{n:>10} {legacy * 1e3:>12.2f} {bulk * 1e3:>14.2f} {legacy / bulk:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
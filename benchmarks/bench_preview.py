@@ -0,0 +1,56 @@
+"""预览渲染基准测试。
+
+生成一个由稠密圆弧（每个圆 1000 个顶点）和大量小方块组成的版图，
+对比不同图像尺寸和格式下 render_preview 的耗时。顶点总数约为 阵列边长^2 * 1000。
+
+用法:
+    python benchmarks/bench_preview.py [阵列边长] [小方块边长]
+"""
+
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import klayout.db as db
+from gds_utils.preview import render_preview
+from gds_utils.utils import setup_logging
+
+# (宽, 高, 格式)
+VARIANTS = [(400, 400, 'png'), (800, 800, 'png'), (1600, 1600, 'png'), (800, 800, 'svg')]
+
+
+def build_layout(size, squares):
+    layout = db.Layout()
+    top = layout.create_cell("TOP")
+    arcs, dots = layout.layer(1, 0), layout.layer(2, 0)
+    circle = db.Polygon([db.Point(int(20000 * math.cos(2 * math.pi * i / 1000)),
+                                  int(20000 * math.sin(2 * math.pi * i / 1000))) for i in range(1000)])
+    for i in range(size):
+        for j in range(size):
+            top.shapes(arcs).insert(circle.moved(i * 50000, j * 50000))
+    pitch = size * 50000 // squares
+    for i in range(squares):
+        for j in range(squares):
+            top.shapes(dots).insert(db.Box(i * pitch, j * pitch, i * pitch + 500, j * pitch + 500))
+    return layout
+
+
+def main():
+    setup_logging(False)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    squares = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    layout = build_layout(size, squares)
+    print(f"{size}x{size} 个圆（{size * size * 1000} 个顶点）+ {squares * squares} 个小方块")
+    print(f"{'尺寸':>10} {'格式':>4} {'耗时(s)':>8} {'大小(KB)':>9}")
+    for width, height, image_format in VARIANTS:
+        start = time.perf_counter()
+        data = render_preview(layout, width=width, height=height, image_format=image_format)
+        elapsed = time.perf_counter() - start
+        print(f"{width:>5}x{height:<4} {image_format:>4} {elapsed:>8.2f} {len(data) / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,22 @@
 import klayout.db as db
 from .layer import LayerManager
 from .utils import logger
+from .profiler import profiled
 
 class Cell:
     """封装 KLayout Cell 对象的类"""
     
-    def __init__(self, kdb_cell):
+    def __init__(self, kdb_cell, layer_manager=None):
         """初始化 Cell 对象
         
         参数:
             kdb_cell: KLayout Cell 对象
+            layer_manager: 共享的图层注册表（由 GDS 提供），为 None 时绑定所在 Layout 新建一个
         """
         self.kdb_cell = kdb_cell
-        self.layer_manager = LayerManager()
+        if layer_manager is None:
+            layer_manager = LayerManager(kdb_cell.layout())
+        self.layer_manager = layer_manager
         logger.debug(f"创建 Cell: {kdb_cell.name}")
 
     def get_layer_index(self, layer_info):
@@ -36,24 +40,10 @@ class Cell:
         返回:
             int: 图层索引
         """
-        # 调用 LayerManager 的方法
-        layer_index = self.layer_manager.create_layer(layer_info, layer_name)
-        
-        # 确保 KLayout 布局中存在该图层信息
-        layer_num, datatype = layer_info
-        layer_info_obj = db.LayerInfo(layer_num, datatype)
-        
-        # 获取或创建 KLayout 布局中的图层
-        layout = self.kdb_cell.layout()
-        if layout:
-            kl_layer_index = layout.layer(layer_info_obj)
-            logger.debug(f"KLayout 图层索引: {kl_layer_index} for {layer_info}")
-            
-            # 更新 LayerManager 中的索引以匹配 KLayout 的索引
-            self.layer_manager.layer_indices[layer_info] = kl_layer_index
-        
-        return self.layer_manager.get_layer_index(layer_info)
+        # LayerManager 绑定了 Layout，索引与 KLayout 一致
+        return self.layer_manager.create_layer(layer_info, layer_name)
 
+    @profiled("add_region")
     def add_region(self, region, layer_info):
         """向单元格添加区域
         
@@ -62,29 +52,41 @@ class Cell:
             layer_info: 图层信息元组 (layer_num, datatype)
         """
         try:
-            # 确保存在图层
-            layer_num, datatype = layer_info
-            layout = self.kdb_cell.layout()
-            if not layout:
-                logger.error(f"无法获取 Cell {self.kdb_cell.name} 的布局")
-                return
-            
-            # 创建或获取 KLayout 图层
-            layer_info_obj = db.LayerInfo(layer_num, datatype)
-            kl_layer_index = layout.layer(layer_info_obj)
+            # 图层索引由共享注册表缓存，只在首次使用时调用 layout.layer()
+            kl_layer_index = self.layer_manager.ensure_layer(tuple(layer_info))
             
             # 添加区域到图层
             self.kdb_cell.shapes(kl_layer_index).insert(region.get_klayout_region())
-            
-            # 同时更新 LayerManager 中的索引
-            if layer_info not in self.layer_manager.layer_indices:
-                self.layer_manager.layer_indices[layer_info] = kl_layer_index
-                logger.debug(f"在 LayerManager 中添加图层索引映射: {layer_info} -> {kl_layer_index}")
                 
             logger.debug(f"向 Cell {self.kdb_cell.name} 的图层 {layer_info} 添加区域")
         except Exception as e:
             logger.error(f"添加区域失败: {e}")
 
+    @profiled("add_region")
+    def add_regions(self, regions_by_layer, merge=False):
+        """按图层批量添加区域，每个图层只插入一次
+        
+        参数:
+            regions_by_layer: {layer_info: [Region 或 db.Region, ...]}
+            merge: 插入前是否合并同一图层的区域（重叠部分合并为一个多边形）
+            
+        返回:
+            dict: {layer_info: 插入的多边形数量}
+        """
+        counts = {}
+        for layer_info, regions in regions_by_layer.items():
+            layer_info = tuple(layer_info)
+            combined = db.Region()
+            for region in regions:
+                combined += region.get_klayout_region() if hasattr(region, 'get_klayout_region') else region
+            if merge:
+                combined.merge()
+            kl_layer_index = self.layer_manager.ensure_layer(layer_info)
+            self.kdb_cell.shapes(kl_layer_index).insert(combined)
+            counts[layer_info] = counts.get(layer_info, 0) + combined.count()
+        logger.debug(f"向 Cell {self.kdb_cell.name} 批量添加 {sum(counts.values())} 个多边形到 {len(counts)} 个图层")
+        return counts
+
     def get_layer_manager(self):
         """获取图层管理器
         
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import sys
+import klayout.db as db
+from .gds import read_layout
+from .layout_cache import file_digest
+from .utils import logger, setup_logging
+
+# 分块大小（微米）与每层最多报告的差异区域数
+DEFAULT_TILE_SIZE = 1000.0
+DEFAULT_MAX_REGIONS = 20
+LAYOUT_EXTENSIONS = ('.gds', '.gds2', '.oas', '.oasis', '.gds.gz', '.oas.gz')
+
+
+def _top_cell(layout, cell_name, path):
+    if cell_name:
+        cell = layout.cell(cell_name)
+        if cell is None:
+            raise ValueError(f"{path} 中不存在单元格: {cell_name}")
+        return cell
+    tops = layout.top_cells()
+    if len(tops) != 1:
+        raise ValueError(f"{path} 有 {len(tops)} 个顶层单元格，请用 cell 指定要比较的单元格")
+    return tops[0]
+
+
+def _layer_infos(layout):
+    return {(layout.get_info(index).layer, layout.get_info(index).datatype): index
+            for index in layout.layer_indexes()}
+
+
+def _shape_input(layout, cell, layers, key):
+    """图层在该版图中不存在时用空 Region 代替"""
+    index = layers.get(key)
+    if index is None:
+        return db.Region()
+    return layout.begin_shapes(cell, index)
+
+
+def xor_layer(input_a, input_b, dbu, tolerance=0.0, tile_size=DEFAULT_TILE_SIZE, threads=None):
+    """用 TilingProcessor 多线程分块计算一个图层的 XOR
+
+    参数:
+        input_a, input_b: RecursiveShapeIterator 或 db.Region
+        dbu: 计算使用的数据库单位，不同 dbu 的输入会自动换算
+        tolerance: 容差（微米），宽度小于 2 * tolerance 的差异视为相同
+        tile_size: 分块边长（微米）
+        threads: 线程数，None 时为 CPU 核数
+
+    返回:
+        db.Region: 合并后的差异区域
+    """
+    processor = db.TilingProcessor()
+    processor.dbu = dbu
+    processor.threads = threads or os.cpu_count() or 1
+    processor.tile_size(tile_size, tile_size)
+    processor.input('a', input_a)
+    processor.input('b', input_b)
+    diff = db.Region()
+    processor.output('o', diff)
+
+    size = int(round(tolerance / dbu))
+    if size > 0:
+        # 先收缩再扩张（开运算）去掉细长的差异，分块边界处需要同样宽度的重叠
+        processor.tile_border(2 * tolerance, 2 * tolerance)
+        processor.var('t', size)
+        processor.queue("var x = a ^ b; _output(o, x.sized(-t).sized(t))")
+    else:
+        processor.queue("_output(o, a ^ b)")
+    processor.execute("XOR")
+    diff.merge()
+    return diff
+
+
+def compare_layouts(file_a, file_b, cell=None, tolerance=0.0, tile_size=DEFAULT_TILE_SIZE,
+                    threads=None, max_regions=DEFAULT_MAX_REGIONS):
+    """逐图层 XOR 比较两个版图
+
+    参数:
+        file_a, file_b: 版图文件路径（GDS / OASIS，可 gzip）
+        cell: 比较的单元格名称，None 时使用唯一的顶层单元格（包含其子单元格）
+        tolerance: 容差（微米），宽度小于 2 * tolerance 的差异忽略
+        tile_size: 分块边长（微米）
+        threads: 线程数，None 时为 CPU 核数
+        max_regions: 每个图层最多列出的差异区域数
+
+    返回:
+        dict: {"identical": bool, "layers": [{"layer", "area", "polygons", "bbox", "regions"}]}，
+              面积单位为平方微米，bbox 为 [left, bottom, right, top]（微米），只列出有差异的图层
+
+    异常:
+        ValueError: 找不到要比较的单元格
+    """
+    # 逐字节相同（例如 deterministic 输出）时无需解析和 XOR
+    if file_digest(file_a) == file_digest(file_b):
+        return {'identical': True, 'layers': []}
+
+    layout_a, layout_b = read_layout(file_a), read_layout(file_b)
+    cell_a, cell_b = _top_cell(layout_a, cell, file_a), _top_cell(layout_b, cell, file_b)
+    layers_a, layers_b = _layer_infos(layout_a), _layer_infos(layout_b)
+    dbu = min(layout_a.dbu, layout_b.dbu)
+
+    layers = []
+    for key in sorted(set(layers_a) | set(layers_b)):
+        diff = xor_layer(_shape_input(layout_a, cell_a, layers_a, key),
+                         _shape_input(layout_b, cell_b, layers_b, key),
+                         dbu, tolerance, tile_size, threads)
+        if diff.is_empty():
+            continue
+        boxes = [polygon.bbox() for polygon in diff.each()]
+        bbox = diff.bbox()
+        layers.append({
+            'layer': f"{key[0]}/{key[1]}",
+            'area': diff.area() * dbu * dbu,
+            'polygons': len(boxes),
+            'bbox': _box_um(bbox, dbu),
+            'regions': [_box_um(box, dbu) for box in sorted(boxes, key=lambda b: -b.area())[:max_regions]],
+        })
+        logger.info(f"图层 {key[0]}/{key[1]} 存在差异: {len(boxes)} 处，面积 {diff.area() * dbu * dbu:.6g} um^2")
+    return {'identical': not layers, 'layers': layers}
+
+
+def _box_um(box, dbu):
+    return [box.left * dbu, box.bottom * dbu, box.right * dbu, box.top * dbu]
+
+
+def _is_layout_file(name):
+    return name.lower().endswith(LAYOUT_EXTENSIONS)
+
+
+def compare_paths(path_a, path_b, **kwargs):
+    """比较两个版图文件，或两个目录中同名的全部版图文件
+
+    参数:
+        path_a, path_b: 文件或目录
+        **kwargs: 传给 compare_layouts 的参数
+
+    返回:
+        dict: {相对路径: compare_layouts 结果}；只存在于一侧的文件结果为 {"identical": False, "missing": "a"|"b"}
+    """
+    if not os.path.isdir(path_a):
+        return {os.path.basename(path_a): compare_layouts(path_a, path_b, **kwargs)}
+
+    def collect(root):
+        return {os.path.relpath(os.path.join(d, f), root)
+                for d, _, files in os.walk(root) for f in files if _is_layout_file(f)}
+
+    files_a, files_b = collect(path_a), collect(path_b)
+    results = {}
+    for name in sorted(files_a | files_b):
+        if name not in files_b:
+            results[name] = {'identical': False, 'missing': 'b'}
+        elif name not in files_a:
+            results[name] = {'identical': False, 'missing': 'a'}
+        else:
+            try:
+                results[name] = compare_layouts(os.path.join(path_a, name), os.path.join(path_b, name), **kwargs)
+            except (RuntimeError, ValueError) as e:
+                logger.error(f"比较 {name} 失败: {e}")
+                results[name] = {'identical': False, 'error': str(e)}
+    return results
+
+
+def main(argv=None):
+    """命令行入口: python -m gds_utils.compare a.gds b.gds
+
+    返回:
+        int: 退出码，全部相同为 0，存在差异为 1
+    """
+    parser = argparse.ArgumentParser(description="逐图层 XOR 比较两个版图（或两个目录中的同名版图）")
+    parser.add_argument("a", help="基准版图文件或目录")
+    parser.add_argument("b", help="待比较的版图文件或目录")
+    parser.add_argument("--cell", help="比较的单元格，缺省为唯一的顶层单元格")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="容差（微米），宽度小于 2 倍容差的差异忽略")
+    parser.add_argument("--tile-size", type=float, default=DEFAULT_TILE_SIZE, help="分块边长（微米）")
+    parser.add_argument("--threads", type=int, default=None, help="线程数，缺省为 CPU 核数")
+    parser.add_argument("--max-regions", type=int, default=DEFAULT_MAX_REGIONS, help="每个图层最多列出的差异区域数")
+    args = parser.parse_args(argv)
+
+    setup_logging(False)
+    results = compare_paths(args.a, args.b, cell=args.cell, tolerance=args.tolerance,
+                            tile_size=args.tile_size, threads=args.threads, max_regions=args.max_regions)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    return 0 if all(result['identical'] for result in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import contextvars
+import logging
+import os
+from contextlib import contextmanager
+from .utils import logger
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_current_context = contextvars.ContextVar('gds_build_context', default=None)
+
+
+class _ContextDispatchHandler(logging.Handler):
+    """挂在 gds_utils logger 上的唯一处理器，把记录转发给当前构建上下文的日志文件
+
+    每次构建不再向共享的 logger 增删处理器，也不修改它的级别；
+    记录能否到达这里仍由 logger 自身的级别决定（命令行由 setup_logging 配置，Web 服务在启动时配置）。
+    """
+
+    def emit(self, record):
+        context = _current_context.get()
+        handler = context._handler if context is not None else None
+        if handler is not None and record.levelno >= handler.level:
+            handler.handle(record)
+
+
+_dispatch_handler = _ContextDispatchHandler()
+
+
+class BuildContext:
+    """一次构建的上下文: 相对路径的基准目录和独立的日志文件
+
+    构建过程不再修改进程级的状态（工作目录、根日志配置），同一进程中的多个线程可以同时构建：
+    - 配置中的相对路径（配置文件、input_file、output_file、vertices_file 等）相对于 base_dir 解析；
+    - log_file 只接收本上下文（contextvars，按线程/任务隔离）中产生的 gds_utils 日志。
+    """
+
+    def __init__(self, base_dir=None, log_file=None, log_level=logging.DEBUG):
+        """初始化构建上下文
+
+        参数:
+            base_dir: 相对路径的基准目录，None 时为创建时的当前目录
+            log_file: 本次构建的日志文件（相对路径相对于 base_dir），None 表示不单独记录
+            log_level: 日志文件的级别
+        """
+        self.base_dir = os.path.abspath(base_dir or os.getcwd())
+        self.log_file = self.resolve(log_file)
+        self.log_level = log_level
+        self._handler = None
+
+    def resolve(self, path):
+        """把相对路径解析为相对于 base_dir 的绝对路径，None 原样返回"""
+        if path is None:
+            return None
+        path = os.path.expanduser(str(path))
+        if os.path.isabs(path):
+            return path
+        return os.path.normpath(os.path.join(self.base_dir, path))
+
+    @contextmanager
+    def activate(self):
+        """在当前线程/任务中启用该上下文，退出时恢复"""
+        handler = None
+        if self.log_file:
+            handler = logging.FileHandler(self.log_file, mode='w', encoding='utf-8')
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            handler.setLevel(self.log_level)
+            if _dispatch_handler not in logger.handlers:
+                logger.addHandler(_dispatch_handler)
+        self._handler = handler
+        token = _current_context.set(self)
+        try:
+            yield self
+        finally:
+            _current_context.reset(token)
+            self._handler = None
+            if handler is not None:
+                handler.close()
+
+
+def current_context():
+    """当前生效的构建上下文，未启用时返回以当前目录为基准的临时上下文"""
+    return _current_context.get() or BuildContext()
+
+
+def resolve_path(path):
+    """按当前构建上下文解析相对路径"""
+    return current_context().resolve(path)
@@ -0,0 +1,220 @@
+import math
+import numpy as np
+from .generators import generate_vertices
+from .vertices import parse_vertex_string, load_vertices_file, ensure_counterclockwise
+from .utils import logger, parse_ring_rule
+from .gds import output_format, resolve_output_file
+from .context import resolve_path
+
+# 运行时间模型的经验系数（秒），在开发机上对 Region.create_polygon/create_rings 标定，只用于量级判断
+SECONDS_PER_BOUNDARY_VERTEX = 9e-5   # 每条边界上每个输入顶点的偏移/凹凸判断/倒角准备开销
+SECONDS_PER_OUTPUT_POINT = 6e-6      # 每个输出点的圆弧插值、DPoint 构造和布尔运算开销
+SECONDS_BASE = 0.05                  # 进程内固定开销（建立 Layout、写文件头等）
+
+# GDS 输出大小模型（字节）
+GDS_HEADER_BYTES = 512               # HEADER/BGNLIB/LIBNAME/UNITS/ENDLIB
+GDS_CELL_BYTES = 64                  # BGNSTR/STRNAME/ENDSTR
+GDS_POLYGON_BYTES = 28               # BOUNDARY/LAYER/DATATYPE/XY 头/ENDEL
+GDS_POINT_BYTES = 8                  # 每个点两个 int32
+GDS_MAX_POINTS = 8000                # KLayout 写 GDS 时单个多边形的最大点数，超过会被切分
+# 以下比例由 benchmarks/bench_output_formats.py 对倒角环阵列测得
+OASIS_SIZE_RATIO = 0.15              # OASIS（默认 CBLOCK 压缩）相对 GDS 的典型体积比例
+OASIS_RAW_SIZE_RATIO = 0.35          # 关闭 CBLOCK 时的比例
+GZIP_SIZE_RATIO = 0.55               # gzip 压缩后的比例
+
+
+def fillet_point_counts(vertices, convex_radius, concave_radius, precision):
+    """向量化计算倒角后每个顶点展开的点数
+
+    与 Frame._apply_arc_fillet_internal 的分段公式一致：
+    num_segments = max(1, ceil(radius * (pi - wedge) / precision))，每个圆角输出 num_segments + 1 个点。
+
+    参数:
+        vertices: (N, 2) 逆时针顶点数组
+        convex_radius: 凸角半径，数值或长度为 N 的序列
+        concave_radius: 凹角半径，数值或长度为 N 的序列
+        precision: 倒角精度
+
+    返回:
+        np.ndarray: 每个顶点输出的点数
+    """
+    pts = np.asarray(vertices, dtype=np.float64)
+    vec_prev = np.roll(pts, 1, axis=0) - pts
+    vec_next = np.roll(pts, -1, axis=0) - pts
+    norm_prev = np.hypot(vec_prev[:, 0], vec_prev[:, 1])
+    norm_next = np.hypot(vec_next[:, 0], vec_next[:, 1])
+    valid = (norm_prev >= 1e-9) & (norm_next >= 1e-9)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cos_angle = np.einsum('ij,ij->i', vec_prev, vec_next) / (norm_prev * norm_next)
+    wedge = np.arccos(np.clip(np.nan_to_num(cos_angle), -1.0, 1.0))
+    valid &= (wedge >= 1e-6) & (np.abs(wedge - math.pi) >= 1e-6)
+
+    # 凸角判断: (curr - prev) x (next - curr) > 0
+    cross = (-vec_prev[:, 0]) * vec_next[:, 1] - (-vec_prev[:, 1]) * vec_next[:, 0]
+    radius = np.where(cross > 0,
+                      np.broadcast_to(np.asarray(convex_radius, dtype=np.float64), len(pts)),
+                      np.broadcast_to(np.asarray(concave_radius, dtype=np.float64), len(pts)))
+
+    span = math.pi - wedge
+    segments = np.maximum(1, np.ceil(radius * span / precision))
+    return np.where(valid & (radius > 0), segments + 1, 1).astype(np.int64)
+
+
+def shape_vertices(shape):
+    """按 main.py 的优先级取得形状的顶点数组"""
+    if "vertices_gen" in shape:
+        return generate_vertices(shape["vertices_gen"])
+    if "vertices_file" in shape:
+        file_config = shape["vertices_file"]
+        if isinstance(file_config, dict):
+            return load_vertices_file(resolve_path(file_config.get('path')), file_config.get('format'))
+        return load_vertices_file(resolve_path(file_config))
+    if "vertices" in shape:
+        return parse_vertex_string(shape.get("vertices", ""))
+    raise ValueError("缺少 vertices / vertices_gen / vertices_file")
+
+
+def _boundary_radii(fillet, zoom, offset_width=0.0):
+    """计算一条边界的 (凸角半径, 凹角半径)，不倒角时返回 None
+
+    offset_width 为该边界相对初始边界的外扩宽度（环的外边界为 ring_width）。
+    """
+    if not fillet or not fillet.get("type"):
+        return None
+    zoom = zoom if isinstance(zoom, (int, float)) else 0
+    if fillet["type"] == "arc":
+        radius = fillet.get("radii", fillet.get("radius_list", fillet.get("radius", 0)))
+        radius = np.asarray(radius, dtype=np.float64)
+        if not np.any(radius):
+            return None
+        return radius + zoom + offset_width, radius - zoom - offset_width
+    if fillet["type"] == "adaptive":
+        convex = float(fillet.get("convex_radius", 0))
+        concave = float(fillet.get("concave_radius", 0))
+        if convex <= 0 and concave <= 0:
+            return None
+        return convex + zoom + offset_width, concave - zoom - offset_width
+    return None
+
+
+def _boundary_points(vertices, fillet, radii):
+    if radii is None:
+        return len(vertices)
+    if any(np.ndim(r) and np.size(r) != len(vertices) for r in radii):
+        return len(vertices)  # 半径列表长度与顶点数不匹配时不倒角
+    precision = fillet.get("precision", 0.01)
+    return int(fillet_point_counts(vertices, radii[0], radii[1], precision).sum())
+
+
+def _gds_polygon_bytes(points):
+    pieces = max(1, math.ceil(points / GDS_MAX_POINTS))
+    return pieces * GDS_POLYGON_BYTES + (points + pieces) * GDS_POINT_BYTES
+
+
+def estimate_shape(shape):
+    """估算单个形状的代价
+
+    返回:
+        dict: name, type, input_vertices, vertices, polygons, bytes, seconds，
+              无法估算时包含 error 字段
+    """
+    shape_type = shape.get('type')
+    result = {
+        'name': shape.get('name', f"Unnamed_{shape_type}"),
+        'type': shape_type,
+        'input_vertices': 0,
+        'vertices': 0,
+        'polygons': 0,
+        'bytes': 0,
+        'seconds': 0.0,
+    }
+    try:
+        vertices = ensure_counterclockwise(shape_vertices(shape))
+    except (OSError, ValueError) as e:
+        result['error'] = str(e)
+        return result
+
+    n = len(vertices)
+    result['input_vertices'] = n
+    fillet = shape.get('fillet') or {}
+    zoom = shape.get('zoom', 0)
+
+    boundaries = []  # 每个多边形的各条边界点数
+    if shape_type == 'polygon':
+        boundaries.append([_boundary_points(vertices, fillet, _boundary_radii(fillet, zoom))])
+    elif shape_type == 'rings':
+        try:
+            ring_num = int(shape.get('ring_num', 0))
+            ring_width = parse_ring_rule(shape.get('ring_width', 0), inclusive=True)
+        except (TypeError, ValueError) as e:
+            result['error'] = str(e)
+            return result
+        zoom_value = zoom if isinstance(zoom, (int, float)) else 0
+        # 环阵列中圆弧倒角半径随缩放反向调整，自适应倒角不受缩放影响
+        radius_zoom = -zoom_value if fillet.get('type') == 'arc' else 0
+        inner_points = _boundary_points(vertices, fillet, _boundary_radii(fillet, radius_zoom))
+        for i in range(ring_num):
+            if isinstance(ring_width, list):
+                width = ring_width[i] if i < len(ring_width) else 0
+            else:
+                width = ring_width
+            outer_radii = _boundary_radii(fillet, radius_zoom, width + 2 * zoom_value)
+            boundaries.append([_boundary_points(vertices, fillet, outer_radii), inner_points])
+    elif shape_type == 'via':
+        outer = _boundary_points(vertices, fillet, _boundary_radii(fillet, shape.get('outer_zoom', 1)))
+        inner = _boundary_points(vertices, fillet, _boundary_radii(fillet, shape.get('inner_zoom', -1)))
+        boundaries.append([outer, inner])
+    else:
+        result['error'] = f"未知的形状类型: {shape_type}"
+        return result
+
+    total_points = sum(sum(b) for b in boundaries)
+    boundary_count = sum(len(b) for b in boundaries)
+    result['vertices'] = total_points
+    result['polygons'] = len(boundaries)
+    # 带孔多边形写入 GDS 时被切开为无孔多边形，每个孔多出两个切割点
+    result['bytes'] = sum(_gds_polygon_bytes(sum(b) + 2 * (len(b) - 1)) for b in boundaries)
+    result['seconds'] = (boundary_count * n * SECONDS_PER_BOUNDARY_VERTEX
+                         + total_points * SECONDS_PER_OUTPUT_POINT)
+    return result
+
+
+def estimate_config(config):
+    """在不构建几何的前提下估算整个配置的代价
+
+    参数:
+        config: 已加载的配置字典（与 main.py 使用的 YAML 结构相同）
+
+    返回:
+        dict: {"shapes": [...], "total": {...}}
+    """
+    gds_config = config.get('gds', {}) or {}
+    shapes = config.get('shapes', []) or []
+    output_options = gds_config.get('output') or {}
+    output_file = resolve_output_file(gds_config.get('output_file') or 'output.gds', output_options)
+
+    shape_estimates = [estimate_shape(shape) for shape in shapes]
+    cells = {shape.get('cell', gds_config.get('cell_name', 'TOP')) for shape in shapes} or {'TOP'}
+
+    gds_bytes = GDS_HEADER_BYTES + len(cells) * GDS_CELL_BYTES + sum(s['bytes'] for s in shape_estimates)
+    if output_format(output_file, output_options) == 'oasis':
+        out_bytes = int(gds_bytes * (OASIS_SIZE_RATIO if output_options.get('cblocks', True) else OASIS_RAW_SIZE_RATIO))
+    else:
+        out_bytes = gds_bytes
+    if output_file.lower().endswith('.gz'):
+        out_bytes = int(out_bytes * GZIP_SIZE_RATIO)
+    total = {
+        'shapes': len(shape_estimates),
+        'input_vertices': sum(s['input_vertices'] for s in shape_estimates),
+        'vertices': sum(s['vertices'] for s in shape_estimates),
+        'polygons': sum(s['polygons'] for s in shape_estimates),
+        'bytes': out_bytes,
+        'seconds': round(SECONDS_BASE + sum(s['seconds'] for s in shape_estimates), 3),
+        'errors': sum(1 for s in shape_estimates if 'error' in s),
+    }
+    for s in shape_estimates:
+        s['seconds'] = round(s['seconds'], 4)
+    logger.info(f"代价估算: {total['polygons']} 个多边形, {total['vertices']} 个顶点, "
+                f"约 {total['bytes']} 字节, 约 {total['seconds']} 秒")
+    return {'output_file': output_file, 'shapes': shape_estimates, 'total': total}
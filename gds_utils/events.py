@@ -0,0 +1,131 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from .utils import logger
+
+# 当前上下文中生效的 EventLog，未开启时为 None
+_current_events = contextvars.ContextVar("gds_events", default=None)
+
+DEFAULT_MIN_INTERVAL = 0.2  # 同一阶段的进度事件最短间隔（秒）
+
+
+class _EventLogHandler(logging.Handler):
+    """把本上下文中 WARNING 及以上的日志写成 log 事件"""
+
+    def __init__(self, events, level):
+        super().__init__(level=level)
+        self.events = events
+
+    def emit(self, record):
+        if _current_events.get() is not self.events:
+            return
+        try:
+            message = record.getMessage()
+        except Exception:  # 避免日志格式错误中断构建
+            message = str(record.msg)
+        self.events.emit('log', level=record.levelname, message=message)
+
+
+class EventLog:
+    """把构建进度、阶段耗时和警告逐行追加到 JSONL 文件
+
+    每行一个事件: {"seq": 序号, "time": 时间戳, "type": progress / timing / log, ...}。
+    写入方只追加、不等待读取方，读取方（Web 的 SSE 接口）按自己的速度从文件尾部读取，
+    慢的客户端不会拖慢构建。同一阶段的进度事件按 min_interval 限流，最后一个（done == total）总会写出。
+    """
+
+    def __init__(self, path, min_interval=DEFAULT_MIN_INTERVAL, log_level=logging.WARNING):
+        """初始化事件日志
+
+        参数:
+            path: JSONL 文件路径（追加写入）
+            min_interval: 同一阶段进度事件的最短间隔（秒），0 表示不限流
+            log_level: 记录为 log 事件的最低日志级别
+        """
+        self.path = path
+        self.min_interval = min_interval
+        self.log_level = log_level
+        self._file = None
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._last_progress = {}  # (stage, detail) -> 上次写出的时间
+        self._stage = None  # (stage, detail, 开始时间)，用于 timing 事件
+
+    @contextmanager
+    def activate(self):
+        """在当前上下文中启用事件日志，同时收集 gds_utils 的警告和错误"""
+        token = _current_events.set(self)
+        handler = _EventLogHandler(self, self.log_level)
+        if logger.level == logging.NOTSET or logger.level > self.log_level:
+            logger.setLevel(self.log_level)
+        logger.addHandler(handler)
+        try:
+            yield self
+        finally:
+            self._end_stage()
+            logger.removeHandler(handler)
+            _current_events.reset(token)
+            self.close()
+
+    def emit(self, event_type, **data):
+        """追加一个事件，返回其序号"""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._seq += 1
+            event = {'seq': self._seq, 'time': round(time.time(), 3), 'type': event_type, **data}
+            # 整行一次写出并刷新，读取方只处理以换行结尾的行
+            self._file.write(json.dumps(event, ensure_ascii=False) + '\n')
+            self._file.flush()
+            return self._seq
+
+    def progress(self, stage, done=None, total=None, detail=None):
+        """记录阶段内的进度（限流）"""
+        now = time.monotonic()
+        key = (stage, detail)
+        last = self._last_progress.get(key)
+        if last is not None and now - last < self.min_interval and done != total:
+            return
+        self._last_progress[key] = now
+        self.emit('progress', stage=stage, done=done, total=total, detail=detail)
+
+    def stage(self, stage, done=None, total=None, detail=None):
+        """记录构建的主要阶段（main.build_gds 的进度回调）
+
+        阶段或形状变化时先为上一个写出 timing 事件（墙钟时间），再写出不限流的 progress 事件。
+        """
+        current = (stage, detail if stage == 'shapes' else None)
+        if self._stage is None or self._stage[:2] != current:
+            self._end_stage()
+            if stage != 'done':
+                self._stage = (*current, time.perf_counter())
+        self.emit('progress', stage=stage, done=done, total=total, detail=detail)
+
+    def _end_stage(self):
+        if self._stage is None:
+            return
+        stage, detail, start = self._stage
+        self._stage = None
+        self.emit('timing', stage=stage, detail=detail, wall=round(time.perf_counter() - start, 6))
+
+    def close(self):
+        """关闭文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def report_progress(stage, done=None, total=None, detail=None):
+    """向当前生效的 EventLog 报告阶段内进度，未开启时不做任何事"""
+    events = _current_events.get()
+    if events is not None:
+        events.progress(stage, done, total, detail)
+
+
+def current_events():
+    """返回当前上下文中生效的 EventLog，未开启时返回 None"""
+    return _current_events.get()
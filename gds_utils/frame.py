@@ -1,26 +1,25 @@
 import numpy as np
 import math
 from .utils import logger
+from .profiler import profiled
+from .vertices import signed_area
 
 class Frame:
     def __init__(self, vertices):
         self.vertices = vertices
 
     def is_clockwise(self):
-        """检查多边形顶点是否为顺时针方向"""
-        n = len(self.vertices)
-        area = 0.0
-        for i in range(n):
-            j = (i + 1) % n
-            area += self.vertices[i][0] * self.vertices[j][1]
-            area -= self.vertices[j][0] * self.vertices[i][1]
-        return area < 0
+        """检查多边形顶点是否为顺时针方向（顶点可以是元组列表或 (N, 2) 数组）"""
+        if len(self.vertices) == 0:
+            return False
+        return signed_area(np.asarray(self.vertices, dtype=np.float64)) < 0
 
     def ensure_counterclockwise(self):
         """确保多边形顶点为逆时针方向"""
         if self.is_clockwise():
             self.vertices = self.vertices[::-1]
 
+    @profiled("offset")
     def offset(self, width):
         """生成偏移后的新Frame
         
@@ -106,6 +105,7 @@ class Frame:
         y = det(d, ydiff) / div
         return (x, y)
     
+    @profiled("fillet")
     def apply_adaptive_fillet(self, convex_radius, concave_radius, precision=0.01, interactive=True):
         """根据顶点的凹凸性自适应应用不同的倒角半径
         
@@ -173,6 +173,7 @@ class Frame:
         logger.info(f"自适应倒角完成，输出顶点数: {len(filleted_vertices)}")
         return Frame(filleted_vertices)
 
+    @profiled("fillet")
     def apply_arc_fillet(self, radius_or_radii_list, precision=0.01, interactive=True):
         """对多边形的顶点应用圆弧倒角。"""
         # 如果倒角列表里都是0，直接返回
@@ -1,12 +1,280 @@
 import klayout.db as db
 import os
 from .cell import Cell
-from .utils import logger
+from .layer import LayerManager, parse_layer_spec
+from .utils import logger, atomic_write_path
+from .profiler import profiled, profile_stage
+from .layout_cache import shared_cache, file_digest
+from .mapping import collect_mapping, save_layer_mapping, load_layer_mapping
+from .summary import layout_summary
+
+# 输出格式: 配置名 -> (KLayout 格式名, 默认扩展名)
+OUTPUT_FORMATS = {
+    'gds': ('GDS2', '.gds'),
+    'oasis': ('OASIS', '.oas'),
+}
+_FORMAT_BY_EXTENSION = {'.gds': 'gds', '.gds2': 'gds', '.oas': 'oasis', '.oasis': 'oasis'}
+
+
+def _split_gzip(output_file):
+    """拆分 .gz 后缀，返回 (去掉 .gz 的路径, 是否带 .gz)"""
+    if output_file.lower().endswith('.gz'):
+        return output_file[:-3], True
+    return output_file, False
+
+
+def sidecar_path(output_file, suffix):
+    """输出文件旁路文件的路径: 与输出文件同目录，<basename><suffix>，basename 去掉 .gz 和格式扩展名
+
+    参数:
+        output_file: 版图输出文件路径
+        suffix: 旁路文件后缀，如 .mapping.json
+
+    返回:
+        str: 旁路文件的绝对路径
+    """
+    basename, _ = os.path.splitext(_split_gzip(os.path.abspath(output_file))[0])
+    return f"{basename}{suffix}"
+
+
+def output_format(output_file, output_options=None):
+    """确定输出格式
+
+    参数:
+        output_file: 输出文件路径
+        output_options: gds.output 配置，其中 format 优先于扩展名
+
+    返回:
+        str: 'gds' 或 'oasis'
+
+    异常:
+        ValueError: 不支持的格式
+    """
+    fmt = (output_options or {}).get('format')
+    if fmt:
+        fmt = str(fmt).lower()
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"不支持的输出格式: {fmt}，可选 {', '.join(OUTPUT_FORMATS)}")
+        return fmt
+    path, _ = _split_gzip(output_file)
+    return _FORMAT_BY_EXTENSION.get(os.path.splitext(path)[1].lower(), 'gds')
+
+
+def resolve_output_file(output_file, output_options=None):
+    """根据输出选项确定实际写入的文件路径
+
+    显式指定的 format 与扩展名不一致时替换扩展名；gzip 为 True 时追加 .gz，
+    KLayout 按 .gz 后缀自动压缩写出，读取时也会自动解压。
+
+    参数:
+        output_file: 配置中的输出文件路径
+        output_options: gds.output 配置
+
+    返回:
+        str: 实际写入的文件路径
+    """
+    output_options = output_options or {}
+    fmt = output_format(output_file, output_options)
+    path, gzipped = _split_gzip(output_file)
+    base, ext = os.path.splitext(path)
+    if output_options.get('format') and _FORMAT_BY_EXTENSION.get(ext.lower()) != fmt:
+        path = base + OUTPUT_FORMATS[fmt][1]
+    if output_options.get('gzip', gzipped):
+        path += '.gz'
+    return path
+
+
+def make_save_options(output_file, output_options=None):
+    """由 gds.output 配置构造 SaveLayoutOptions
+
+    支持的字段:
+        format: gds / oasis，缺省按扩展名判断
+        gzip: 是否 gzip 压缩输出（追加 .gz 后缀）
+        cblocks: OASIS 是否写 CBLOCK（deflate 压缩块），默认 True
+        strict: OASIS 严格模式（写名称表，便于流式读取），默认 True
+        compression_level: OASIS 重复结构检测强度 0-10，0 为关闭，默认 2
+        timestamps: GDS 是否写入时间戳，默认 True（deterministic 时默认 False）
+        deterministic: 可复现输出，见 canonical_layout，默认 False
+
+    参数:
+        output_file: 输出文件路径
+        output_options: gds.output 配置
+
+    返回:
+        db.SaveLayoutOptions: 保存选项
+
+    异常:
+        ValueError: 选项取值非法
+    """
+    output_options = output_options or {}
+    options = db.SaveLayoutOptions()
+    fmt = output_format(output_file, output_options)
+    options.format = OUTPUT_FORMATS[fmt][0]
+    if fmt == 'oasis':
+        options.oasis_write_cblocks = bool(output_options.get('cblocks', True))
+        options.oasis_strict_mode = bool(output_options.get('strict', True))
+        level = int(output_options.get('compression_level', 2))
+        if not 0 <= level <= 10:
+            raise ValueError(f"compression_level 应在 0-10 之间: {level}")
+        options.oasis_compression_level = level
+    else:
+        deterministic = bool(output_options.get('deterministic', False))
+        options.gds2_write_timestamps = bool(output_options.get('timestamps', not deterministic))
+    return options
+
+
+def _shape_key(shape):
+    return shape.to_s()
+
+
+def _normalized_polygon(polygon):
+    """重新构造多边形，统一起点和方向（KLayout 非 raw 模式的规范形式）"""
+    normalized = db.Polygon(list(polygon.each_point_hull()))
+    for hole in range(polygon.holes()):
+        normalized.insert_hole(list(polygon.each_point_hole(hole)))
+    return normalized
+
+
+def canonical_layout(layout):
+    """构造版图的规范副本，相同内容总是得到相同的写出字节
+
+    单元格按名称、图层按 (layer, datatype) 顺序重新创建，每个图层内的形状和每个单元格的实例
+    按文本表示排序，多边形统一起点和方向。构造顺序、插入顺序不同但内容相同的版图，
+    规范副本逐字节写出后完全一致。
+
+    参数:
+        layout: KLayout Layout 对象
+
+    返回:
+        db.Layout: 规范副本
+    """
+    canonical = db.Layout()
+    canonical.dbu = layout.dbu
+
+    layers = sorted(layout.layer_indexes(),
+                    key=lambda index: (layout.get_info(index).layer, layout.get_info(index).datatype,
+                                       layout.get_info(index).name))
+    layer_map = {index: canonical.layer(layout.get_info(index)) for index in layers}
+
+    cells = sorted(layout.each_cell(), key=lambda cell: cell.name)
+    cell_map = {cell.cell_index(): canonical.create_cell(cell.name).cell_index() for cell in cells}
+
+    for cell in cells:
+        target = canonical.cell(cell_map[cell.cell_index()])
+        for index in layers:
+            target_shapes = target.shapes(layer_map[index])
+            for shape in sorted(cell.shapes(index).each(), key=_shape_key):
+                inserted = target_shapes.insert(shape)
+                if shape.is_polygon():
+                    inserted.polygon = _normalized_polygon(shape.polygon)
+        instances = []
+        for inst in cell.each_inst():
+            array = inst.cell_inst.dup()
+            array.cell_index = cell_map[array.cell_index]
+            instances.append(array)
+        for array in sorted(instances, key=lambda array: array.to_s()):
+            target.insert(array)
+    return canonical
+
+
+def mapping_path(output_file, save_mapping=True):
+    """图层映射文件路径
+
+    参数:
+        output_file: 版图输出文件路径
+        save_mapping: True 时为 <basename>.mapping.json；字符串为映射文件名，
+                      相对路径相对于输出文件所在目录，格式由扩展名决定
+
+    返回:
+        str: 映射文件路径
+    """
+    if isinstance(save_mapping, str):
+        return os.path.join(os.path.dirname(os.path.abspath(output_file)), save_mapping)
+    return sidecar_path(output_file, '.mapping.json')
+
+
+def make_load_options(layers=None):
+    """构造只读取指定图层的 LoadLayoutOptions
+
+    未列出的图层在读取时直接跳过，不会创建图层也不会分配形状。
+
+    参数:
+        layers: 图层描述列表，None 或空列表表示读取全部图层
+
+    返回:
+        db.LoadLayoutOptions: 读取选项
+    """
+    options = db.LoadLayoutOptions()
+    if layers:
+        layer_map = db.LayerMap()
+        for index, spec in enumerate(layers):
+            layer_num, datatype = parse_layer_spec(spec)
+            layer_map.map(db.LayerInfo(layer_num, datatype), index)
+        options.layer_map = layer_map
+        options.create_other_layers = False
+    return options
+
+
+def read_layout(input_file, input_layers=None, input_cells=None):
+    """读取版图文件，按图层过滤并只保留指定单元格
+
+    参数:
+        input_file: 版图文件路径
+        input_layers: 只读取这些图层，None 表示全部
+        input_cells: 只保留这些单元格及其子单元格，None 表示全部
+
+    返回:
+        db.Layout: 读取的版图
+    """
+    layout = db.Layout()
+    layout.read(input_file, make_load_options(input_layers))
+    if input_cells:
+        dropped = prune_cells(layout, input_cells)
+        logger.info(f"按 input_cells 删除了 {dropped} 个单元格")
+    return layout
+
+
+def read_layout_shared(input_file):
+    """读取只读版图（预览、瓦片等只读取的场景）
+
+    启用共享版图缓存时直接返回缓存中的版图，不复制，调用方不能修改；未启用时等同于 read_layout。
+    """
+    cache = shared_cache()
+    if cache is None:
+        return read_layout(input_file)
+    # 与 GDS(input_file=...) 不过滤图层和单元格时的缓存键相同，共用同一份解析结果
+    return cache.get(input_file, read_layout, (repr([]), ()), copy=False)
+
+
+def prune_cells(layout, cell_names):
+    """只保留指定单元格及其引用的子单元格
+
+    参数:
+        layout: KLayout Layout 对象
+        cell_names: 要保留的单元格名称列表
+
+    返回:
+        int: 删除的单元格数量
+    """
+    keep = set()
+    for name in cell_names:
+        cell = layout.cell(name)
+        if cell is None:
+            logger.warning(f"输入文件中不存在单元格: {name}")
+            continue
+        keep.add(cell.cell_index())
+        keep.update(cell.called_cells())
+    drop = [cell.cell_index() for cell in layout.each_cell() if cell.cell_index() not in keep]
+    if drop:
+        layout.delete_cells(drop)
+    return len(drop)
+
 
 class GDS:
     """操作 GDS 文件的类"""
     
-    def __init__(self, input_file=None, cell_name="TOP", layer_info=(1, 0), dbu=0.001):
+    def __init__(self, input_file=None, cell_name="TOP", layer_info=(1, 0), dbu=0.001,
+                 input_layers=None, input_cells=None, layout_cache=None):
         """初始化 GDS 对象
         
         参数:
@@ -14,30 +282,42 @@ class GDS:
             cell_name: 默认单元格名称
             layer_info: 默认图层信息 (layer_num, datatype)
             dbu: 数据库单位（默认0.001，即1纳米）
+            input_layers: 只读取这些图层，None 表示全部
+            input_cells: 只保留这些单元格及其子单元格，None 表示全部
+            layout_cache: 输入版图缓存，None 时使用共享缓存（未启用则直接读取）
         """
         self.kdb_layout = db.Layout()
-        self.cells = {}
+        self.cells = {}  # 按需创建的 Cell 包装对象
         self.dbu = dbu
+        self.output_digest = None  # 最近一次 save() 写出文件的 SHA-256
         
         # 设置数据库单位
         self.kdb_layout.dbu = dbu
         
+        loaded = False
         if input_file:
             try:
-                # 读取现有GDS文件
-                self.kdb_layout.read(input_file)
-                logger.info(f"读取GDS文件: {input_file}")
+                # 读取现有GDS文件，按图层过滤；启用缓存时取缓存版图的副本
+                layout_cache = layout_cache or shared_cache()
+                with profile_stage("load_layout"):
+                    if layout_cache is None:
+                        self.kdb_layout = read_layout(input_file, input_layers, input_cells)
+                    else:
+                        options_key = (repr(input_layers or []), tuple(input_cells or ()))
+                        self.kdb_layout = layout_cache.get(
+                            input_file, lambda path: read_layout(path, input_layers, input_cells), options_key)
+                logger.info(f"读取GDS文件: {input_file} ({self.kdb_layout.cells()} 个单元格)")
+                loaded = True
                 
-                # 加载所有单元格
-                for cell in self.kdb_layout.each_cell():
-                    self.cells[cell.name] = Cell(cell)
-                    logger.debug(f"加载单元格: {cell.name}")
+                # Cell 包装对象在 get_cell 时按需创建
                 
             except Exception as e:
                 logger.error(f"读取GDS文件失败: {e}")
-                # 创建默认单元格
-                self._create_default_cell(cell_name)
-        else:
+        
+        # 整个版图共享的图层注册表，登记输入文件中已有的图层
+        self.layer_manager = LayerManager(self.kdb_layout)
+        
+        if not loaded:
             # 创建默认单元格
             self._create_default_cell(cell_name)
     
@@ -49,21 +329,29 @@ class GDS:
         """
         try:
             kdb_cell = self.kdb_layout.create_cell(cell_name)
-            self.cells[cell_name] = Cell(kdb_cell)
+            self.cells[cell_name] = Cell(kdb_cell, self.layer_manager)
             logger.info(f"创建新单元格: {cell_name}")
         except Exception as e:
             logger.error(f"创建单元格失败: {e}")
 
+    def resolve_layer(self, spec):
+        """把图层描述（名称、[layer, datatype]、"layer/datatype"）解析为 (layer_num, datatype)
+
+        异常:
+            ValueError: 未知名称或格式错误
+        """
+        return self.layer_manager.resolve(spec)
+
     def get_cells(self):
         """获取所有单元格
         
         返回:
             list: Cell 对象列表
         """
-        return list(self.cells.values())
+        return [self.get_cell(cell.name) for cell in self.kdb_layout.each_cell()]
 
     def get_cell(self, cell_name):
-        """获取指定名称的单元格
+        """获取指定名称的单元格，首次访问时创建 Cell 包装对象
         
         参数:
             cell_name: 单元格名称
@@ -71,7 +359,13 @@ class GDS:
         返回:
             Cell | None: 单元格对象，不存在则返回None
         """
-        return self.cells.get(cell_name)
+        cell = self.cells.get(cell_name)
+        if cell is None:
+            kdb_cell = self.kdb_layout.cell(cell_name)
+            if kdb_cell is not None:
+                cell = self.cells[cell_name] = Cell(kdb_cell, self.layer_manager)
+                logger.debug(f"加载单元格: {cell_name}")
+        return cell
 
     def create_cell(self, cell_name):
         """创建新的单元格
@@ -82,45 +376,93 @@ class GDS:
         返回:
             Cell: 单元格对象
         """
-        if cell_name in self.cells:
+        existing = self.get_cell(cell_name)
+        if existing is not None:
             logger.warning(f"单元格 {cell_name} 已存在")
-            return self.cells[cell_name]
+            return existing
             
         try:
             kdb_cell = self.kdb_layout.create_cell(cell_name)
-            self.cells[cell_name] = Cell(kdb_cell)
+            self.cells[cell_name] = Cell(kdb_cell, self.layer_manager)
             logger.info(f"创建新单元格: {cell_name}")
             return self.cells[cell_name]
         except Exception as e:
             logger.error(f"创建单元格失败: {e}")
             return None
 
-    def save(self, output_file, save_mapping=True):
+    def summary(self, cell_name=None):
+        """按图层统计多边形数、顶点数、最大顶点数、面积和包围框，见 summary.layout_summary
+
+        参数:
+            cell_name: 统计的单元格，None 时统计全部顶层单元格
+
+        返回:
+            dict: 统计结果
+        """
+        with profile_stage("summary"):
+            return layout_summary(self.kdb_layout, cell_name)
+
+    def load_mapping(self, mapping_file):
+        """加载 save() 写出的图层映射，更新共享的图层注册表
+
+        参数:
+            mapping_file: 映射文件路径（json / binary / text）
+
+        返回:
+            int: 加载的映射条数，失败返回 0
+        """
+        try:
+            mapping = load_layer_mapping(mapping_file)
+        except (OSError, ValueError) as e:
+            logger.error(f"加载图层映射失败: {e}")
+            return 0
+        self.layer_manager.update(mapping)
+        logger.info(f"已从 {mapping_file} 加载 {len(mapping)} 条图层映射")
+        return len(mapping)
+
+    @profiled("save")
+    def save(self, output_file, save_mapping=True, options=None):
         """保存 GDS 文件
 
         参数:
             output_file: 输出文件路径
-            save_mapping: 是否保存图层映射
+            save_mapping: 是否保存图层映射，也可以是映射文件名（相对路径相对于输出文件所在目录）
+            options: 输出选项（gds.output 配置），见 make_save_options；
+                     deterministic 为 True 时写出 canonical_layout 规范副本
+
+        返回:
+            str | None: 实际写入的文件路径，失败返回 None。写出文件的 SHA-256 保存在 output_digest
         """
+        self.output_digest = None
         try:
             # 规范化输出路径
-            output_file = os.path.abspath(os.path.normpath(output_file))
+            output_file = resolve_output_file(os.path.abspath(os.path.normpath(output_file)), options)
+            save_options = make_save_options(output_file, options)
 
             # 确保输出目录存在
             output_dir = os.path.dirname(output_file)
             if output_dir and not os.path.exists(output_dir):
                 os.makedirs(output_dir)
 
-            # 使用简单的 write 方法,让 klayout 自动根据扩展名判断格式
-            # 这种方式在打包和非打包环境下都能正常工作
-            self.kdb_layout.write(output_file)
-            logger.info(f"保存GDS文件: {output_file}")
+            layout = self.kdb_layout
+            if (options or {}).get('deterministic'):
+                with profile_stage("canonicalize"):
+                    layout = canonical_layout(layout)
+
+            # 显式指定格式，扩展名为 .gz 时 KLayout 自动压缩；先写临时文件再原子替换
+            with atomic_write_path(output_file) as temp_file:
+                layout.write(temp_file, save_options)
+                self.output_digest = file_digest(temp_file)
+            logger.info(f"保存GDS文件: {output_file} ({save_options.format}, sha256 {self.output_digest})")
 
-            # 保存图层映射
+            # 保存图层映射: 整个版图一个文件
             if save_mapping:
-                basename, _ = os.path.splitext(output_file)
-                for cell_name, cell in self.cells.items():
-                    mapping_file = f"{basename}.{cell_name}.mapping"
-                    cell.get_layer_manager().save_mapping(mapping_file)
+                records = collect_mapping(self.layer_manager)
+                if records:
+                    save_layer_mapping(mapping_path(output_file, save_mapping), records)
+                else:
+                    logger.debug("没有图层映射需要保存")
+            return output_file
         except Exception as e:
-            logger.error(f"保存GDS文件失败: {e}") 
\ No newline at end of file
+            logger.error(f"保存GDS文件失败: {e}")
+            return None 
\ No newline at end of file
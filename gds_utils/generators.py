@@ -0,0 +1,191 @@
+import math
+import numpy as np
+from .utils import logger
+
+# 顶点生成器注册表: shape_type -> 生成函数
+_GENERATORS = {}
+
+# 圆形精度范围与前端一致，超出时使用默认精度（见 web_gui/static/main.js generateCircleVertices）
+CIRCLE_SEGMENTS_RANGE = (3, 512)
+CIRCLE_DEFAULT_SEGMENTS = 64
+
+
+def register_generator(shape_type):
+    """注册顶点生成器的装饰器
+
+    生成函数接收 vertices_gen 配置字典，返回形状为 (N, 2) 的 float64 数组，
+    顶点按逆时针排列。参数不合法时应抛出 ValueError。
+
+    参数:
+        shape_type: 生成器名称，对应配置中的 shape_type
+    """
+    def decorator(func):
+        if shape_type in _GENERATORS:
+            logger.warning(f"顶点生成器 '{shape_type}' 已存在，将被覆盖")
+        _GENERATORS[shape_type] = func
+        return func
+    return decorator
+
+
+def get_generator(shape_type):
+    """获取已注册的生成器，不存在则返回None"""
+    return _GENERATORS.get(shape_type)
+
+
+def available_generators():
+    """返回所有已注册的生成器名称列表"""
+    return sorted(_GENERATORS)
+
+
+def generate_vertices(gen_config: dict) -> np.ndarray:
+    """根据 vertices_gen 配置生成顶点数组
+
+    参数:
+        gen_config: 顶点生成配置，必须包含 shape_type
+
+    返回:
+        np.ndarray: 形状为 (N, 2) 的顶点数组
+
+    异常:
+        ValueError: 生成器类型未知或参数不合法
+    """
+    if not isinstance(gen_config, dict):
+        raise ValueError(f"vertices_gen 必须是字典，当前值: {gen_config!r}")
+    shape_type = gen_config.get("shape_type")
+    generator = _GENERATORS.get(shape_type)
+    if generator is None:
+        raise ValueError(f"未知的顶点生成类型: {shape_type}，可用类型: {', '.join(available_generators())}")
+    vertices = generator(gen_config)
+    logger.debug(f"生成器 '{shape_type}' 生成 {len(vertices)} 个顶点")
+    return vertices
+
+
+def _number(gen_config, key, default):
+    """读取数值参数；null、列表等无法转换的值抛出 ValueError（而不是 TypeError），调用方按参数错误处理"""
+    value = gen_config.get(key, default)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} 必须是数值，当前值: {value!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"{key} 必须是有限数值，当前值: {value!r}")
+    return number
+
+
+def _center(gen_config):
+    return _number(gen_config, "center_x", 0), _number(gen_config, "center_y", 0)
+
+
+def _positive(gen_config, key, default):
+    value = _number(gen_config, key, default)
+    if value <= 0:
+        raise ValueError(f"{key} 必须大于0，当前值: {value}")
+    return value
+
+
+def _count(gen_config, key, default, minimum):
+    value = int(_number(gen_config, key, default))
+    if value < minimum:
+        raise ValueError(f"{key} ({value}) 过少，至少需要{minimum}")
+    return value
+
+
+def _ellipse_points(cx, cy, rx, ry, n, rotation_deg=0.0, start=0.0):
+    """在椭圆上均匀取 n 个角度点，可选旋转（角度制）"""
+    angles = start + np.arange(n) * (2.0 * np.pi / n)
+    pts = np.empty((n, 2), dtype=np.float64)
+    pts[:, 0] = rx * np.cos(angles)
+    pts[:, 1] = ry * np.sin(angles)
+    if rotation_deg:
+        theta = math.radians(rotation_deg)
+        c, s = math.cos(theta), math.sin(theta)
+        pts = pts @ np.array([[c, s], [-s, c]])
+    pts[:, 0] += cx
+    pts[:, 1] += cy
+    return pts
+
+
+@register_generator("star")
+def _gen_star(gen_config):
+    """星形: center_x, center_y, outer_radius, inner_radius, points"""
+    cx, cy = _center(gen_config)
+    outer_radius = _positive(gen_config, "outer_radius", 10)
+    inner_radius = _positive(gen_config, "inner_radius", 5)
+    if inner_radius >= outer_radius:
+        raise ValueError(f"inner_radius ({inner_radius}) 必须小于 outer_radius ({outer_radius})")
+    num_points = _count(gen_config, "points", 5, 2)
+
+    i = np.arange(num_points * 2)
+    angles = np.pi / num_points * i - np.pi / 2  # 调整起始角度使尖端向上
+    radii = np.where(i % 2 == 0, outer_radius, inner_radius)
+    return np.column_stack((cx + radii * np.cos(angles), cy + radii * np.sin(angles)))
+
+
+@register_generator("circle")
+def _gen_circle(gen_config):
+    """圆形: center_x, center_y, radius, segments, rotation"""
+    cx, cy = _center(gen_config)
+    radius = _positive(gen_config, "radius", 10)
+    segments = int(_number(gen_config, "segments", CIRCLE_DEFAULT_SEGMENTS))
+    low, high = CIRCLE_SEGMENTS_RANGE
+    if not low <= segments <= high:
+        logger.warning(f"精度值 {segments} 超出范围({low}-{high})，使用默认值 {CIRCLE_DEFAULT_SEGMENTS}")
+        segments = CIRCLE_DEFAULT_SEGMENTS
+    return _ellipse_points(cx, cy, radius, radius, segments, _number(gen_config, "rotation", 0))
+
+
+@register_generator("ellipse")
+def _gen_ellipse(gen_config):
+    """椭圆: center_x, center_y, radius_x, radius_y, segments, rotation"""
+    cx, cy = _center(gen_config)
+    radius_x = _positive(gen_config, "radius_x", 10)
+    radius_y = _positive(gen_config, "radius_y", 5)
+    segments = _count(gen_config, "segments", 64, 3)
+    return _ellipse_points(cx, cy, radius_x, radius_y, segments, _number(gen_config, "rotation", 0))
+
+
+@register_generator("regular_polygon")
+def _gen_regular_polygon(gen_config):
+    """正多边形: center_x, center_y, radius(外接圆半径), sides, rotation
+
+    默认让一条边水平位于底部。
+    """
+    cx, cy = _center(gen_config)
+    radius = _positive(gen_config, "radius", 10)
+    sides = _count(gen_config, "sides", 6, 3)
+    start = -np.pi / 2 + np.pi / sides
+    return _ellipse_points(cx, cy, radius, radius, sides, _number(gen_config, "rotation", 0), start)
+
+
+@register_generator("rounded_rectangle")
+def _gen_rounded_rectangle(gen_config):
+    """圆角矩形: center_x, center_y, width, height, corner_radius, corner_segments"""
+    cx, cy = _center(gen_config)
+    width = _positive(gen_config, "width", 20)
+    height = _positive(gen_config, "height", 10)
+    corner_radius = _number(gen_config, "corner_radius", 0)
+    corner_segments = _count(gen_config, "corner_segments", 16, 1)
+
+    if corner_radius < 0 or corner_radius > min(width, height) / 2:
+        raise ValueError(f"corner_radius ({corner_radius}) 必须在 0 到 min(width, height)/2 之间")
+
+    hw, hh = width / 2, height / 2
+    if corner_radius == 0:
+        return np.array([(cx - hw, cy - hh), (cx + hw, cy - hh), (cx + hw, cy + hh), (cx - hw, cy + hh)],
+                        dtype=np.float64)
+
+    # 四个角的圆心，从右下角开始逆时针
+    inset_w, inset_h = hw - corner_radius, hh - corner_radius
+    centers = np.array([(inset_w, -inset_h), (inset_w, inset_h), (-inset_w, inset_h), (-inset_w, -inset_h)])
+    base_angles = np.array([-np.pi / 2, 0.0, np.pi / 2, np.pi])
+    angles = base_angles[:, None] + np.linspace(0.0, np.pi / 2, corner_segments + 1)[None, :]
+    xs = centers[:, 0:1] + corner_radius * np.cos(angles)
+    ys = centers[:, 1:2] + corner_radius * np.sin(angles)
+    pts = np.column_stack((xs.ravel() + cx, ys.ravel() + cy))
+
+    # 圆角半径等于半宽/半高时相邻圆弧端点重合，去除重复点
+    keep = np.ones(len(pts), dtype=bool)
+    keep[1:] = np.any(np.abs(np.diff(pts, axis=0)) > 1e-12, axis=1)
+    if np.all(np.abs(pts[-1] - pts[0]) <= 1e-12):
+        keep[-1] = False
+    return pts[keep]
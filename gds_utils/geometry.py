@@ -0,0 +1,171 @@
+import struct
+import numpy as np
+import klayout.db as db
+from .gds import read_layout_shared
+from .preview import decimate_region, layer_region, view_cells
+from .utils import logger
+
+# 二进制几何格式（小端）:
+#   文件头 40 字节: magic "SGEO", version u16, 坐标类型 u8, 保留 u8, 图层数 u32, 保留 u32,
+#                  origin_x f64, origin_y f64, scale f64        坐标（微米）= origin + 存储值 * scale
+#   每个图层: layer u32, datatype u32, 多边形数 n u32, 顶点数 m u32,
+#             offsets u32[n + 1]（第 i 个多边形的顶点为 offsets[i] 到 offsets[i+1]），coords[2m]（x, y 交替）
+# 所有数组都按 4 字节对齐，前端可以直接在 ArrayBuffer 上创建 TypedArray 视图。
+MAGIC = b'SGEO'
+MIME_TYPE = 'application/vnd.summer-gds.geometry'
+FORMAT_VERSION = 1
+COORD_TYPES = {'int32': (1, np.dtype('<i4')), 'float32': (2, np.dtype('<f4'))}
+HEADER = struct.Struct('<4sHBBII3d')
+LAYER_HEADER = struct.Struct('<4I')
+MAX_PIXELS = 8192
+# Web 接口未给出 pixels 时按整个版图、这么多像素的分辨率简化；pixels=0 返回全部顶点
+DEFAULT_PIXELS = 2048
+
+
+# GDS 记录类型: XY（BOUNDARY 的顶点，int32 大端，末尾重复首点闭合）
+_GDS_XY = 0x10
+# GDS 允许的单个 BOUNDARY 最大顶点数；更大的多边形由 KLayout 切分为多块，按填充绘制时没有区别
+_GDS_MAX_VERTICES = 8191
+
+
+def _polygon_arrays(region, dbu):
+    """取出每个多边形的外轮廓顶点（数据库单位）
+
+    逐顶点创建 Point 对象是编码的主要开销。这里让 KLayout 在 C++ 内把区域写成内存中的 GDS 流，
+    再用 numpy 直接读取各 XY 记录，Python 只按记录（每个多边形一次）循环。
+    GDS 不支持孔洞，带孔的多边形由写出器用切线连接到外轮廓，前端按普通多边形填充即可。
+
+    返回:
+        tuple: (每个多边形的顶点数 u32[n], 坐标 int64[m, 2])
+    """
+    layout = db.Layout()
+    layout.dbu = dbu
+    layout.create_cell('GEOMETRY').shapes(layout.layer(1, 0)).insert(region)
+    options = db.SaveLayoutOptions()
+    options.format = 'GDS2'
+    options.gds2_max_vertex_count = _GDS_MAX_VERTICES
+    data = layout.write_bytes(options)
+
+    counts = []
+    parts = []
+    position = 0
+    while position + 4 <= len(data):
+        length = (data[position] << 8) | data[position + 1]
+        if length < 4:
+            break
+        if data[position + 2] == _GDS_XY:
+            points = (length - 4) // 8 - 1  # 去掉闭合点
+            counts.append(points)
+            parts.append(np.frombuffer(data, dtype='>i4', count=points * 2, offset=position + 4))
+        position += length
+    if not parts:
+        return np.zeros(0, dtype='<u4'), np.zeros((0, 2), dtype=np.int64)
+    return np.array(counts, dtype='<u4'), np.concatenate(parts).astype(np.int64).reshape(-1, 2)
+
+
+def encode_geometry(layout, cell_name=None, viewport=None, pixels=None, coord_type='int32', quantum=None):
+    """把版图按图层编码为紧凑的二进制几何
+
+    参数:
+        layout: KLayout Layout 对象
+        cell_name: 导出的单元格，None 时为全部顶层单元格（包含子单元格，展平）
+        viewport: 视口 (left, bottom, right, top)（微米），只导出视口内的部分并裁剪，None 表示全部
+        pixels: 视口较长一边对应的像素数；给出时按屏幕分辨率简化（见 preview.decimate_region），
+                小于两个像素的图形以包围框代替
+        coord_type: int32 或 float32
+        quantum: 坐标量化步长（微米），int32 坐标按它取整，None 时为数据库单位
+
+    返回:
+        bytes: 编码结果
+
+    异常:
+        ValueError: 单元格不存在或参数非法
+    """
+    if coord_type not in COORD_TYPES:
+        raise ValueError(f"不支持的坐标类型: {coord_type}，可选 {', '.join(COORD_TYPES)}")
+    if pixels is not None and not (0 < pixels <= MAX_PIXELS):
+        raise ValueError(f"pixels 应在 1 到 {MAX_PIXELS} 之间: {pixels}")
+    dbu = layout.dbu
+    step = 1 if quantum is None else int(round(quantum / dbu))
+    if step < 1:
+        raise ValueError(f"量化步长不能小于数据库单位 {dbu}: {quantum}")
+
+    cells = view_cells(layout, cell_name)
+    if viewport is not None:
+        left, bottom, right, top = viewport
+        if right <= left or top <= bottom:
+            raise ValueError(f"视口为空: {viewport}")
+        box = db.Box(int(round(left / dbu)), int(round(bottom / dbu)), int(round(right / dbu)), int(round(top / dbu)))
+    else:
+        box = db.Box()
+        for cell in cells:
+            box += cell.bbox()
+
+    type_code, dtype = COORD_TYPES[coord_type]
+    origin = box.p1 if not box.empty() else db.Point(0, 0)
+    # float32 直接存储微米坐标（相对 origin），int32 存储量化后的整数
+    scale = 1.0 if coord_type == 'float32' else dbu * step
+    pixel = max(1, int(max(box.width(), box.height()) / pixels)) if pixels and not box.empty() else None
+
+    layers = []
+    points_total = 0
+    for index in sorted(layout.layer_indexes(),
+                        key=lambda i: (layout.get_info(i).layer, layout.get_info(i).datatype)):
+        region = layer_region(layout, cells, index, box if viewport is not None else None)
+        if viewport is not None:
+            region &= db.Region(box)
+        if pixel:
+            outlines, details = decimate_region(region, pixel)
+            region = outlines + details.extents()
+        counts, coords = _polygon_arrays(region, dbu)
+        if not len(counts):
+            continue
+        offsets = np.zeros(len(counts) + 1, dtype='<u4')
+        np.cumsum(counts, out=offsets[1:])
+        coords -= (origin.x, origin.y)
+        if coord_type == 'float32':
+            coords = (coords * dbu).astype(dtype)
+        else:
+            coords = np.round(coords / step).astype(dtype)
+        info = layout.get_info(index)
+        layers.append(LAYER_HEADER.pack(info.layer, info.datatype, len(counts), len(coords)) +
+                      offsets.tobytes() + coords.tobytes())
+        points_total += len(coords)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, type_code, 0, len(layers), 0,
+                         origin.x * dbu, origin.y * dbu, scale)
+    data = header + b''.join(layers)
+    logger.info(f"编码几何: {len(layers)} 个图层，{points_total} 个顶点，{len(data)} 字节")
+    return data
+
+
+def encode_geometry_file(path, **kwargs):
+    """读取版图文件并编码几何，参数见 encode_geometry"""
+    return encode_geometry(read_layout_shared(path), **kwargs)
+
+
+def decode_geometry(data):
+    """解码 encode_geometry 的结果（用于测试和 Python 客户端）
+
+    返回:
+        dict: {"origin": (x, y), "scale": float, "layers": {"layer/datatype": [numpy (k, 2) 数组（微米）, ...]}}
+
+    异常:
+        ValueError: 数据格式不正确
+    """
+    magic, version, type_code, _, layer_count, _, origin_x, origin_y, scale = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"不是版本 {FORMAT_VERSION} 的几何数据")
+    dtype = next(dtype for code, dtype in COORD_TYPES.values() if code == type_code)
+    position = HEADER.size
+    layers = {}
+    for _ in range(layer_count):
+        layer, datatype, polygon_count, point_count = LAYER_HEADER.unpack_from(data, position)
+        position += LAYER_HEADER.size
+        offsets = np.frombuffer(data, dtype='<u4', count=polygon_count + 1, offset=position)
+        position += offsets.nbytes
+        coords = np.frombuffer(data, dtype=dtype, count=point_count * 2, offset=position).reshape(-1, 2)
+        position += coords.nbytes
+        points = coords * scale + (origin_x, origin_y)
+        layers[f"{layer}/{datatype}"] = [points[offsets[i]:offsets[i + 1]] for i in range(polygon_count)]
+    return {'origin': (origin_x, origin_y), 'scale': scale, 'layers': layers}
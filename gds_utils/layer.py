@@ -1,15 +1,75 @@
-import os
+import klayout.db as db
 from .utils import logger
+from .mapping import collect_mapping, load_layer_mapping, save_layer_mapping
+
+def parse_layer_spec(spec):
+    """把图层描述解析为 (layer_num, datatype)
+
+    参数:
+        spec: [1, 0] / (1, 0) / "1/0" / 1（datatype 为 0）
+
+    返回:
+        tuple: (layer_num, datatype)
+
+    异常:
+        ValueError: 格式错误
+    """
+    try:
+        if isinstance(spec, str):
+            parts = spec.split('/')
+            if len(parts) == 1:
+                return int(parts[0]), 0
+            if len(parts) == 2:
+                return int(parts[0]), int(parts[1])
+        elif isinstance(spec, (list, tuple)) and len(spec) == 2:
+            return int(spec[0]), int(spec[1])
+        elif isinstance(spec, int) and not isinstance(spec, bool):
+            return spec, 0
+    except (TypeError, ValueError):
+        pass
+    raise ValueError(f"无法解析的图层: {spec!r}，应为 [layer, datatype]、\"layer/datatype\" 或整数")
+
 
 class LayerManager:
-    """管理 Layer 的映射和索引"""
+    """管理 Layer 的映射和索引
+
+    绑定 KLayout Layout 时作为整个版图共享的图层注册表：图层索引直接取自 layout.layer()，
+    每个 (layer_num, datatype) 只解析一次，之后按元组或名称 O(1) 查找。
+    """
     
-    def __init__(self):
+    def __init__(self, layout=None):
+        """初始化图层管理器
+        
+        参数:
+            layout: 绑定的 KLayout Layout，为 None 时自行分配索引
+        """
+        self.layout = layout
         self.layer_mapping = {}  # (layer_num, datatype) -> layer_name
         self.layer_indices = {}  # (layer_num, datatype) -> layer_index
+        self.layer_by_name = {}  # layer_name -> (layer_num, datatype)
         self.next_index = 0  # 用于分配新的索引
+        if layout is not None:
+            self._register_existing_layers()
         logger.debug("LayerManager 初始化")
 
+    def _register_existing_layers(self):
+        """登记版图中已有的图层（读取的输入文件），包括 OASIS/DXF 中的图层名称"""
+        for index in self.layout.layer_indexes():
+            info = self.layout.get_info(index)
+            layer_info = (info.layer, info.datatype)
+            self.layer_indices[layer_info] = index
+            if info.name:
+                self._set_name(layer_info, info.name)
+        if self.layer_indices:
+            self.next_index = max(self.layer_indices.values()) + 1
+
+    def _set_name(self, layer_info, layer_name):
+        old_name = self.layer_mapping.get(layer_info)
+        if old_name and self.layer_by_name.get(old_name) == layer_info:
+            del self.layer_by_name[old_name]
+        self.layer_mapping[layer_info] = layer_name
+        self.layer_by_name[layer_name] = layer_info
+
     def get_layer_index(self, layer_info):
         """获取图层索引，不存在则返回None
         
@@ -31,27 +91,78 @@ class LayerManager:
         返回:
             int: 图层索引
         """
+        layer_info = tuple(layer_info)
         # 检查图层是否已存在
         if layer_info in self.layer_indices:
             logger.warning(f"图层 {layer_info} 已存在，返回现有索引 {self.layer_indices[layer_info]}")
             # 更新图层名称（如果提供了新名称）
-            if layer_name and layer_info in self.layer_mapping and self.layer_mapping[layer_info] != layer_name:
-                logger.warning(f"更新图层名称: {self.layer_mapping[layer_info]} -> {layer_name}")
-                self.layer_mapping[layer_info] = layer_name
+            if layer_name and self.layer_mapping.get(layer_info) != layer_name:
+                logger.warning(f"更新图层名称: {self.layer_mapping.get(layer_info)} -> {layer_name}")
+                self._set_name(layer_info, layer_name)
             return self.layer_indices[layer_info]
         
-        # 创建新图层索引
-        layer_index = self.next_index
-        self.next_index += 1
+        # 创建新图层索引，绑定 Layout 时使用 KLayout 的图层索引
+        if self.layout is not None:
+            layer_index = self.layout.layer(db.LayerInfo(*layer_info))
+            self.next_index = max(self.next_index, layer_index + 1)
+        else:
+            layer_index = self.next_index
+            self.next_index += 1
         self.layer_indices[layer_info] = layer_index
         
         # 设置图层名称（如果提供）
         if layer_name:
-            self.layer_mapping[layer_info] = layer_name
+            self._set_name(layer_info, layer_name)
             
         logger.debug(f"创建图层: {layer_info} -> 索引 {layer_index}, 名称 {layer_name}")
         return layer_index
 
+    def ensure_layer(self, layer_info):
+        """获取图层索引，不存在时创建（不输出警告），供频繁插入使用
+        
+        参数:
+            layer_info: 图层信息元组 (layer_num, datatype)
+            
+        返回:
+            int: 图层索引
+        """
+        layer_index = self.layer_indices.get(layer_info)
+        if layer_index is None:
+            layer_index = self.create_layer(layer_info)
+        return layer_index
+
+    def get_layer_by_name(self, layer_name):
+        """按名称查找图层
+        
+        参数:
+            layer_name: 图层名称
+            
+        返回:
+            tuple | None: (layer_num, datatype)，不存在则返回None
+        """
+        return self.layer_by_name.get(layer_name)
+
+    def resolve(self, spec):
+        """把配置中的图层描述解析为 (layer_num, datatype)
+        
+        参数:
+            spec: 已登记的图层名称，或 parse_layer_spec 支持的格式
+            
+        返回:
+            tuple: (layer_num, datatype)
+            
+        异常:
+            ValueError: 既不是已知名称也无法解析
+        """
+        if isinstance(spec, str) and spec in self.layer_by_name:
+            return self.layer_by_name[spec]
+        try:
+            return parse_layer_spec(spec)
+        except ValueError:
+            if isinstance(spec, str):
+                raise ValueError(f"未知的图层名称: {spec}") from None
+            raise
+
     def get_layer_name(self, layer_info):
         """获取图层名称
         
@@ -72,59 +183,49 @@ class LayerManager:
         return {k: (v, self.layer_mapping.get(k)) 
                 for k, v in self.layer_indices.items()}
 
-    def save_mapping(self, output_file):
-        """保存图层映射到文件
-        
+    def update(self, layers):
+        """批量写入图层映射
+
+        参数:
+            layers: {(layer_num, datatype): (index, name)}，与 get_all_layers() 结构相同
+        """
+        for layer_info, (index, name) in layers.items():
+            if self.layout is not None:
+                # 绑定 Layout 时索引以 KLayout 为准，文件中的索引仅作参考
+                self.ensure_layer(layer_info)
+            else:
+                self.layer_indices[layer_info] = index
+            if name:
+                self._set_name(layer_info, name)
+        if self.layer_indices:
+            self.next_index = max(self.next_index, max(self.layer_indices.values()) + 1)
+
+    def save_mapping(self, output_file, fmt=None):
+        """保存图层映射到文件，格式与 GDS.save() 写出的映射文件相同
+
         参数:
             output_file: 输出文件路径
+            fmt: json / binary / text，缺省按扩展名判断
         """
-        if not self.layer_mapping:
+        if not self.layer_indices:
             logger.warning(f"没有图层映射需要保存到 {output_file}")
             return
-            
+
         try:
-            with open(output_file, 'w') as f:
-                f.write("# Layer Mapping\n")
-                f.write("# Format: layer_num datatype index name\n")
-                for layer_info, index in self.layer_indices.items():
-                    layer_num, datatype = layer_info
-                    name = self.layer_mapping.get(layer_info, "")
-                    f.write(f"{layer_num} {datatype} {index} {name}\n")
-            logger.info(f"图层映射已保存到 {output_file}")
-        except Exception as e:
+            save_layer_mapping(output_file, collect_mapping(self), fmt)
+        except (OSError, ValueError) as e:
             logger.error(f"保存图层映射失败: {e}")
 
-    def load_mapping(self, input_file):
+    def load_mapping(self, input_file, fmt=None):
         """从文件加载图层映射
-        
+
         参数:
             input_file: 输入文件路径
+            fmt: json / binary / text，缺省按扩展名判断
         """
-        if not os.path.exists(input_file):
-            logger.error(f"映射文件不存在: {input_file}")
-            return
-            
         try:
-            with open(input_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        layer_num = int(parts[0])
-                        datatype = int(parts[1])
-                        index = int(parts[2])
-                        name = parts[3] if len(parts) > 3 else None
-                        
-                        layer_info = (layer_num, datatype)
-                        self.layer_indices[layer_info] = index
-                        if name:
-                            self.layer_mapping[layer_info] = name
-                        
-                        # 更新下一个可用索引
-                        self.next_index = max(self.next_index, index + 1)
-                        
-            logger.info(f"已从 {input_file} 加载图层映射")
-        except Exception as e:
-            logger.error(f"加载图层映射失败: {e}") 
\ No newline at end of file
+            self.update(load_layer_mapping(input_file, fmt))
+        except (OSError, ValueError) as e:
+            logger.error(f"加载图层映射失败: {e}")
+            return
+        logger.info(f"已从 {input_file} 加载图层映射")
@@ -0,0 +1,203 @@
+import hashlib
+import itertools
+import os
+import threading
+from collections import OrderedDict
+import klayout.db as db
+from .utils import logger
+
+# 共享缓存的默认容量（MB），可通过环境变量 SUMMER_GDS_LAYOUT_CACHE_MB 修改，0 表示关闭
+DEFAULT_CACHE_MB = 512
+
+# 内容哈希记忆的最多条目数，超出时丢弃最久未用的
+MAX_DIGESTS = 1024
+
+# 估算版图内存占用: 每个图形/实例的固定开销，每个顶点 8 字节（两个 int32 坐标），
+# 每个单元格每个图层抽样多少个图形求平均顶点数
+_SHAPE_BYTES = 64
+_POINT_BYTES = 8
+_SAMPLE_SHAPES = 64
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _shape_points(shape):
+    if shape.is_polygon() or shape.is_simple_polygon():
+        return shape.polygon.num_points()
+    if shape.is_path():
+        return shape.path.num_points()
+    return 0
+
+
+def estimate_layout_bytes(layout):
+    """按图形数和顶点数估算已解析版图的内存占用
+
+    每个单元格每个图层的图形数直接取 Shapes.size()，顶点数按前 _SAMPLE_SHAPES 个图形的平均值外推，
+    不需要遍历全部图形。压缩格式（.gds.gz、OASIS CBLOCK）解析后的占用可能是文件大小的许多倍，
+    因此缓存预算按这个估算值而不是文件大小计。
+
+    参数:
+        layout: db.Layout
+
+    返回:
+        int: 估算的字节数
+    """
+    total = 0
+    layers = list(layout.layer_indexes())
+    for cell in layout.each_cell():
+        total += (1 + cell.child_instances()) * _SHAPE_BYTES
+        for layer_index in layers:
+            shapes = cell.shapes(layer_index)
+            count = shapes.size()
+            if not count:
+                continue
+            sample = [_shape_points(shape) for shape in itertools.islice(shapes.each(), _SAMPLE_SHAPES)]
+            total += count * (_SHAPE_BYTES + _POINT_BYTES * sum(sample) / len(sample))
+    return int(total)
+
+
+class LayoutCache:
+    """已解析版图的 LRU 缓存，按估算的内存占用（estimate_layout_bytes）淘汰
+
+    缓存项以 (内容哈希, 读取选项) 为键，内容哈希按 (路径, 大小, 修改时间) 记忆（最多 MAX_DIGESTS 条），
+    文件未变化时不会重新计算。每次 get() 返回基础版图的独立副本（Layout.dup()），
+    调用方可以随意修改而不影响缓存。
+
+    KLayout 没有写时复制的 Layout，dup() 仍是一次完整复制，但它是 C++ 内的内存拷贝，
+    比重新解析文件快数倍；同时缓存只保留一份基础版图，不随请求数增长。
+    """
+
+    def __init__(self, max_bytes):
+        """初始化缓存
+
+        参数:
+            max_bytes: 缓存容量（字节），以解析后版图的估算内存占用计
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (layout, nbytes)
+        self._digests = OrderedDict()   # (path, size, mtime_ns) -> sha256，LRU
+        self._lock = threading.Lock()
+        self._loading = {}              # key -> threading.Lock，同一文件只解析一次
+
+    def _digest(self, path):
+        stat = os.stat(path)
+        stat_key = (path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(stat_key)
+            if digest is not None:
+                self._digests.move_to_end(stat_key)
+                return digest
+        digest = file_digest(path)
+        with self._lock:
+            self._digests[stat_key] = digest
+            while len(self._digests) > MAX_DIGESTS:
+                self._digests.popitem(last=False)
+        return digest
+
+    def get(self, path, loader, options_key=(), copy=True):
+        """获取版图副本，未命中时调用 loader 解析
+
+        参数:
+            path: 输入文件路径
+            loader: loader(path) -> db.Layout，负责实际读取
+            options_key: 读取选项的可哈希表示，不同选项分别缓存
+            copy: False 时直接返回缓存中的版图，省去复制；调用方只能读取，不能修改
+
+        返回:
+            db.Layout: 可修改的独立副本（copy=False 时为共享的只读版图）
+        """
+        path = os.path.abspath(path)
+        key = (self._digest(path), options_key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0].dup() if copy else entry[0]
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # 其他线程可能已经完成解析
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0].dup() if copy else entry[0]
+                self.misses += 1
+            try:
+                layout = loader(path)
+                self._put(key, layout, estimate_layout_bytes(layout))
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return layout.dup() if copy else layout
+
+    def _put(self, key, layout, nbytes):
+        if nbytes > self.max_bytes:
+            logger.info(f"版图 {nbytes} 字节超过缓存容量 {self.max_bytes}，不缓存")
+            return
+        with self._lock:
+            self._entries[key] = (layout, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes and self._entries:
+                old_key, (_, old_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= old_bytes
+                logger.debug(f"淘汰缓存版图: {old_key[0][:12]}")
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """缓存统计
+
+        返回:
+            dict: entries, bytes, max_bytes, hits, misses
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_shared_cache = None
+
+
+def configure_shared_cache(max_mb=None):
+    """启用进程内共享的版图缓存（Web 服务启动时调用）
+
+    参数:
+        max_mb: 容量（MB），None 时读取环境变量 SUMMER_GDS_LAYOUT_CACHE_MB，0 表示关闭
+
+    返回:
+        LayoutCache | None: 共享缓存
+    """
+    global _shared_cache
+    if max_mb is None:
+        max_mb = float(os.environ.get('SUMMER_GDS_LAYOUT_CACHE_MB', DEFAULT_CACHE_MB))
+    _shared_cache = LayoutCache(int(max_mb * 1024 * 1024)) if max_mb > 0 else None
+    return _shared_cache
+
+
+def shared_cache():
+    """返回共享的版图缓存，未启用时为 None"""
+    return _shared_cache
@@ -0,0 +1,155 @@
+import json
+import os
+import struct
+import numpy as np
+from .utils import logger, atomic_write_path
+
+# 二进制格式: 头部 + 定长记录数组 + UTF-8 字符串表（以 \0 分隔）
+BINARY_MAGIC = b'SGLM'
+BINARY_VERSION = 1
+_HEADER = struct.Struct('<4sIII')  # magic, version, 记录数, 字符串表字节数
+_RECORD = np.dtype([('layer', '<i4'), ('datatype', '<i4'), ('index', '<i4'),
+                    ('name', '<i4')])  # name 为字符串表下标，-1 表示无名称
+
+_FORMAT_BY_EXTENSION = {'.json': 'json', '.bin': 'binary', '.lmap': 'binary'}
+
+
+def mapping_format(path, fmt=None):
+    """确定映射文件格式: json / binary / text，缺省按扩展名判断，未知扩展名为 text"""
+    if fmt:
+        if fmt not in ('json', 'binary', 'text'):
+            raise ValueError(f"不支持的图层映射格式: {fmt}")
+        return fmt
+    return _FORMAT_BY_EXTENSION.get(os.path.splitext(path)[1].lower(), 'text')
+
+
+def collect_mapping(layer_manager):
+    """汇总版图的图层映射
+
+    参数:
+        layer_manager: GDS 共享的 LayerManager
+
+    返回:
+        list: [(layer_num, datatype, index, name)]，按图层排序
+    """
+    return sorted((layer_num, datatype, index, name)
+                  for (layer_num, datatype), (index, name) in layer_manager.get_all_layers().items())
+
+
+def save_layer_mapping(path, records, fmt=None):
+    """把图层映射一次写入单个文件
+
+    参数:
+        path: 输出文件路径
+        records: collect_mapping() 的结果
+        fmt: json / binary / text，缺省按扩展名判断
+
+    返回:
+        str: 写入的文件路径
+    """
+    fmt = mapping_format(path, fmt)
+    with atomic_write_path(path) as temp_file:
+        if fmt == 'json':
+            _write_json(temp_file, records)
+        elif fmt == 'binary':
+            _write_binary(temp_file, records)
+        else:
+            _write_text(temp_file, records)
+    logger.info(f"图层映射已保存到 {path} ({fmt}, {len(records)} 条)")
+    return path
+
+
+def _write_json(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'fields': ['layer', 'datatype', 'index', 'name'],
+                   'layers': [list(record) for record in records]},
+                  f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _write_text(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Layer Mapping\n")
+        f.write("# Format: layer_num datatype index name\n")
+        f.writelines(f"{layer_num} {datatype} {index} {name or ''}".rstrip() + "\n"
+                     for layer_num, datatype, index, name in records)
+
+
+def _write_binary(path, records):
+    strings = {}
+
+    def string_id(value):
+        if value is None:
+            return -1
+        return strings.setdefault(value, len(strings))
+
+    array = np.array([(l, d, i, string_id(n)) for l, d, i, n in records], dtype=_RECORD)
+    table = '\0'.join(strings).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(array), len(table)))
+        f.write(array.tobytes())
+        f.write(table)
+
+
+def load_layer_mapping(path, fmt=None):
+    """加载图层映射文件，一次遍历建立查找表
+
+    参数:
+        path: 映射文件路径
+        fmt: json / binary / text，缺省按扩展名判断
+
+    返回:
+        dict: {(layer_num, datatype): (index, name)}，与 LayerManager.get_all_layers() 结构相同
+
+    异常:
+        ValueError: 文件格式错误
+    """
+    fmt = mapping_format(path, fmt)
+    if fmt == 'json':
+        return _read_json(path)
+    if fmt == 'binary':
+        return _read_binary(path)
+    return _read_text(path)
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    try:
+        return {(int(l), int(d)): (int(i), n) for l, d, i, n in data['layers']}
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"图层映射 JSON 格式错误: {e}") from e
+
+
+def _read_text(path):
+    index = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split(maxsplit=3)  # 名称中允许空格
+            if len(parts) < 3:
+                raise ValueError(f"图层映射第 {line_no} 行格式错误: {line}")
+            try:
+                index[(int(parts[0]), int(parts[1]))] = (int(parts[2]), parts[3] if len(parts) > 3 else None)
+            except ValueError as e:
+                raise ValueError(f"图层映射第 {line_no} 行格式错误: {line}") from e
+    return index
+
+
+def _read_binary(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError("图层映射二进制文件过短")
+    magic, version, count, table_size = _HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("不是有效的图层映射二进制文件")
+    if len(data) != _HEADER.size + count * _RECORD.itemsize + table_size:
+        raise ValueError("图层映射二进制文件长度不匹配")
+    array = np.frombuffer(data, dtype=_RECORD, count=count, offset=_HEADER.size)
+    table = data[_HEADER.size + count * _RECORD.itemsize:].decode('utf-8')
+    strings = table.split('\0') if table_size else []
+
+    return {(layer_num, datatype): (layer_index, strings[name_id] if name_id >= 0 else None)
+            for layer_num, datatype, layer_index, name_id in array.tolist()}
@@ -0,0 +1,232 @@
+import io
+import math
+import time
+import numpy as np
+import klayout.db as db
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgb
+from matplotlib.figure import Figure
+from .gds import read_layout_shared
+from .utils import logger
+
+DEFAULT_SIZE = 800
+MAX_SIZE = 4096
+IMAGE_FORMATS = ('png', 'svg')
+# 包围框小于该像素数的多边形按像素栅格化，不再逐个绘制
+MIN_FEATURE_PIXELS = 2
+LAYER_ALPHA = 0.6
+TILE_SIZE = 256
+LAYER_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+                '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+
+def view_cells(layout, cell_name=None):
+    """要显示的单元格: 指定的单元格，或全部顶层单元格"""
+    if cell_name:
+        cell = layout.cell(cell_name)
+        if cell is None:
+            raise ValueError(f"单元格不存在: {cell_name}")
+        return [cell]
+    return list(layout.top_cells())
+
+
+def decimate_region(region, pixel):
+    """按屏幕分辨率简化一个图层（细节层次）
+
+    参数:
+        region: 展平后的 db.Region
+        pixel: 一个像素对应的长度（数据库单位，整数）
+
+    返回:
+        tuple: (outlines, details)
+            outlines: 包围框不小于 MIN_FEATURE_PIXELS 像素的多边形，按一个像素的容差平滑，
+                      密集的圆弧顶点减少到屏幕分辨率，按矢量绘制；
+            details: 更小的多边形，只需按像素栅格化（见 coverage），数量再多也不增加绘制的图形数
+    """
+    limit = pixel * MIN_FEATURE_PIXELS
+    # 按存储的多边形筛选和平滑，平滑后顶点少得多时再合并（合并原始的大量顶点是主要开销）
+    region.merged_semantics = False
+    details, outlines = region.split_with_bbox_max(None, limit)
+    region.merged_semantics = True
+    outlines.merged_semantics = False
+    return outlines.smoothed(pixel, True).merged(), details
+
+
+def coverage(region, origin, pixel, width, height):
+    """区域在每个像素中的覆盖比例
+
+    参数:
+        region: db.Region
+        origin: 栅格左下角（db.Point，数据库单位）
+        pixel: 像素边长（数据库单位）
+        width, height: 像素数
+
+    返回:
+        numpy.ndarray: 形状为 (height, width) 的 0~1 数组，第 0 行在最下方
+    """
+    areas = np.array(region.rasterize(origin, db.Vector(pixel, pixel), width, height), dtype=float)
+    return np.clip(areas / (pixel * pixel), 0.0, 1.0)
+
+
+def layer_region(layout, cells, index, box=None):
+    """把若干单元格（包含子单元格）某一图层的图形展平为一个 Region
+
+    参数:
+        box: 只取与该 db.Box 接触的图形（按空间索引查询，不裁剪），None 表示全部
+    """
+    region = db.Region()
+    for cell in cells:
+        region.insert(cell.begin_shapes_rec(index) if box is None else cell.begin_shapes_rec_touching(index, box))
+    return region
+
+
+def _polygon_arrays(region, dbu):
+    """区域中每个多边形的顶点数组（微米）；带孔的多边形用切线连接孔，填充时不显示切线"""
+    arrays = []
+    for polygon in region.each():
+        if polygon.holes():
+            polygon = polygon.resolved_holes()
+        arrays.append(np.array([(p.x, p.y) for p in polygon.each_point_hull()], dtype=float) * dbu)
+    return arrays
+
+
+def render_preview(layout, cell_name=None, width=DEFAULT_SIZE, height=DEFAULT_SIZE, image_format='png'):
+    """把版图渲染为 PNG 或 SVG 预览图
+
+    参数:
+        layout: KLayout Layout 对象
+        cell_name: 预览的单元格，None 时为全部顶层单元格（包含子单元格）
+        width, height: 图像尺寸（像素），不超过 MAX_SIZE
+        image_format: png 或 svg
+
+    返回:
+        bytes: 图像数据
+
+    异常:
+        ValueError: 单元格不存在、尺寸或格式非法
+    """
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"不支持的预览格式: {image_format}，可选 {', '.join(IMAGE_FORMATS)}")
+    if not (0 < width <= MAX_SIZE and 0 < height <= MAX_SIZE):
+        raise ValueError(f"预览尺寸应在 1 到 {MAX_SIZE} 像素之间: {width}x{height}")
+
+    start = time.perf_counter()
+    cells = view_cells(layout, cell_name)
+    bbox = _cells_bbox(cells)
+    view = pixel = None
+    if not bbox.empty():
+        # 等比例缩放，较长的一边占满图像；像素取整数个数据库单位，栅格与坐标轴对齐
+        pixel = max(1, math.ceil(max(bbox.width() / width, bbox.height() / height)))
+        center = bbox.center()
+        origin = db.Point(center.x - pixel * width // 2, center.y - pixel * height // 2)
+        view = db.Box(origin, origin + db.Vector(pixel * width, pixel * height))
+    data, vertices = _render_view(layout, cells, view, pixel, width, height, image_format)
+    logger.info(f"渲染预览 {width}x{height} {image_format}: {vertices} 个顶点，"
+                f"耗时 {time.perf_counter() - start:.3f}s")
+    return data
+
+
+def _cells_bbox(cells):
+    bbox = db.Box()
+    for cell in cells:
+        bbox += cell.bbox()
+    return bbox
+
+
+def _render_view(layout, cells, view, pixel, width, height, image_format, clip=False):
+    """把 view（数据库单位的 db.Box，等于 pixel * (width, height)）渲染为图像
+
+    参数:
+        clip: 只取与视图接触的图形并按视图（外扩两个像素，避免平滑在边界处产生缝隙）裁剪，用于瓦片
+
+    返回:
+        tuple: (图像数据, 绘制的矢量顶点数)
+    """
+    figure = Figure(figsize=(width / 100, height / 100), dpi=100)
+    axes = figure.add_axes((0, 0, 1, 1))
+    axes.set_axis_off()
+    vertices = 0
+    if view is not None:
+        dbu = layout.dbu
+        extent = [view.left * dbu, view.right * dbu, view.bottom * dbu, view.top * dbu]
+        axes.set_xlim(extent[0], extent[1])
+        axes.set_ylim(extent[2], extent[3])
+        query = view.enlarged(2 * pixel, 2 * pixel) if clip else None
+        indexes = sorted(layout.layer_indexes(),
+                         key=lambda i: (layout.get_info(i).layer, layout.get_info(i).datatype))
+        for n, index in enumerate(indexes):
+            region = layer_region(layout, cells, index, query)
+            if query is not None and not region.is_empty():
+                region &= db.Region(query)
+            if region.is_empty():
+                continue
+            color = LAYER_COLORS[n % len(LAYER_COLORS)]
+            outlines, details = decimate_region(region, pixel)
+            if not details.is_empty():
+                # 小图形至少占一个像素，与矢量部分使用相同的颜色和透明度
+                image = np.zeros((height, width, 4))
+                image[..., :3] = to_rgb(color)
+                image[..., 3] = np.where(coverage(details, view.p1, pixel, width, height) > 0, LAYER_ALPHA, 0.0)
+                axes.imshow(image, extent=extent, origin='lower', interpolation='nearest', aspect='auto')
+            arrays = _polygon_arrays(outlines, dbu)
+            vertices += sum(len(array) for array in arrays)
+            axes.add_collection(PolyCollection(arrays, facecolors=color, edgecolors='none', alpha=LAYER_ALPHA))
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=image_format)
+    return buffer.getvalue(), vertices
+
+
+def tile_grid(layout, cell_name=None, tile_size=TILE_SIZE):
+    """瓦片金字塔的划分
+
+    第 0 级是覆盖整个版图的一个正方形瓦片，第 z 级有 2^z x 2^z 个瓦片（y 从上往下编号，与常见地图瓦片一致）。
+    最高级别的一个像素恰好是一个数据库单位，因此每一级的像素边长都是整数 2^(max_zoom - z) 个数据库单位。
+
+    返回:
+        dict: {"origin": 左下角 (x, y)（数据库单位）, "extent": 第 0 级瓦片边长（数据库单位）,
+               "max_zoom": 最高级别, "tile_size": 瓦片像素数}
+
+    异常:
+        ValueError: 单元格不存在
+    """
+    bbox = _cells_bbox(view_cells(layout, cell_name))
+    if bbox.empty():
+        bbox = db.Box(0, 0, 1, 1)
+    side = max(bbox.width(), bbox.height(), 1)
+    max_zoom = max(0, math.ceil(math.log2(side / tile_size)))
+    return {'origin': (bbox.left, bbox.bottom), 'extent': tile_size * 2 ** max_zoom,
+            'max_zoom': max_zoom, 'tile_size': tile_size}
+
+
+def render_tile(layout, z, x, y, cell_name=None, tile_size=TILE_SIZE, grid=None):
+    """渲染瓦片金字塔中的一个 PNG 瓦片
+
+    只取与瓦片接触的图形并用 KLayout 裁剪，渲染时间与瓦片内的图形量相关，与版图总大小无关。
+
+    参数:
+        layout: KLayout Layout 对象（只读）
+        z, x, y: 级别和瓦片编号
+        grid: tile_grid 的结果，None 时重新计算
+
+    返回:
+        bytes: PNG 数据
+
+    异常:
+        ValueError: 级别或编号超出范围
+    """
+    grid = grid or tile_grid(layout, cell_name, tile_size)
+    if not (0 <= z <= grid['max_zoom'] and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise ValueError(f"瓦片超出范围: {z}/{x}/{y}（最高级别 {grid['max_zoom']}）")
+    pixel = 2 ** (grid['max_zoom'] - z)
+    side = tile_size * pixel
+    left = grid['origin'][0] + x * side
+    bottom = grid['origin'][1] + grid['extent'] - (y + 1) * side
+    view = db.Box(left, bottom, left + side, bottom + side)
+    data, _ = _render_view(layout, view_cells(layout, cell_name), view, pixel, tile_size, tile_size, 'png', clip=True)
+    return data
+
+
+def render_preview_file(path, **kwargs):
+    """读取版图文件并渲染预览图，参数见 render_preview"""
+    return render_preview(read_layout_shared(path), **kwargs)
@@ -0,0 +1,200 @@
+import contextvars
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from .utils import logger, atomic_write_path
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，此时不记录内存
+    resource = None
+
+# 当前上下文中生效的 Profiler，未开启分析时为 None
+_current_profiler = contextvars.ContextVar("gds_profiler", default=None)
+
+
+_STATM_FILE = "/proc/self/statm"
+_PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else None
+
+
+def _current_rss_kb():
+    """当前常驻内存（KB），包含 KLayout 的 C++ 分配；只在有 /proc 的系统（Linux）上可用，否则为 None"""
+    if _PAGE_KB is None:
+        return None
+    try:
+        with open(_STATM_FILE, "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_KB
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss_kb():
+    """进程整个生命周期的峰值常驻内存（KB），只在报告总计中给出
+
+    长期运行的 Web 服务中它反映的是之前所有请求的最高值，不能用于比较阶段或形状。
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 上 ru_maxrss 单位为字节，Linux 上为 KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _rss_delta(start, end):
+    return None if start is None or end is None else end - start
+
+
+class _Stats:
+    __slots__ = ("count", "wall", "cpu", "rss_delta_kb")
+
+    def __init__(self):
+        self.count = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rss_delta_kb = None
+
+    def add(self, wall, cpu, rss_delta_kb):
+        self.count += 1
+        self.wall += wall
+        self.cpu += cpu
+        if rss_delta_kb is not None:
+            self.rss_delta_kb = (self.rss_delta_kb or 0) + rss_delta_kb
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "rss_delta_kb": self.rss_delta_kb,
+        }
+
+
+class Profiler:
+    """按阶段和形状记录墙钟时间、CPU 时间和常驻内存的变化
+
+    阶段通过模块级的 profile_stage() 上报，只有在 activate() 之后才会记录，
+    未开启时 profile_stage() 几乎没有开销。
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.shapes = []
+        self._shape = None
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._start_rss = _current_rss_kb()
+
+    @contextmanager
+    def activate(self):
+        """在当前上下文中启用该 Profiler"""
+        token = _current_profiler.set(self)
+        try:
+            yield self
+        finally:
+            _current_profiler.reset(token)
+
+    def start_shape(self, name):
+        """开始记录一个新形状，自动结束上一个形状"""
+        self.end_shape()
+        self._shape = {
+            "name": name,
+            "stages": {},
+            "wall_start": time.perf_counter(),
+            "cpu_start": time.process_time(),
+            "rss_start": _current_rss_kb(),
+        }
+
+    def end_shape(self):
+        """结束当前形状的记录"""
+        if self._shape is None:
+            return
+        shape = self._shape
+        self._shape = None
+        self.shapes.append({
+            "name": shape["name"],
+            "wall": round(time.perf_counter() - shape["wall_start"], 6),
+            "cpu": round(time.process_time() - shape["cpu_start"], 6),
+            "rss_delta_kb": _rss_delta(shape["rss_start"], _current_rss_kb()),
+            "stages": {k: v.to_dict() for k, v in shape["stages"].items()},
+        })
+
+    @contextmanager
+    def stage(self, name):
+        """记录一个阶段，阶段应为叶子级（不要嵌套相同的统计范围）"""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        rss_start = _current_rss_kb()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            rss = _rss_delta(rss_start, _current_rss_kb())
+            self.stages.setdefault(name, _Stats()).add(wall, cpu, rss)
+            if self._shape is not None:
+                self._shape["stages"].setdefault(name, _Stats()).add(wall, cpu, rss)
+
+    def report(self):
+        """生成可序列化为 JSON 的报告"""
+        self.end_shape()
+        return {
+            "total": {
+                "wall": round(time.perf_counter() - self._start_wall, 6),
+                "cpu": round(time.process_time() - self._start_cpu, 6),
+                "rss_delta_kb": _rss_delta(self._start_rss, _current_rss_kb()),
+                "process_peak_rss_kb": _peak_rss_kb(),
+            },
+            "stages": {k: v.to_dict() for k, v in self.stages.items()},
+            "shapes": self.shapes,
+        }
+
+    def save(self, output_file):
+        """把报告写入 JSON 文件
+
+        返回:
+            dict: 写入的报告
+        """
+        report = self.report()
+        with atomic_write_path(output_file) as temp_file, open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"性能分析报告已保存: {output_file}")
+        return report
+
+
+@contextmanager
+def profile_stage(name):
+    """在当前生效的 Profiler 中记录一个阶段，未开启分析时不做任何事"""
+    profiler = _current_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+def profiled(name):
+    """把整个函数调用记录为一个阶段的装饰器"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _current_profiler.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_profiler():
+    """返回当前上下文中生效的 Profiler，未开启时返回 None"""
+    return _current_profiler.get()
+
+
+def profile_report_path(output_file):
+    """性能分析报告的路径: 与输出文件同目录，<basename>.profile.json"""
+    from .gds import sidecar_path  # gds 导入本模块，延迟导入避免循环
+    return sidecar_path(output_file, '.profile.json')
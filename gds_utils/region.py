@@ -2,9 +2,18 @@ import klayout.db as db
 import numpy as np
 import math
 from .frame import Frame
-from .utils import logger, um_to_db
+from .utils import logger
+from .profiler import profile_stage
+from .events import report_progress
 from typing import Union, List
 
+
+def _to_dpoints(vertices):
+    """把顶点（元组列表或 (N, 2) 数组）批量转换为 KLayout 点，取整规则与 um_to_db 相同（乘 1000 后向零截断）"""
+    coords = (np.asarray(vertices, dtype=np.float64) * 1000).astype(np.int64)
+    return [db.DPoint(x, y) for x, y in coords.tolist()]
+
+
 class Region:
     """封装 KLayout Region 对象的类，用于创建和操作多边形区域"""
     
@@ -120,9 +129,8 @@ class Region:
             # 确保帧是逆时针的，这对于某些倒角逻辑（如凹凸判断）可能很重要
             # Frame的倒角方法内部似乎没有强制，但作为最佳实践，在这里处理
             # 注意: apply_arc_fillet/apply_adaptive_fillet 返回新的Frame实例
-            original_vertices_before_ccw_check = processed_frame.get_vertices() # 备份，以防万一
-            processed_frame.ensure_counterclockwise() 
-            if processed_frame.get_vertices() != original_vertices_before_ccw_check:
+            if processed_frame.is_clockwise():
+                processed_frame.ensure_counterclockwise()
                 logger.debug("Frame 顶点已转换为逆时针顺序")
 
             if fillet_type == "arc":
@@ -182,18 +190,19 @@ class Region:
         # 获取顶点列表 (可能已经过倒角处理)
         vertices = processed_frame.get_vertices()
         
-        if not vertices or len(vertices) < 3:
+        if len(vertices) < 3:
             logger.error(f"顶点数量不足 ({len(vertices)}) 无法创建多边形。原始Frame顶点数: {len(frame.get_vertices())}")
             return cls() # 返回空 Region
         
         # 转换为 KLayout 点列表
         try:
-            dpoints = [db.DPoint(um_to_db(x), um_to_db(y)) for x, y in vertices]
-            logger.debug(f"dpoints数量: {len(dpoints)}")
-            dpolygon = db.DPolygon(dpoints)
-            
-            result = cls()
-            result.kdb_region = db.Region(dpolygon)
+            with profile_stage("region"):
+                dpoints = _to_dpoints(vertices)
+                logger.debug(f"dpoints数量: {len(dpoints)}")
+                dpolygon = db.DPolygon(dpoints)
+                
+                result = cls()
+                result.kdb_region = db.Region(dpolygon)
 
             return result
         except Exception as e:
@@ -329,6 +338,7 @@ class Region:
                 logger.info(f"外边界无需倒角，skip。。。。。。")
             
             processed_outer_frames.append(processed_frame)
+            report_progress('rings', i + 1, len(outer_frames), 'fillet_outer')
         
         # 内边界倒角
         for processed_frame in inner_frames:
@@ -350,40 +360,44 @@ class Region:
                         processed_frame = processed_frame.apply_adaptive_fillet(convex_radius, concave_radius, precision, interactive)
             
             processed_inner_frames.append(processed_frame)
+            report_progress('rings', len(processed_inner_frames), len(inner_frames), 'fillet_inner')
 
         # 3. 创建最终的Region
         result_region = cls()
         
         # 使用处理后的内外边界创建环
-        for i in range(len(processed_outer_frames)):
-            if i >= len(processed_inner_frames):
-                break
-                
-            outer_frame = processed_outer_frames[i]
-            inner_frame = processed_inner_frames[i]
-            
-            # 获取顶点
-            outer_vertices = outer_frame.get_vertices()
-            inner_vertices = inner_frame.get_vertices()
-            
-            if not outer_vertices or len(outer_vertices) < 3 or not inner_vertices or len(inner_vertices) < 3:
-                logger.error(f"环 {i + 1}: 内外边界顶点数量不足 (外: {len(outer_vertices)}, 内: {len(inner_vertices)})。跳过此环。")
-                continue
-            
-            # 创建DPolygon
-            outer_dpoints = [db.DPoint(um_to_db(x), um_to_db(y)) for x, y in outer_vertices]
-            inner_dpoints = [db.DPoint(um_to_db(x), um_to_db(y)) for x, y in inner_vertices]
-            
-            outer_dpoly = db.DPolygon(outer_dpoints)
-            inner_dpoly = db.DPolygon(inner_dpoints)
-            
-            # 创建Region并执行布尔运算
-            outer_region = db.Region(outer_dpoly)
-            inner_region = db.Region(inner_dpoly)
-            ring_region = outer_region - inner_region
-            
-            # 合并到结果
-            result_region.kdb_region += ring_region
+        ring_count = min(len(processed_outer_frames), len(processed_inner_frames))
+        for i in range(ring_count):
+            # 跳过的环同样计入进度，保证最后一定报告 done == total
+            try:
+                outer_frame = processed_outer_frames[i]
+                inner_frame = processed_inner_frames[i]
+
+                # 获取顶点
+                outer_vertices = outer_frame.get_vertices()
+                inner_vertices = inner_frame.get_vertices()
+
+                if len(outer_vertices) < 3 or len(inner_vertices) < 3:
+                    logger.error(f"环 {i + 1}: 内外边界顶点数量不足 (外: {len(outer_vertices)}, 内: {len(inner_vertices)})。跳过此环。")
+                    continue
+
+                # 创建DPolygon
+                with profile_stage("region"):
+                    outer_dpoints = _to_dpoints(outer_vertices)
+                    inner_dpoints = _to_dpoints(inner_vertices)
+
+                    outer_dpoly = db.DPolygon(outer_dpoints)
+                    inner_dpoly = db.DPolygon(inner_dpoints)
+
+                    outer_region = db.Region(outer_dpoly)
+                    inner_region = db.Region(inner_dpoly)
+
+                # 执行布尔运算并合并到结果
+                with profile_stage("boolean"):
+                    ring_region = outer_region - inner_region
+                    result_region.kdb_region += ring_region
+            finally:
+                report_progress('rings', i + 1, ring_count, 'boolean')
 
         logger.info(f"已完成环的处理和合并，创建了 {len(processed_outer_frames)} 个环")
         
@@ -412,7 +426,8 @@ class Region:
         inner_region = cls.create_polygon(frame, fillet_config, inner_zoom)
         
         # 使用布尔减法得到via环
-        result = outer_region - inner_region
+        with profile_stage("boolean"):
+            result = outer_region - inner_region
         
         logger.info("via结构创建完成")
         return result 
\ No newline at end of file
@@ -0,0 +1,85 @@
+import json
+import klayout.db as db
+from .utils import logger, atomic_write_path
+
+
+def layer_summary(region, dbu):
+    """一个图层的统计
+
+    多边形数、顶点数（边数）、面积和包围框由 KLayout 在 C++ 中计算；
+    单个多边形的最大顶点数没有原生接口，按多边形（而不是按顶点）遍历一次。
+
+    参数:
+        region: 展平后的 db.Region
+        dbu: 数据库单位
+
+    返回:
+        dict: polygons, vertices, max_vertices, area（平方微米，重叠部分只计一次）, bbox（微米）
+    """
+    region.merged_semantics = False  # 统计实际存储的多边形，而不是合并后的结果
+    polygons = region.count()
+    vertices = region.edges().count()
+    max_vertices = max((polygon.num_points() for polygon in region.each()), default=0)
+    region.merged_semantics = True
+    bbox = region.bbox()
+    return {
+        'polygons': polygons,
+        'vertices': vertices,
+        'max_vertices': max_vertices,
+        'area': region.area() * dbu * dbu,
+        'bbox': [bbox.left * dbu, bbox.bottom * dbu, bbox.right * dbu, bbox.top * dbu],
+    }
+
+
+def layout_summary(layout, cell_name=None):
+    """按图层汇总版图统计，包含子单元格（展平计算）
+
+    参数:
+        layout: KLayout Layout 对象
+        cell_name: 统计的单元格，None 时统计全部顶层单元格
+
+    返回:
+        dict: {"cells": [...], "layers": {"layer/datatype": layer_summary}, "total": {...}}
+
+    异常:
+        ValueError: 单元格不存在
+    """
+    if cell_name:
+        cell = layout.cell(cell_name)
+        if cell is None:
+            raise ValueError(f"单元格不存在: {cell_name}")
+        cells = [cell]
+    else:
+        cells = list(layout.top_cells())
+
+    layers = {}
+    for index in sorted(layout.layer_indexes(),
+                        key=lambda i: (layout.get_info(i).layer, layout.get_info(i).datatype)):
+        region = db.Region()
+        for cell in cells:
+            region.insert(cell.begin_shapes_rec(index))
+        if region.is_empty():
+            continue
+        info = layout.get_info(index)
+        layers[f"{info.layer}/{info.datatype}"] = layer_summary(region, layout.dbu)
+
+    total = {
+        'polygons': sum(layer['polygons'] for layer in layers.values()),
+        'vertices': sum(layer['vertices'] for layer in layers.values()),
+        'max_vertices': max((layer['max_vertices'] for layer in layers.values()), default=0),
+    }
+    return {'cells': [cell.name for cell in cells], 'layers': layers, 'total': total}
+
+
+def summary_report_path(output_file):
+    """统计报告的路径: 与输出文件同目录，<basename>.summary.json"""
+    from .gds import sidecar_path  # gds 导入本模块，延迟导入避免循环
+    return sidecar_path(output_file, '.summary.json')
+
+
+def save_summary(summary, path):
+    """把统计写入 JSON 文件"""
+    with atomic_write_path(path) as temp_file, open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    logger.info(f"版图统计已保存: {path}")
+    return path
@@ -1,5 +1,8 @@
+import ast
 import logging
 import os
+import uuid
+from contextlib import contextmanager
 
 # 初始化全局logger变量
 logger = logging.getLogger("gds_utils")
@@ -36,4 +39,80 @@ def setup_logging(show_log=True):
 
 def um_to_db(v):
     """单位转换函数（微米转数据库单位）"""
-    return int(float(v) * 1000) 
\ No newline at end of file
+    return int(float(v) * 1000) 
+
+def _ring_index(bound, rule):
+    """把规则的起始/结束环转换为整数，YAML 或表单中的 5.0 这类整数值浮点也可接收"""
+    if isinstance(bound, bool) or not isinstance(bound, (int, float)) or not float(bound).is_integer():
+        raise ValueError(f"规则{rule}格式错误，起始环和结束环必须为整数: {bound!r}")
+    return int(bound)
+
+
+def parse_ring_rule(value, inclusive=True):
+    """解析 ring_width / ring_space 配置
+
+    支持的输入:
+        单个数值，或其字符串形式，如 2 或 "2"
+        数值元组/列表，如 "(1, 2, 3)"，表示每个环单独指定
+        规则列表，如 "[(1, 5, 3), (6, 11, 2)]"，每条规则为 (起始环, 结束环, 值)
+
+    参数:
+        value: 原始配置值
+        inclusive: 规则的结束环是否包含在内（ring_width 为 True，ring_space 为 False）
+
+    返回:
+        float | list: 单一值或每个环的值列表
+
+    异常:
+        ValueError: 输入格式错误
+    """
+    try:
+        rule = ast.literal_eval(value) if isinstance(value, str) else value
+    except (ValueError, SyntaxError):
+        raise ValueError(f"无法解析输入: {value!r}") from None
+
+    if isinstance(rule, bool):
+        raise ValueError(f"输入格式错误，只能接收list或tuple或int/float，当前类型: {type(rule)}")
+    if isinstance(rule, (int, float)):
+        return float(rule)
+    if not isinstance(rule, (list, tuple)) or len(rule) == 0:
+        raise ValueError(f"输入格式错误，只能接收list或tuple或int/float，当前类型: {type(rule)}")
+
+    if isinstance(rule[0], (tuple, list)):
+        # 规则列表: 每个元素必须是 (起始环, 结束环, 值)
+        values = []
+        for item in rule:
+            if not isinstance(item, (tuple, list)) or len(item) != 3:
+                raise ValueError(f"规则{rule}格式错误，每条规则必须为tuple，且长度为3")
+            start, end = (_ring_index(bound, rule) for bound in item[:2])
+            count = end - start + (1 if inclusive else 0)
+            values += [item[2]] * count
+        return values
+
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in rule):
+        raise ValueError(f"输入格式错误，列表元素必须为数值: {rule}")
+    return list(rule)
+
+
+@contextmanager
+def atomic_write_path(output_file):
+    """先写入同目录下的临时文件，成功后原子替换为目标文件
+
+    临时文件名保留原文件名作为后缀（如 .gz），KLayout 等按扩展名判断压缩方式的写入器不受影响。
+    写入过程中出错时删除临时文件，目标文件保持原样，不会留下截断的文件。
+
+    参数:
+        output_file: 目标文件路径
+
+    返回:
+        str: 应当写入的临时文件路径
+    """
+    output_dir, name = os.path.split(os.path.abspath(output_file))
+    temp_file = os.path.join(output_dir, f".tmp-{uuid.uuid4().hex}-{name}")
+    try:
+        yield temp_file
+        os.replace(temp_file, output_file)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
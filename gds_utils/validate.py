@@ -0,0 +1,378 @@
+import math
+import time
+import numpy as np
+from .estimate import shape_vertices
+from .layer import parse_layer_spec
+from .vertices import ensure_counterclockwise
+from .utils import logger, parse_ring_rule
+
+# 与 Frame._apply_arc_fillet_internal 一致：切点距离超过较短邻边的 0.8 倍时抛出 ValueError，
+# 超过一半时交互模式询问是否缩小半径，非交互模式按原半径倒角
+FILLET_ERROR_RATIO = 0.8
+FILLET_WARNING_RATIO = 0.5
+MAX_REPORTED_VERTICES = 50  # 每条诊断最多列出的顶点序号
+
+
+def corner_geometry(vertices):
+    """逐顶点计算倒角和偏移需要的几何量（向量化），与偏移量无关的部分只算一次
+
+    参数:
+        vertices: (N, 2) 逆时针顶点数组
+
+    返回:
+        dict: edge 第 i 条边（顶点 i 到 i+1）的长度, growth 该边每单位偏移的长度变化
+              （两端外角一半的正切之和，Frame.offset 为斜接偏移）, convex 是否凸角,
+              tan_half 顶点内角一半的正切, corner 角度未退化、倒角时会处理的顶点
+    """
+    pts = np.asarray(vertices, dtype=np.float64)
+    edge_vec = np.roll(pts, -1, axis=0) - pts
+    prev_vec = np.roll(edge_vec, 1, axis=0)
+    cross = prev_vec[:, 0] * edge_vec[:, 1] - prev_vec[:, 1] * edge_vec[:, 0]
+    dot = np.einsum('ij,ij->i', prev_vec, edge_vec)
+    turn = np.arctan2(cross, dot)  # 外角，凸角为正
+    wedge = math.pi - np.abs(turn)
+    turn_tan = np.tan(turn / 2)
+    return {
+        'edge': np.hypot(edge_vec[:, 0], edge_vec[:, 1]),
+        'growth': turn_tan + np.roll(turn_tan, -1),
+        'convex': cross > 0,
+        'tan_half': np.tan(wedge / 2),
+        'corner': (wedge >= 1e-6) & (np.abs(wedge - math.pi) >= 1e-6),
+    }
+
+
+def offset_edges(geometry, offset):
+    """按 Frame.offset 偏移 offset 后每条边的有向长度，小于等于 0 表示该边翻转（多边形自相交）"""
+    return geometry['edge'] + offset * geometry['growth']
+
+
+def fillet_ratios(geometry, offset, convex_radius, concave_radius):
+    """偏移后的边界按给定半径倒角时，每个顶点的切点距离与较短邻边之比（向量化）
+
+    参数:
+        geometry: corner_geometry 的结果
+        offset: 边界相对原始顶点的偏移量
+        convex_radius, concave_radius: 凸角/凹角半径，数值或长度为 N 的数组
+
+    返回:
+        np.ndarray: 每个顶点的比值，不倒角（半径 <= 0 或角度退化）的顶点为 0
+    """
+    length = np.abs(offset_edges(geometry, offset))
+    adjacent = np.minimum(length, np.roll(length, 1))
+    radius = np.where(geometry['convex'], convex_radius, concave_radius)
+    valid = geometry['corner'] & (radius > 0) & (adjacent >= 1e-9)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = radius / (geometry['tan_half'] * adjacent)
+    return np.where(valid, ratio, 0.0)
+
+
+def _issue(level, code, message, boundary=None, vertices=None):
+    issue = {'level': level, 'code': code, 'message': message}
+    if boundary is not None:
+        issue['boundary'] = boundary
+    if vertices is not None:
+        issue['count'] = int(len(vertices))
+        issue['vertices'] = [int(i) for i in vertices[:MAX_REPORTED_VERTICES]]
+    return issue
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _radii(value, n):
+    """半径配置转为数组，列表长度与顶点数不一致时返回 None（构建时跳过倒角）"""
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value, dtype=np.float64) if len(value) == n else None
+    return float(value)
+
+
+def _polygon_fillet(fillet, zoom, n):
+    """Region.create_polygon 对一条边界使用的 (凸角半径, 凹角半径, 诊断)，不倒角时半径为 None"""
+    fillet_type = fillet.get('type')
+    zoom = zoom if _is_number(zoom) else 0
+    if fillet_type == 'arc':
+        if 'radius_list' in fillet or 'radii' in fillet:
+            radius = fillet.get('radius_list', fillet.get('radii'))
+        else:
+            radius = fillet.get('radius', 0)
+        if not isinstance(radius, (list, tuple)) and not _is_number(radius):
+            return None, None, _issue('error', 'fillet_radius', f"倒角半径应为数值或列表: {radius!r}")
+        if not np.any(np.asarray(radius, dtype=np.float64)):
+            return None, None, None
+        values = _radii(radius, n)
+        if values is None:
+            return None, None, _issue('warning', 'radius_list_length',
+                                      f"半径列表长度({len(radius)})与顶点数({n})不一致，构建时不倒角")
+        # 缩放后凸角半径随外扩增大、凹角半径减小；不缩放时所有顶点使用同一半径
+        return values + zoom, values - zoom, None
+    if fillet_type == 'adaptive':
+        convex, concave = fillet.get('convex_radius', 0), fillet.get('concave_radius', 0)
+        if not _is_number(convex) or not _is_number(concave):
+            return None, None, _issue('error', 'fillet_radius', "自适应倒角的 convex_radius / concave_radius 应为数值")
+        if convex <= 0 and concave <= 0:
+            return None, None, None
+        return float(convex) + zoom, float(concave) - zoom, None
+    return None, None, _issue('warning', 'fillet_type', f"未知的倒角类型: {fillet_type}，构建时不倒角")
+
+
+def _ring_fillets(fillet, zoom, widths, n):
+    """Region.create_rings 对内外边界使用的半径
+
+    返回:
+        tuple: (outer, inner, 诊断)，outer 为每个环外边界的 (凸角半径, 凹角半径) 列表，inner 为内边界共用的半径；
+               不倒角时为 None
+    """
+    fillet_type = fillet.get('type')
+    if fillet_type == 'arc':
+        if 'radius_list' in fillet or 'radii' in fillet:
+            radius = fillet.get('radius_list', fillet.get('radii'))
+            if isinstance(radius, (list, tuple)) and not any(radius):
+                return None, None, None
+            return None, None, _issue('error', 'ring_radius_list', "环阵列的圆弧倒角暂不支持 radius_list / radii，构建时会失败")
+        radius = fillet.get('radius')
+        if radius == 0:
+            return None, None, None
+        if not _is_number(radius):
+            return None, None, _issue('error', 'fillet_radius', f"圆弧倒角半径应为数值: {radius!r}")
+        if not _is_number(zoom):
+            return None, None, _issue('error', 'ring_zoom',
+                                      "环阵列使用圆弧倒角时 zoom 必须是数值（不缩放请写 zoom: 0），否则构建时会失败")
+        outer = [(radius - zoom + width, radius + zoom - width) for width in widths]
+        return outer, (radius - zoom, radius + zoom), None
+    if fillet_type == 'adaptive':
+        convex, concave = fillet.get('convex_radius'), fillet.get('concave_radius')
+        if not _is_number(convex) or not _is_number(concave):
+            return None, None, _issue('error', 'fillet_radius', "自适应倒角的 convex_radius / concave_radius 应为数值")
+        if convex <= 0 and concave <= 0:
+            return None, None, None
+        return [(convex + width, concave - width) for width in widths], (convex, concave), None
+    return None, None, None
+
+
+def _check_boundaries(geometry, boundaries, diagnostics):
+    """对每条边界做偏移和倒角可行性检查，boundaries 为 [(名称, 偏移, 凸角半径, 凹角半径)]"""
+    for name, offset, convex, concave in boundaries:
+        if offset:
+            flipped = np.flatnonzero(offset_edges(geometry, offset) <= 0)
+            if len(flipped):
+                diagnostics.append(_issue('warning', 'offset_collapse',
+                                          f"偏移 {offset:g} 后 {len(flipped)} 条边消失或翻转，多边形会自相交",
+                                          name, flipped))
+        if convex is None:
+            continue
+        ratio = fillet_ratios(geometry, offset, convex, concave)
+        failing = np.flatnonzero(ratio > FILLET_ERROR_RATIO)
+        if len(failing):
+            diagnostics.append(_issue('error', 'fillet_too_large',
+                                      f"{len(failing)} 个顶点的切点距离超过较短邻边的 {FILLET_ERROR_RATIO} 倍"
+                                      f"（最大 {ratio.max():.2f} 倍），构建时会失败", name, failing))
+        tight = np.flatnonzero((ratio > FILLET_WARNING_RATIO) & (ratio <= FILLET_ERROR_RATIO))
+        if len(tight):
+            diagnostics.append(_issue('warning', 'fillet_tight',
+                                      f"{len(tight)} 个顶点的切点距离超过较短邻边的一半，交互模式下会询问是否缩小半径，"
+                                      f"非交互模式按原半径倒角，相邻圆弧可能重叠", name, tight))
+
+
+def _ring_rules(shape, diagnostics):
+    """解析环阵列的 ring_num / ring_width / ring_space，返回每个环的 (宽度, 间距)（已按 zoom 调整）"""
+    ring_num = shape.get('ring_num')
+    if not isinstance(ring_num, int) or isinstance(ring_num, bool) or ring_num < 1:
+        diagnostics.append(_issue('error', 'ring_num', f"ring_num 应为正整数: {ring_num!r}"))
+        return []
+    rules = {}
+    for key, inclusive in (('ring_width', True), ('ring_space', False)):
+        try:
+            rules[key] = parse_ring_rule(shape.get(key), inclusive=inclusive)
+        except (TypeError, ValueError) as e:
+            diagnostics.append(_issue('error', key, f"{key} 格式错误，构建时会失败: {e}"))
+    if len(rules) < 2:
+        return []
+
+    zoom = shape.get('zoom', 0)
+    zoom = zoom if _is_number(zoom) else 0
+    values = {}
+    for key, sign in (('ring_width', 1), ('ring_space', -1)):
+        rule = rules[key]
+        values[key] = [float(v) + sign * 2 * zoom for v in (rule if isinstance(rule, list) else [rule] * ring_num)]
+    count = min(ring_num, len(values['ring_width']), len(values['ring_space']))
+    if count < ring_num:
+        diagnostics.append(_issue('warning', 'ring_count',
+                                  f"ring_width 有 {len(values['ring_width'])} 个值、ring_space 有 {len(values['ring_space'])} 个值，"
+                                  f"少于 ring_num={ring_num}，构建时只生成 {count} 个环"))
+    widths, spaces = values['ring_width'][:count], values['ring_space'][:count]
+    bad = [i for i, width in enumerate(widths) if width <= 0]
+    if bad:
+        diagnostics.append(_issue('error', 'ring_width', f"{len(bad)} 个环的宽度（含 zoom 调整）不大于 0，"
+                                  f"第一个为第 {bad[0] + 1} 个环"))
+    overlapping = [i for i, space in enumerate(spaces[:count - 1]) if space <= 0]
+    if overlapping:
+        diagnostics.append(_issue('warning', 'ring_space', f"{len(overlapping)} 处环间距（含 zoom 调整）不大于 0，"
+                                  f"相邻环会重叠，第一个为第 {overlapping[0] + 1} 个环之后"))
+    return list(zip(widths, spaces))
+
+
+def _shape_boundaries(shape, n, diagnostics):
+    """按 Region 中的构建流程列出形状的每条边界 [(名称, 偏移, 凸角半径, 凹角半径)]"""
+    shape_type = shape.get('type')
+    fillet = shape.get('fillet') or {}
+    if fillet and fillet.get('type'):
+        precision = fillet.get('precision', 0.01)
+        if not _is_number(precision) or precision <= 0:
+            diagnostics.append(_issue('error', 'fillet_precision', f"倒角精度应为正数: {precision!r}"))
+            fillet = {}
+    else:
+        fillet = {}
+
+    if shape_type in ('polygon', 'via'):
+        if shape_type == 'polygon':
+            zooms = [('polygon', shape.get('zoom', 0))]
+            if 'zoom' in shape and not _is_number(shape['zoom']):
+                diagnostics.append(_issue('warning', 'zoom', f"zoom 应为数值，构建时不缩放: {shape['zoom']!r}"))
+        else:
+            zooms = [('outer', shape.get('outer_zoom', 1)), ('inner', shape.get('inner_zoom', -1))]
+            if not all(_is_number(z) for _, z in zooms):
+                diagnostics.append(_issue('error', 'via_zoom', "outer_zoom / inner_zoom 应为数值"))
+                return []
+            if zooms[1][1] >= zooms[0][1]:
+                diagnostics.append(_issue('warning', 'via_empty', "inner_zoom 不小于 outer_zoom，via 为空"))
+        convex = concave = None
+        boundaries = []
+        for name, zoom in zooms:
+            if fillet:
+                convex, concave, issue = _polygon_fillet(fillet, zoom, n)
+                if issue and issue not in diagnostics:  # via 的两条边界不重复报告
+                    diagnostics.append(issue)
+            boundaries.append((name, zoom if _is_number(zoom) else 0, convex, concave))
+        return boundaries
+
+    if shape_type == 'rings':
+        rings = _ring_rules(shape, diagnostics)
+        if not rings:
+            return []
+        zoom = shape.get('zoom', [0, 0])  # 与 main.py 的缺省值一致
+        outer_radii = inner_radii = None
+        if fillet:
+            outer_radii, inner_radii, issue = _ring_fillets(fillet, zoom, [w for w, _ in rings], n)
+            if issue:
+                diagnostics.append(issue)
+        # 环阵列先整体偏移 -zoom，再依次外扩 宽度 / 间距
+        offset = -zoom if _is_number(zoom) else 0
+        boundaries = []
+        for i, (width, space) in enumerate(rings):
+            inner = inner_radii or (None, None)
+            outer = outer_radii[i] if outer_radii else (None, None)
+            boundaries.append((f"ring {i + 1} inner", offset, *inner))
+            boundaries.append((f"ring {i + 1} outer", offset + width, *outer))
+            offset += width + space
+        return boundaries
+
+    diagnostics.append(_issue('error', 'type', f"未知的形状类型: {shape_type}"))
+    return []
+
+
+def validate_shape(shape, layer_names=None):
+    """不构建几何，检查单个形状能否构建
+
+    参数:
+        shape: 形状配置字典
+        layer_names: 已定义的图层名称集合，None 表示不检查名称（例如读取输入文件时名称来自文件）
+
+    返回:
+        dict: {"name", "type", "vertices": 顶点数, "boundaries": 检查的边界数, "diagnostics": [...]}，
+              每条诊断包含 level（error / warning）、code、message，以及可选的 boundary、vertices（顶点序号）、count
+    """
+    shape_type = shape.get('type')
+    result = {'name': shape.get('name', f"Unnamed_{shape_type}"), 'type': shape_type,
+              'vertices': 0, 'boundaries': 0, 'diagnostics': []}
+    diagnostics = result['diagnostics']
+
+    layer = shape.get('layer')
+    if layer is not None:
+        try:
+            parse_layer_spec(layer)
+        except ValueError:
+            if not isinstance(layer, str):
+                diagnostics.append(_issue('warning', 'layer', f"无法解析的图层 {layer!r}，构建时使用默认图层"))
+            elif layer_names is not None and layer not in layer_names:
+                diagnostics.append(_issue('warning', 'layer', f"未定义的图层名称 {layer!r}，构建时使用默认图层"))
+
+    try:
+        vertices = ensure_counterclockwise(shape_vertices(shape))
+    except (OSError, ValueError) as e:
+        diagnostics.append(_issue('error', 'vertices', f"顶点数据无效，构建时跳过此形状: {e}"))
+        return result
+    n = len(vertices)
+    result['vertices'] = n
+    if n < 3:
+        diagnostics.append(_issue('error', 'vertices', f"顶点数量不足: {n}"))
+        return result
+
+    geometry = corner_geometry(vertices)
+    duplicates = np.flatnonzero(geometry['edge'] < 1e-9)
+    if len(duplicates):
+        diagnostics.append(_issue('warning', 'duplicate_vertex', f"{len(duplicates)} 个顶点与下一个顶点重合",
+                                  vertices=duplicates))
+
+    boundaries = _shape_boundaries(shape, n, diagnostics)
+    result['boundaries'] = len(boundaries)
+    _check_boundaries(geometry, boundaries, diagnostics)
+    return result
+
+
+def validate_config(config):
+    """在不构建几何的前提下检查整个配置
+
+    解析每个形状的顶点、环规则和倒角配置，按构建流程推算每条边界（偏移、倒角半径），
+    向量化检查倒角是否可行（与 Frame._apply_arc_fillet_internal 的判断一致）。
+
+    参数:
+        config: 已加载的配置字典（与 main.py 使用的 YAML 结构相同）
+
+    返回:
+        dict: {"valid": 没有错误, "errors": [文本], "warnings": [文本], "shapes": [validate_shape 的结果], "seconds"}
+    """
+    start = time.perf_counter()
+    errors = []
+    if not isinstance(config, dict):
+        return {'valid': False, 'errors': ["配置必须是一个有效的YAML对象"], 'warnings': [], 'shapes': [], 'seconds': 0.0}
+    for section in ('global', 'gds'):
+        if section not in config:
+            errors.append(f"缺少'{section}'配置部分")
+    shapes = config.get('shapes')
+    if not isinstance(shapes, list):
+        errors.append("缺少'shapes'配置部分或者不是列表类型")
+        shapes = []
+
+    gds_config = config.get('gds') or {}
+    dbu = (config.get('global') or {}).get('dbu', 0.001)
+    if not _is_number(dbu) or dbu <= 0:
+        errors.append(f"global.dbu 应为正数: {dbu!r}")
+    layer_names = set()
+    for name, spec in (gds_config.get('layers') or {}).items():
+        try:
+            parse_layer_spec(spec)
+            layer_names.add(name)
+        except ValueError as e:
+            errors.append(f"图层 '{name}' 定义错误，构建时会失败: {e}")
+    if gds_config.get('input_file'):
+        layer_names = None  # 名称可能来自输入文件
+
+    warnings = []
+    results = []
+    for index, shape in enumerate(shapes):
+        if not isinstance(shape, dict):
+            errors.append(f"第 {index + 1} 个形状不是字典")
+            continue
+        result = validate_shape(shape, layer_names)
+        result['index'] = index
+        results.append(result)
+        for issue in result['diagnostics']:
+            where = f" [{issue['boundary']}]" if 'boundary' in issue else ''
+            vertices = f" 顶点 {issue['vertices'][:10]}" if issue.get('vertices') else ''
+            text = f"形状 '{result['name']}'{where}: {issue['message']}{vertices}"
+            (errors if issue['level'] == 'error' else warnings).append(text)
+
+    seconds = round(time.perf_counter() - start, 4)
+    logger.info(f"配置检查: {len(results)} 个形状, {len(errors)} 个错误, {len(warnings)} 个警告, {seconds} 秒")
+    return {'valid': not errors, 'errors': errors, 'warnings': warnings, 'shapes': results, 'seconds': seconds}
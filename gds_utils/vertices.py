@@ -0,0 +1,246 @@
+import os
+import tempfile
+import warnings
+import numpy as np
+from .utils import logger
+from .layout_cache import file_digest
+
+# 顶点文件格式: 扩展名 -> 格式名
+VERTEX_FILE_FORMATS = {
+    '.npy': 'npy',
+    '.bin': 'bin',
+    '.f64': 'bin',
+    '.raw': 'bin',
+    '.csv': 'csv',
+    '.txt': 'csv',
+}
+
+# 进程内缓存: (绝对路径, 格式, 文件大小, 修改时间) -> 顶点数组
+_file_cache = {}
+_FILE_CACHE_MAX_ENTRIES = 32
+
+
+class VertexParseError(ValueError):
+    """顶点字符串或顶点文件内容错误
+
+    属性:
+        position: 出错位置在原字符串中的字符偏移；来自顶点文件时为出错数值在文件中的序号
+        index: 出错的顶点序号（从0开始）
+        token: 出错的原始片段
+    """
+
+    def __init__(self, message, position, index, token):
+        super().__init__(f"{message} (顶点 {index}, 字符位置 {position}: {token!r})")
+        self.position = position
+        self.index = index
+        self.token = token
+
+
+def _locate_error(vertices_str):
+    """逐个顶点扫描，定位第一个格式错误并抛出 VertexParseError
+
+    只在批量解析失败时调用，正常路径不会走到这里。
+    """
+    offset = 0
+    for index, pair in enumerate(vertices_str.split(':')):
+        parts = pair.split(',')
+        if len(parts) != 2:
+            raise VertexParseError("顶点必须是 'x,y' 格式", offset, index, pair)
+        part_offset = offset
+        for part in parts:
+            try:
+                value = float(part)
+            except ValueError:
+                raise VertexParseError("无法解析为数字", part_offset, index, part) from None
+            if not np.isfinite(value):
+                raise VertexParseError("坐标必须是有限数值", part_offset, index, part)
+            part_offset += len(part) + 1
+        offset += len(pair) + 1
+    raise VertexParseError("无法解析顶点字符串", 0, 0, vertices_str[:32])
+
+
+def _separators_alternate(vertices_str, num_pairs):
+    """每个顶点恰好一个逗号，即分隔符依次为 ",:,:...,"
+
+    只比较逗号总数时 "1,2,3:4" 会被重新分组为两个顶点。UTF-8 中多字节字符不含 ',' 和 ':' 的字节，按字节检查即可。
+    """
+    data = np.frombuffer(vertices_str.encode('utf-8'), dtype=np.uint8)
+    separators = data[(data == ord(',')) | (data == ord(':'))]
+    return separators.size == 2 * num_pairs - 1 and \
+        bool((separators[0::2] == ord(',')).all()) and bool((separators[1::2] == ord(':')).all())
+
+
+def parse_vertex_string(vertices_str: str) -> np.ndarray:
+    """将 "x1,y1:x2,y2:..." 格式的字符串一次性解析为顶点数组
+
+    参数:
+        vertices_str: 顶点字符串
+
+    返回:
+        np.ndarray: 形状为 (N, 2) 的 float64 数组
+
+    异常:
+        VertexParseError: 字符串格式错误，包含出错的字符位置和顶点序号
+    """
+    if not isinstance(vertices_str, str):
+        raise VertexParseError("顶点数据必须是字符串", 0, 0, str(vertices_str)[:32])
+
+    num_pairs = vertices_str.count(':') + 1
+    if not _separators_alternate(vertices_str, num_pairs):
+        _locate_error(vertices_str)
+
+    with warnings.catch_warnings():
+        # 旧版本 numpy 遇到非法片段时给出 DeprecationWarning 并返回部分结果，新版本直接抛出 ValueError
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            flat = np.fromstring(vertices_str.replace(':', ','), dtype=np.float64, sep=',')
+        except ValueError:
+            flat = None
+
+    if flat is None or flat.size != num_pairs * 2 or not np.isfinite(flat).all():
+        _locate_error(vertices_str)
+
+    return flat.reshape(num_pairs, 2)
+
+
+def signed_area(vertices: np.ndarray) -> float:
+    """用向量化的鞋带公式计算多边形有向面积（逆时针为正）"""
+    x = vertices[:, 0]
+    y = vertices[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def ensure_counterclockwise(vertices: np.ndarray) -> np.ndarray:
+    """确保顶点数组为逆时针方向，必要时返回反转后的视图"""
+    if signed_area(vertices) < 0:
+        logger.info("检测到顺时针顶点顺序，正在修正为逆时针")
+        return vertices[::-1]
+    return vertices
+
+
+def _default_cache_dir():
+    return os.environ.get('SUMMER_GDS_CACHE_DIR',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'summer-gds', 'vertices'))
+
+
+def _as_vertex_array(data, path):
+    """把加载结果规整为 (N, 2) float64 数组，尽量保持内存映射不拷贝"""
+    if data.ndim == 1:
+        if data.size % 2:
+            raise ValueError(f"顶点文件 {path} 中的数值个数({data.size})不是偶数")
+        data = data.reshape(-1, 2)
+    if data.ndim != 2 or data.shape[1] != 2:
+        raise ValueError(f"顶点文件 {path} 的数组形状 {data.shape} 无效，应为 (N, 2)")
+    if data.dtype != np.float64:
+        data = data.astype(np.float64)
+    finite = np.isfinite(data)
+    if not finite.all():
+        position = int(np.argmin(finite.ravel()))
+        raise VertexParseError(f"顶点文件 {path} 中的坐标必须是有限数值", position, position // 2,
+                               str(data.flat[position]))
+    return data
+
+
+def _load_npy(path):
+    return np.load(path, mmap_mode='r', allow_pickle=False)
+
+
+def _load_bin(path):
+    size = os.path.getsize(path)
+    if size % 16:
+        raise ValueError(f"二进制顶点文件 {path} 大小({size} 字节)不是 16 的整数倍")
+    return np.memmap(path, dtype='<f8', mode='r')
+
+
+def _parse_csv(path):
+    """解析每行 "x,y" 的 CSV 文件，允许一行表头和 # 注释行"""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    lines = [line for line in lines if line.strip() and not line.lstrip().startswith('#')]
+    if lines:
+        try:
+            [float(v) for v in lines[0].split(',')]
+        except ValueError:
+            lines = lines[1:]  # 表头
+    if not lines:
+        raise ValueError(f"CSV 顶点文件 {path} 中没有数据")
+    try:
+        return parse_vertex_string(':'.join(lines))
+    except VertexParseError as e:
+        raise VertexParseError(f"CSV 顶点文件 {path} 第 {e.index + 1} 个数据行格式错误", e.position, e.index,
+                               e.token) from None
+
+
+def _load_csv(path, cache_dir):
+    """解析 CSV，并按文件内容哈希把解析结果缓存为 .npy，供后续运行直接内存映射"""
+    if cache_dir is False:
+        return _parse_csv(path)
+
+    cache_dir = cache_dir or _default_cache_dir()
+    cache_file = os.path.join(cache_dir, f"{file_digest(path)}.npy")
+    if os.path.exists(cache_file):
+        logger.debug(f"命中顶点缓存: {cache_file}")
+        return np.load(cache_file, mmap_mode='r', allow_pickle=False)
+
+    data = _parse_csv(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.tmp', delete=False) as f:
+            tmp_file = f.name
+            np.save(f, np.ascontiguousarray(data))
+        try:
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            os.remove(tmp_file)
+            raise
+        logger.debug(f"写入顶点缓存: {cache_file}")
+    except OSError as e:
+        logger.warning(f"写入顶点缓存失败: {e}")
+    return data
+
+
+def load_vertices_file(path, fmt=None, cache_dir=None) -> np.ndarray:
+    """从外部文件加载顶点数组
+
+    支持的格式:
+        npy: NumPy 数组文件，以内存映射方式打开
+        bin: 小端 float64 原始二进制，按 x0,y0,x1,y1,... 排列，以内存映射方式打开
+        csv: 每行一个 "x,y"，解析结果按文件哈希缓存
+
+    参数:
+        path: 文件路径
+        fmt: 文件格式，为None时根据扩展名判断
+        cache_dir: CSV 解析缓存目录，None 使用默认目录，False 关闭缓存
+
+    返回:
+        np.ndarray: 形状为 (N, 2) 的 float64 数组（可能是只读内存映射）
+
+    异常:
+        ValueError: 格式未知或文件内容不合法
+        VertexParseError: 文件中含有 NaN 或无穷大（ValueError 的子类）
+        OSError: 文件无法读取
+    """
+    abs_path = os.path.abspath(path)
+    fmt = fmt or VERTEX_FILE_FORMATS.get(os.path.splitext(abs_path)[1].lower())
+    if fmt not in ('npy', 'bin', 'csv'):
+        raise ValueError(f"无法识别顶点文件格式: {path}，支持 {', '.join(sorted(VERTEX_FILE_FORMATS))}")
+
+    stat = os.stat(abs_path)
+    key = (abs_path, fmt, stat.st_size, stat.st_mtime_ns)
+    cached = _file_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if fmt == 'npy':
+        data = _load_npy(abs_path)
+    elif fmt == 'bin':
+        data = _load_bin(abs_path)
+    else:
+        data = _load_csv(abs_path, cache_dir)
+
+    vertices = _as_vertex_array(data, path)
+    if len(_file_cache) >= _FILE_CACHE_MAX_ENTRIES:
+        _file_cache.pop(next(iter(_file_cache)))
+    _file_cache[key] = vertices
+    logger.info(f"从 {fmt} 文件加载 {len(vertices)} 个顶点: {path}")
+    return vertices
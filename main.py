@@ -1,92 +1,168 @@
+import argparse
+import contextlib
+import json
 import yaml
 import sys
 import os
-import math # 需要 math 来生成五角星
+import time
+import numpy as np
 from gds_utils import GDS, Frame, Region
-from gds_utils.utils import setup_logging, logger
-import klayout.db as db  # 添加这行导入
-import ast
+from gds_utils.estimate import estimate_config
+from gds_utils.validate import validate_config
+from gds_utils.profiler import Profiler, current_profiler, profile_stage, profile_report_path
+from gds_utils.events import EventLog
+from gds_utils.summary import summary_report_path, save_summary
+from gds_utils.generators import generate_vertices
+from gds_utils.vertices import parse_vertex_string, ensure_counterclockwise, load_vertices_file, VertexParseError
+from gds_utils.layer import parse_layer_spec
+from gds_utils.utils import setup_logging, logger, parse_ring_rule, atomic_write_path
+from gds_utils.context import BuildContext, resolve_path
 
 # 新增的辅助函数
-def _generate_vertices(gen_config: dict) -> list:
-    """根据配置生成顶点列表"""
-    shape_type = gen_config.get("shape_type")
-    vertices = []
-    if shape_type == "star":
-        center_x = gen_config.get("center_x", 0)
-        center_y = gen_config.get("center_y", 0)
-        outer_radius = gen_config.get("outer_radius", 10)
-        inner_radius = gen_config.get("inner_radius", 5)
-        num_points = gen_config.get("points", 5)
-        
-        if num_points < 2:
-            logger.warning(f"星形点数 ({num_points}) 过少，至少需要2个点。")
-            return []
+# 顶点无效时的返回值
+_NO_VERTICES = np.empty((0, 2), dtype=np.float64)
 
-        for i in range(num_points * 2):
-            angle = math.pi / num_points * i - math.pi / 2 # 调整起始角度使尖端向上
-            radius = outer_radius if i % 2 == 0 else inner_radius
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-            vertices.append((x, y))
-        logger.info(f"生成 {num_points}角星顶点，中心:({center_x},{center_y}), 外径:{outer_radius}, 内径:{inner_radius}")
+def _generate_vertices(gen_config: dict) -> np.ndarray:
+    """根据配置生成顶点数组，失败时返回空数组
 
-    # 可以扩展以支持其他形状类型，如 "rectangle", "circle" 等
-    # elif shape_type == "rectangle":
-    #     pass 
-    else:
-        logger.warning(f"未知的顶点生成类型: {shape_type}")
+    具体形状由 gds_utils.generators 中注册的生成器负责，
+    支持 star、circle、ellipse、regular_polygon、rounded_rectangle 等。
+    """
+    try:
+        vertices = generate_vertices(gen_config)
+    except ValueError as e:
+        logger.warning(f"顶点生成失败: {e}")
+        return _NO_VERTICES
+    logger.info(f"生成 {gen_config.get('shape_type')} 顶点 {len(vertices)} 个，参数: {gen_config}")
     return vertices
 
-def parse_vertices(vertices_str: str) -> list:
+# 不合并插入时，同一单元格同一图层累积到这么多个区域就先插入一批
+INSERT_BATCH_REGIONS = 256
+
+def _insert_regions(cell_name, cell, layer_info, regions, merge):
+    """把同一单元格同一图层的一批区域插入单元格"""
+    counts = cell.add_regions({layer_info: regions}, merge=merge)
+    for layer_info, count in counts.items():
+        logger.info(f"单元格 '{cell_name}' 的图层 {layer_info} 插入 {count} 个多边形")
+
+def parse_vertices(vertices_str: str) -> np.ndarray:
     """解析顶点字符串
     
     参数:
         vertices_str: 顶点字符串，格式为 "x1,y1:x2,y2:..."
         
     返回:
-        list: 顶点列表 [(x1,y1), (x2,y2), ...]
+        np.ndarray: 逆时针的 (N, 2) 顶点数组，失败时为空数组
     """
     try:
-        vertices = []
-        for pair in vertices_str.split(':'):
-            x, y = map(float, pair.split(','))
-            vertices.append((float(x), float(y)))  # 确保是浮点数
-        
-        # 检查顶点数量
-        if len(vertices) < 3:
-            logger.error(f"顶点数量不足: {len(vertices)}")
-            return []
-            
-        # 检查并修正顶点顺序（确保逆时针）
-        def is_counterclockwise(pts):
-            area = 0
-            for i in range(len(pts)):
-                j = (i + 1) % len(pts)
-                area += pts[i][0] * pts[j][1]
-                area -= pts[j][0] * pts[i][1]
-            return area > 0
-            
-        if not is_counterclockwise(vertices):
-            logger.info("检测到顺时针顶点顺序，正在修正为逆时针")
-            vertices.reverse()
-            
-        return vertices
-    except Exception as e:
+        vertices = parse_vertex_string(vertices_str)
+    except VertexParseError as e:
         logger.error(f"解析顶点失败: {e}")
-        return []
+        return _NO_VERTICES
+
+    # 检查顶点数量
+    if len(vertices) < 3:
+        logger.error(f"顶点数量不足: {len(vertices)}")
+        return _NO_VERTICES
+
+    # 检查并修正顶点顺序（确保逆时针）
+    return ensure_counterclockwise(vertices)
+
+def load_vertices(file_config) -> np.ndarray:
+    """从外部文件加载顶点
+
+    参数:
+        file_config: 文件路径字符串，或 {"path": ..., "format": "npy"|"bin"|"csv"} 字典
+
+    返回:
+        np.ndarray: 逆时针的 (N, 2) 顶点数组（文件以内存映射打开时不复制），失败时为空数组
+    """
+    if isinstance(file_config, dict):
+        path = file_config.get('path')
+        fmt = file_config.get('format')
+    else:
+        path, fmt = file_config, None
+
+    if not path:
+        logger.error("vertices_file 未指定文件路径")
+        return _NO_VERTICES
+
+    try:
+        vertices = load_vertices_file(resolve_path(path), fmt)
+    except (OSError, ValueError) as e:
+        logger.error(f"加载顶点文件失败: {e}")
+        return _NO_VERTICES
+
+    if len(vertices) < 3:
+        logger.error(f"顶点数量不足: {len(vertices)}")
+        return _NO_VERTICES
+
+    return ensure_counterclockwise(vertices)
+
+def parse_args(argv):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="根据YAML配置生成GDS文件")
+    parser.add_argument("config", help="YAML配置文件路径")
+    parser.add_argument("--estimate", action="store_true",
+                        help="只估算顶点数、多边形数、输出大小和耗时，不生成GDS")
+    parser.add_argument("--validate", action="store_true",
+                        help="只检查配置（顶点、环规则、倒角可行性），输出逐形状的诊断，不生成GDS")
+    parser.add_argument("--profile", action="store_true",
+                        help="记录各阶段的耗时和内存，报告保存为 <输出文件名>.profile.json")
+    parser.add_argument("--progress", metavar="FILE",
+                        help="构建过程中把进度写入 JSON 文件（Web 任务队列轮询用）")
+    parser.add_argument("--events", metavar="FILE",
+                        help="构建过程中把进度、阶段耗时和警告逐行追加到 JSONL 文件（Web 事件流用）")
+    parser.add_argument("--summary", action="store_true",
+                        help="生成后按图层统计多边形数、顶点数、面积和包围框，输出 JSON 并保存为 <输出文件名>.summary.json")
+    return parser.parse_args(argv)
+
+def progress_file_writer(path):
+    """返回把构建进度原子写入 JSON 文件的回调
 
-def main():
-    """主函数"""
-    # 首先设置日志
-    setup_logging(True)  # 显示日志
+    文件内容为 {"stage": ..., "done": ..., "total": ..., "detail": ..., "time": ...}，
+    每次回调整体替换，读取方不会读到写了一半的文件。
+    """
+    def report(stage, done=None, total=None, detail=None):
+        with atomic_write_path(path) as temp_file, open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'stage': stage, 'done': done, 'total': total, 'detail': detail,
+                       'time': time.time()}, f, ensure_ascii=False)
+    return report
+
+def combine_progress(*callbacks):
+    """把多个进度回调合并为一个，忽略 None"""
+    callbacks = [callback for callback in callbacks if callback]
+    def report(stage, done=None, total=None, detail=None):
+        for callback in callbacks:
+            callback(stage, done, total, detail)
+    return report
+
+def main(argv=None, context=None):
+    """主函数
+    
+    参数:
+        argv: 命令行参数列表（不含程序名），None 时使用 sys.argv
+        context: 构建上下文（BuildContext）。为 None 时按命令行方式运行：配置全局日志，
+                 相对路径相对于当前目录；Web 服务为每次构建传入独立的上下文，不修改进程级状态
+    """
+    if context is None:
+        # 首先设置日志
+        setup_logging(True)  # 显示日志
+        context = BuildContext()
     
     # 解析命令行参数
-    if len(sys.argv) < 2:
-        print("用法: python main_oop.py <config.yaml>")
-        return
+    args = parse_args(sys.argv[1:] if argv is None else argv)
     
-    config_file = sys.argv[1]
+    with context.activate():
+        return run(args)
+
+def run(args):
+    """在当前构建上下文中执行 main 的参数
+
+    参数:
+        args: parse_args 的结果
+    """
+    config_file = resolve_path(args.config)
     if not os.path.exists(config_file):
         print(f"配置文件不存在: {config_file}")
         return
@@ -100,6 +176,52 @@ def main():
         logger.error(f"加载配置文件失败: {e}")
         return
     
+    # 只检查配置，不构建几何
+    if args.validate:
+        report = validate_config(config)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return report
+    
+    # 只估算代价，不构建几何
+    if args.estimate:
+        report = estimate_config(config)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return report
+    
+    progress = progress_file_writer(resolve_path(args.progress)) if args.progress else None
+    events = EventLog(resolve_path(args.events)) if args.events else None
+    if events:
+        progress = combine_progress(progress, events.stage)
+    with events.activate() if events else contextlib.nullcontext():
+        if not args.profile:
+            output_file = build_gds(config, summary=args.summary, progress=progress)
+        else:
+            # 按阶段记录耗时和内存，报告写在输出文件旁边
+            profiler = Profiler()
+            with profiler.activate():
+                output_file = build_gds(config, summary=args.summary, progress=progress)
+            if output_file:
+                profiler.save(profile_report_path(output_file))
+    
+    if output_file and args.summary:
+        with open(summary_report_path(output_file), 'r', encoding='utf-8') as f:
+            print(f.read())
+    return output_file
+
+def build_gds(config, summary=False, progress=None):
+    """根据已加载的配置构建并保存GDS
+    
+    参数:
+        config: 配置字典
+        summary: 是否在输出文件旁写出版图统计 <basename>.summary.json
+        progress: 进度回调 progress(stage, done, total, detail)，stage 依次为
+                  shapes（每个形状开始时）、insert、save、summary、done
+        
+    返回:
+        str | None: 输出文件路径，配置错误时返回None
+    """
+    profiler = current_profiler()
+    
     # 获取全局配置
     global_config = config.get('global', {})
     gds_config = config.get('gds', {})
@@ -107,26 +229,61 @@ def main():
     
     # 创建GDS对象
     gds = GDS(
-        input_file=gds_config.get('input_file'),
+        input_file=resolve_path(gds_config.get('input_file')),
         cell_name=gds_config.get('cell_name', 'TOP'),
         layer_info=tuple(gds_config.get('default_layer', [1, 0])),
-        dbu=global_config.get('dbu', 0.001)
+        dbu=global_config.get('dbu', 0.001),
+        input_layers=gds_config.get('input_layers'),
+        input_cells=gds_config.get('input_cells')
     )
     
+    # 登记命名图层，形状的 layer 字段可以直接使用名称
+    for layer_name, layer_spec in (gds_config.get('layers') or {}).items():
+        try:
+            gds.layer_manager.create_layer(parse_layer_spec(layer_spec), layer_name)
+        except ValueError as e:
+            logger.error(f"图层 '{layer_name}' 定义错误: {e}")
+            return None
+    default_layer = tuple(gds_config.get('default_layer', [1, 0]))
+    merge_on_insert = bool(global_config.get('merge_on_insert', False))
+
+    # 每个 (单元格, 图层) 最后一个形状的序号；处理完该形状后即插入并释放这一组区域，
+    # merge_on_insert 时同一图层的所有区域仍然一起合并
+    last_shape = {}
+    for shape_index, shape_data in enumerate(shapes_config):
+        try:
+            layer_info = gds.resolve_layer(shape_data.get('layer', default_layer))
+        except ValueError:
+            layer_info = default_layer
+        last_shape[(shape_data.get('cell', gds_config.get('cell_name', 'TOP')), layer_info)] = shape_index
+    pending = {}  # (cell_name, layer_info) -> (Cell, [Region])
+    
     # 处理每个形状
-    for shape_data in shapes_config: # 重命名 `shape` 为 `shape_data`
+    for shape_index, shape_data in enumerate(shapes_config): # 重命名 `shape` 为 `shape_data`
         shape_name = shape_data.get('name', f"Unnamed_{shape_data.get('type')}")
         logger.info(f"处理形状: {shape_name} (类型: {shape_data.get('type')})")
+        if progress:
+            progress('shapes', shape_index, len(shapes_config), shape_name)
+        if profiler:
+            profiler.start_shape(shape_name)
+        # 后面不再有形状的组立即插入（包括最后一个形状被跳过的组）
+        for key in [key for key in pending if last_shape.get(key, -1) < shape_index]:
+            cell, regions = pending.pop(key)
+            _insert_regions(key[0], cell, key[1], regions, merge_on_insert)
         
-        vertices = []
-        if "vertices_gen" in shape_data:
-            logger.debug(f"使用 vertices_gen 生成 '{shape_name}' 的顶点: {shape_data['vertices_gen']}")
-            vertices = _generate_vertices(shape_data["vertices_gen"])
-        elif "vertices" in shape_data:
-            logger.debug(f"从 vertices 字符串解析 '{shape_name}' 的顶点: {shape_data['vertices']}")
-            vertices = parse_vertices(shape_data.get('vertices', ''))
+        vertices = _NO_VERTICES
+        with profile_stage("parse_vertices"):
+            if "vertices_gen" in shape_data:
+                logger.debug(f"使用 vertices_gen 生成 '{shape_name}' 的顶点: {shape_data['vertices_gen']}")
+                vertices = _generate_vertices(shape_data["vertices_gen"])
+            elif "vertices_file" in shape_data:
+                logger.debug(f"从 vertices_file 加载 '{shape_name}' 的顶点: {shape_data['vertices_file']}")
+                vertices = load_vertices(shape_data['vertices_file'])
+            elif "vertices" in shape_data:
+                logger.debug(f"从 vertices 字符串解析 '{shape_name}' 的顶点: {str(shape_data['vertices'])[:80]}")
+                vertices = parse_vertices(shape_data.get('vertices', ''))
         
-        if not vertices:
+        if len(vertices) == 0:
             logger.error(f"形状 '{shape_name}' 的顶点数据无效或生成失败，跳过此形状")
             continue
         
@@ -141,15 +298,13 @@ def main():
             cell = gds.create_cell(cell_name)
         
         # 获取图层信息
-        layer_info_val = shape_data.get('layer', gds_config.get('default_layer', [1, 0]))
-        if isinstance(layer_info_val, str) and cell:
-            logger.warning(f"图层名称 '{layer_info_val}' 的解析逻辑尚未完全实现，请确保它已在mapping中或通过序号指定。暂时使用默认图层。")
-            layer_info = tuple(gds_config.get('default_layer', [1, 0]))
-        elif isinstance(layer_info_val, list):
-             layer_info = tuple(layer_info_val)
-        else:
-            logger.error(f"未知的图层格式: {layer_info_val} for shape {shape_name}. 使用默认图层。")
-            layer_info = tuple(gds_config.get('default_layer', [1, 0]))
+        layer_info_val = shape_data.get('layer', default_layer)
+        try:
+            # 名称、[layer, datatype] 或 "layer/datatype"，名称来自 gds.layers 或输入文件
+            layer_info = gds.resolve_layer(layer_info_val)
+        except ValueError as e:
+            logger.error(f"形状 '{shape_name}' 的图层无效: {e}. 使用默认图层。")
+            layer_info = default_layer
 
         # 提取倒角配置
         fillet_config = shape_data.get('fillet') 
@@ -181,88 +336,19 @@ def main():
                 zoom_config=zoom_config
             )
         elif shape_data.get('type') == 'rings':
-            # 预处理ring_width，如果为, 代表一组生成规则，解析后转换为列表
-            # 例如，((1, 5, 3), (6,11, 2))对应[3,3,3,3,3,2,2,2,2,2,2]
-            print(f"ring_width的raw type是: {type(shape_data.get('ring_width'))}")
-            ring_width_rule = ast.literal_eval(shape_data.get('ring_width'))
-            if isinstance(ring_width_rule, list) and isinstance(ring_width_rule[0], tuple):
-                logger.info(f"ring_width是list，且第一个元素是tuple。试图根据规则生成ring_width列表")
-                ring_width_list = []
-                # 校验ring_width的规则是否合规，正确的规则是：
-                # 1. 每个元素ring_width_rule[i]必须是tuple，且长度为3
-                # 2. ring_width_rule[i][1] = ring_width_rule[i+1][0]+1, 除非是最后一个元素
-                # 3. ring_width_rule[i][0] < ring_width_rule[i][1]
-                logger.info(f"ring_width_rule: {ring_width_rule}")
-                for i in range(len(ring_width_rule)-1):
-                    if not isinstance(ring_width_rule[i], tuple) or len(ring_width_rule[i]) != 3:
-                        logger.error(f"rule error1: ring_width的规则{ring_width_rule}格式错误，必须为tuple，且长度为3")
-                        print(f"ring_width_rule[i]: {ring_width_rule[i]}, {i}")
-                        return
-                    if not isinstance(ring_width_rule[i+1], tuple) or len(ring_width_rule[i+1]) != 3:
-                        logger.error(f"rule error2: ring_width的规则{ring_width_rule}格式错误，必须为tuple，且长度为3")
-                        return
-                    #if ring_width_rule[i][1] != ring_width_rule[i+1][0]+1:
-                    #    logger.error(f"ring_width的规则{ring_width_rule}格式错误，必须满足ring_width_rule[i][1] = ring_width_rule[i+1][0]+1")
-                    #     return
-                    #if ring_width_rule[i][0] >= ring_width_rule[i][1]:
-                    #    logger.error(f"ring_width的规则{ring_width_rule}格式错误，必须满足ring_width_rule[i][0] < ring_width_rule[i][1]")
-                    #    return
-                # 解析规则，生成ring_width_list
-                for rule in ring_width_rule:
-                    logger.info(f"rule: {rule}")
-                    ring_width_list += [rule[2]] * (rule[1] - rule[0] + 1)
-                shape_data['ring_width'] = ring_width_list  # 将处理后的ring_width列表赋值给shape_data
-            #logger.info(f"处理后的ring_width列表: {ring_width_list}")
-            elif isinstance(ring_width_rule, tuple):
-                ring_width_list = list(ring_width_rule)
-                shape_data['ring_width'] = ring_width_list  # 将处理后的ring_width列表赋值给shape_data
-                logger.info(f"转换ring_width输入列表为list: {ring_width_list}")
-            elif isinstance(ring_width_rule, (int, float)):
-                ring_width = float(ring_width_rule)
-                shape_data['ring_width'] = ring_width  # 将处理后的ring_width列表赋值给shape_data
-                logger.info(f"ring_width输入为单值，转换为list: {ring_width}")
-            else:
-                logger.error(f"ring_width输入格式错误，只能接收list或tuple或int/float，当前类型: {type(ring_width_rule)}")
+            # 预处理ring_width和ring_space，支持单值、列表以及规则列表
+            # 例如，ring_width为[(1, 5, 3), (6, 11, 2)]对应[3,3,3,3,3,2,2,2,2,2,2]
+            try:
+                shape_data['ring_width'] = parse_ring_rule(shape_data.get('ring_width'), inclusive=True)
+            except ValueError as e:
+                logger.error(f"ring_width输入格式错误: {e}")
                 return
             logger.info(f"处理后的ring_width: {shape_data['ring_width']}")
 
-            # 处理ring_space
-            print(f"ring_space的raw type是: {type(shape_data.get('ring_space'))}")
-            ring_space_rule = ast.literal_eval(shape_data.get('ring_space'))
-            if isinstance(ring_space_rule, list) and isinstance(ring_space_rule[0], tuple):
-                logger.info(f"ring_space是list，且第一个元素是list。试图根据规则生成ring_space列表")
-                ring_space_list = []
-                # 校验ring_width的规则是否合规，正确的规则是：
-                # 1. 每个元素ring_width_rule[i]必须是tuple，且长度为3
-                # 2. ring_width_rule[i][1] = ring_width_rule[i+1][0], 除非是最后一个元素
-                # 3. ring_width_rule[i][0] < ring_width_rule[i][1]
-                for i in range(len(ring_space_rule)-1):
-                    if not isinstance(ring_space_rule[i], tuple) or len(ring_space_rule[i]) != 3:
-                        logger.error(f"ring_space的规则{ring_space_rule[i]}格式错误，必须为tuple，且长度为3")
-                        return
-                    if not isinstance(ring_space_rule[i+1], tuple) or len(ring_space_rule[i+1]) != 3:
-                        logger.error(f"ring_space的规则{ring_space_rule[i]}格式错误，必须为tuple，且长度为3")
-                        return
-                    #if ring_space_rule[i][1] != ring_space_rule[i+1][0]:
-                    #    logger.error(f"ring_space的规则{ring_space_rule}格式错误，必须满足ring_space_rule[i][1] = ring_space_rule[i+1][0]")
-                    #    return
-                    #if ring_space_rule[i][0] >= ring_space_rule[i][1]:
-                    #    logger.error(f"ring_space的规则{ring_space_rule}格式错误，必须满足ring_space_rule[i][0] < ring_space_rule[i][1]")
-                    #    return
-                # 解析规则，生成ring_space_list
-                for rule in ring_space_rule:
-                    ring_space_list+=[rule[2]] * (rule[1] - rule[0])
-                shape_data['ring_space'] = ring_space_list  # 将处理后的ring_space列表赋值给shape_data
-            elif isinstance(ring_space_rule, tuple):
-                ring_space_list = list(ring_space_rule)
-                shape_data['ring_space'] = ring_space_list  # 将处理后的ring_space列表赋值给shape_data
-                logger.info(f"转换ring_space输入列表为list: {ring_space_list}")
-            elif isinstance(ring_space_rule, (int, float)):
-                ring_space = float(ring_space_rule)
-                shape_data['ring_space'] = ring_space  # 将处理后的ring_space列表赋值给shape_data
-                logger.info(f"ring_space输入为单值，转换为float: {ring_space}")
-            else:
-                logger.error(f"ring_space输入格式错误，只能接收list或tuple，当前类型: {type(ring_space_rule)}")
+            try:
+                shape_data['ring_space'] = parse_ring_rule(shape_data.get('ring_space'), inclusive=False)
+            except ValueError as e:
+                logger.error(f"ring_space输入格式错误: {e}")
                 return
             logger.info(f"处理后的ring_space列表: {shape_data['ring_space']}")
             
@@ -285,28 +371,53 @@ def main():
             logger.error(f"形状 '{shape_name}' 的类型未知: {shape_data.get('type')}")
             continue
         
-        # 添加到单元格
+        # 按单元格和图层分组批量插入
         if region_obj and not region_obj.get_klayout_region().is_empty():
-            cell.add_region(region_obj, layer_info)
+            key = (cell_name, layer_info)
+            regions = pending.setdefault(key, (cell, []))[1]
+            regions.append(region_obj)
             logger.info(f"添加形状 '{shape_name}' 到单元格 '{cell_name}' 的图层 {layer_info}")
+            if last_shape.get(key, -1) <= shape_index or (not merge_on_insert and len(regions) >= INSERT_BATCH_REGIONS):
+                del pending[key]
+                _insert_regions(cell_name, cell, layer_info, regions, merge_on_insert)
         elif region_obj and region_obj.get_klayout_region().is_empty():
             logger.warning(f"为形状 '{shape_name}' 创建的 Region 为空，未添加到GDS。可能由于倒角失败或顶点无效。")
         else:
             logger.error(f"未能为形状 '{shape_name}' 创建 Region 对象。")
     
+    if profiler:
+        profiler.end_shape()
+    
+    # 插入剩下的组（最后一个形状被跳过的组）
+    if progress:
+        progress('insert', len(shapes_config), len(shapes_config))
+    for (cell_name, layer_info), (cell, regions) in pending.items():
+        _insert_regions(cell_name, cell, layer_info, regions, merge_on_insert)
+    
     # 保存GDS文件
-    output_file = gds_config.get('output_file', 'output.gds')
+    output_file = resolve_path(gds_config.get('output_file', 'output.gds'))
     save_mapping_config = global_config.get('layer_mapping', {})
     
-    # 确保 mapping 文件名在 save_mapping 为 True 时被正确传递
+    # 确保 mapping 文件名在 save_mapping 为 True 时被正确传递；未指定文件名时与 GDS.save 的默认相同，
+    # 写在输出文件旁（<basename>.mapping.json），输出到同一目录的多次构建不会互相覆盖映射文件
     mapping_file_to_save = None
     if save_mapping_config.get('save', True): # 默认为 True
-        mapping_file_to_save = save_mapping_config.get('file', 'layer_mapping.txt')
+        mapping_file_to_save = save_mapping_config.get('file') or True
 
-    gds.save(output_file, save_mapping=mapping_file_to_save) # 修改参数名
+    if progress:
+        progress('save', len(shapes_config), len(shapes_config))
+    output_file = gds.save(output_file, save_mapping=mapping_file_to_save,
+                           options=gds_config.get('output')) # 修改参数名
+    if not output_file:
+        return None
     logger.info(f"GDS文件已保存: {output_file}")
-    if mapping_file_to_save:
-        logger.info(f"图层映射文件已保存: {mapping_file_to_save}")
+    if summary:
+        if progress:
+            progress('summary', len(shapes_config), len(shapes_config))
+        save_summary(gds.summary(), summary_report_path(output_file))
+    if progress:
+        progress('done', len(shapes_config), len(shapes_config))
+    return output_file
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
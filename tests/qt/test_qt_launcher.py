@@ -1,10 +1,12 @@
 import importlib.util
 import json
+import os
 import subprocess
 import sys
 import tempfile
 from pathlib import Path
 from typing import Dict
+from unittest import mock
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 LAUNCHER = [sys.executable, "-m", "web_gui.qt_launcher"]
@@ -124,6 +126,18 @@ def test_cli_precedence():
     assert summary["Open Browser"] == "True"
 
 
+def test_config_path_passed_to_app():
+    from web_gui import qt_launcher
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / "client_config.json"
+        config_path.write_text(json.dumps({"job_workers": 1}), encoding="utf-8")
+        with mock.patch.dict(os.environ):
+            assert qt_launcher.main([f"--config={config_path}", "--dry-run"]) == 0
+            # web_gui.app 导入时按它读取任务队列和结果缓存的配置
+            assert os.environ["SUMMER_GDS_WEBGUI_CONFIG"] == str(config_path.resolve())
+
+
 def test_missing_config_file():
     missing_path = PROJECT_ROOT / "non_exist_config.json"
     result = run_launcher([f"--config={missing_path}", "--dry-run"])
@@ -170,6 +184,7 @@ def main():
         (test_cli_overrides, "命令行覆盖"),
         (test_config_file_merge, "配置文件合并"),
         (test_cli_precedence, "命令行优先级"),
+        (test_config_path_passed_to_app, "配置文件传给 Web 应用"),
         (test_missing_config_file, "缺失配置文件"),
         (test_headless_seconds_positive, "Headless 秒数校验"),
         (test_wsgi_entry_requires_headless, "WSGI 参数依赖"),
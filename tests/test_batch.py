@@ -0,0 +1,63 @@
+import hashlib
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from web_gui.batch import MANIFEST_FILE, ZipStream, archive_name, parse_batch
+
+
+class TestBatch(unittest.TestCase):
+    def test_parse_batch(self):
+        config = {'gds': {'output_file': 'a.gds'}, 'shapes': []}
+        self.assertEqual(parse_batch([config]), [(None, config)])
+        self.assertEqual(parse_batch({'configs': [{'name': 'chip', 'config': config}, config]}),
+                         [('chip', config), (None, config)])
+        for body in (None, [], {'configs': {}}, [1], [{'name': 1, 'config': config}]):
+            with self.assertRaises(ValueError):
+                parse_batch(body)
+        with self.assertRaises(ValueError):
+            parse_batch([config] * 3, max_configs=2)
+
+    def test_archive_name(self):
+        used = set()
+        self.assertEqual(archive_name(None, 'output.gds', used), 'output.gds')
+        self.assertEqual(archive_name(None, 'output.gds', used), 'output-2.gds')
+        # 扩展名取自输出文件（输出选项可能改为 OASIS 或 gzip），名称中的路径和特殊字符被替换
+        self.assertEqual(archive_name('chip.gds', 'output.oas.gz', used), 'chip.oas.gz')
+        self.assertEqual(archive_name('../a b/芯片', 'output.gds', used), 'a_b_芯片.gds')
+        self.assertEqual(archive_name('..', 'x.gds', used), 'x.gds')
+        self.assertEqual(archive_name('manifest', 'x.json', used), 'manifest-2.json')
+        self.assertNotIn(MANIFEST_FILE, used)
+
+    def test_zip_stream(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'a.gds')
+            content = os.urandom(5000) + b'\0' * 5000
+            with open(path, 'wb') as f:
+                f.write(content)
+            archive = ZipStream()
+            chunks = []
+
+            def write():
+                sha256 = yield from archive.add_file('a.gds', path, chunk_size=1000)
+                self.assertEqual(sha256, hashlib.sha256(content).hexdigest())
+                yield from archive.add_file('b.gds.gz', path, compress=False)
+
+            chunks.extend(write())
+            self.assertGreater(len(chunks), 2)  # 文件按块写出，不等整个文件
+            chunks.append(archive.add_bytes(MANIFEST_FILE, '{}'))
+            chunks.append(archive.close())
+            with self.assertRaises(OSError):
+                next(ZipStream().add_file('c.gds', os.path.join(tmp, 'missing.gds')))
+
+        with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as z:
+            self.assertEqual(z.namelist(), ['a.gds', 'b.gds.gz', MANIFEST_FILE])
+            self.assertEqual(z.read('a.gds'), content)
+            self.assertEqual(z.getinfo('b.gds.gz').compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(z.read(MANIFEST_FILE), b'{}')
+            self.assertIsNone(z.testzip())
+
+
+if __name__ == '__main__':
+    unittest.main()
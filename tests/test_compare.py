@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+import klayout.db as db
+from gds_utils.compare import compare_layouts, compare_paths, main
+
+
+def write_layout(path, boxes, dbu=0.001, child=None):
+    """写出一个版图: boxes 为 {(layer, datatype): [db.Box]}，child 为放在子单元格中的 boxes"""
+    layout = db.Layout()
+    layout.dbu = dbu
+    top = layout.create_cell('TOP')
+    for info, items in boxes.items():
+        for box in items:
+            top.shapes(layout.layer(*info)).insert(box)
+    if child:
+        sub = layout.create_cell('SUB')
+        for info, items in child.items():
+            for box in items:
+                sub.shapes(layout.layer(*info)).insert(box)
+        top.insert(db.CellInstArray(sub.cell_index(), db.Trans()))
+    layout.write(path)
+    return path
+
+
+class TestCompare(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_identical_hierarchy_vs_flat(self):
+        square = db.Box(0, 0, 10000, 10000)
+        a = write_layout(self.path('a.gds'), {(1, 0): [square]})
+        b = write_layout(self.path('b.gds'), {}, child={(1, 0): [square]})
+        result = compare_layouts(a, b, threads=2, tile_size=3)
+        self.assertTrue(result['identical'])
+        self.assertEqual(result['layers'], [])
+
+    def test_reports_area_and_bbox(self):
+        a = write_layout(self.path('a.gds'), {(1, 0): [db.Box(0, 0, 10000, 10000)]})
+        b = write_layout(self.path('b.gds'), {(1, 0): [db.Box(0, 0, 10000, 10000), db.Box(20000, 0, 21000, 2000)],
+                                              (2, 0): [db.Box(0, 0, 1000, 1000)]})
+        result = compare_layouts(a, b, threads=2, tile_size=4)
+        self.assertFalse(result['identical'])
+        layers = {layer['layer']: layer for layer in result['layers']}
+        self.assertEqual(set(layers), {'1/0', '2/0'})
+        self.assertAlmostEqual(layers['1/0']['area'], 2.0)
+        self.assertEqual(layers['1/0']['polygons'], 1)
+        self.assertEqual(layers['1/0']['bbox'], [20.0, 0.0, 21.0, 2.0])
+        self.assertAlmostEqual(layers['2/0']['area'], 1.0)
+
+    def test_tolerance_and_dbu(self):
+        a = write_layout(self.path('a.gds'), {(1, 0): [db.Box(0, 0, 10000, 10000)]})
+        # dbu 不同，且上边缘偏移 0.002um
+        b = write_layout(self.path('b.gds'), {(1, 0): [db.Box(0, 0, 100000, 100020)]}, dbu=0.0001)
+        self.assertFalse(compare_layouts(a, b)['identical'])
+        self.assertTrue(compare_layouts(a, b, tolerance=0.005, tile_size=4)['identical'])
+
+    def test_directories_and_exit_code(self):
+        for side in ('a', 'b'):
+            os.makedirs(self.path(side))
+            write_layout(self.path(f'{side}/same.gds'), {(1, 0): [db.Box(0, 0, 1000, 1000)]})
+        write_layout(self.path('a/only_a.gds'), {(1, 0): [db.Box(0, 0, 1000, 1000)]})
+        results = compare_paths(self.path('a'), self.path('b'))
+        self.assertTrue(results['same.gds']['identical'])
+        self.assertEqual(results['only_a.gds'], {'identical': False, 'missing': 'b'})
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)  # main 在当前目录写日志文件
+        try:
+            self.assertEqual(main([self.path('a/same.gds'), self.path('b/same.gds')]), 0)
+            self.assertEqual(main([self.path('a'), self.path('b')]), 1)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    unittest.main()
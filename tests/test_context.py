@@ -0,0 +1,114 @@
+import logging
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+import yaml
+from gds_utils.context import BuildContext, current_context, resolve_path
+from gds_utils.utils import logger
+from main import main
+
+
+def write_config(base_dir, name, size):
+    """写出一个使用相对路径（vertices_file、output_file）的配置"""
+    np.save(os.path.join(base_dir, 'outline.npy'), np.array([[0, 0], [size, 0], [size, size], [0, size]], dtype=float))
+    config = {
+        'global': {'dbu': 0.001, 'layer_mapping': {'save': False}},
+        'gds': {'output_file': 'out/output.gds', 'cell_name': 'TOP', 'default_layer': [1, 0]},
+        'shapes': [{'type': 'polygon', 'name': name, 'vertices_file': 'outline.npy', 'layer': [1, 0], 'zoom': 0}],
+    }
+    with open(os.path.join(base_dir, 'config.yaml'), 'w') as f:
+        yaml.safe_dump(config, f)
+
+
+class TestBuildContext(unittest.TestCase):
+    def setUp(self):
+        # 与 setup_logging / Web 服务启动时一样，由进程而不是构建配置 logger 级别
+        self.addCleanup(logger.setLevel, logger.level)
+        logger.setLevel(logging.INFO)
+
+    def test_resolve(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            context = BuildContext(tmp)
+            self.assertEqual(context.resolve('a/b.gds'), os.path.join(tmp, 'a', 'b.gds'))
+            self.assertEqual(context.resolve('/abs/b.gds'), '/abs/b.gds')
+            self.assertIsNone(context.resolve(None))
+            self.assertEqual(current_context().base_dir, os.getcwd())
+            with context.activate():
+                self.assertIs(current_context(), context)
+                self.assertEqual(resolve_path('x.npy'), os.path.join(tmp, 'x.npy'))
+            self.assertIsNot(current_context(), context)
+
+    def test_log_isolation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            contexts = [BuildContext(tmp, f'build{i}.log') for i in range(2)]
+            barrier = threading.Barrier(2)
+
+            def work(i):
+                with contexts[i].activate():
+                    barrier.wait()
+                    for _ in range(20):
+                        logger.info(f"message from {i}")
+
+            threads = [threading.Thread(target=work, args=(i,)) for i in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            for i in range(2):
+                with open(os.path.join(tmp, f'build{i}.log'), encoding='utf-8') as f:
+                    lines = f.read().splitlines()
+                self.assertEqual(len(lines), 20)
+                self.assertTrue(all(f"message from {i}" in line for line in lines))
+            self.assertFalse(any(isinstance(h, logging.FileHandler) for h in logger.handlers))
+
+    def test_activate_keeps_logger_state(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            context = BuildContext(tmp, 'build.log', log_level=logging.WARNING)
+            with context.activate():
+                pass
+            handlers = list(logger.handlers)
+            with context.activate():
+                self.assertEqual(logger.level, logging.INFO)
+                self.assertEqual(logger.handlers, handlers)
+                logger.info("below the build log level")
+                logger.warning("recorded")
+            self.assertEqual(logger.level, logging.INFO)
+            with open(os.path.join(tmp, 'build.log'), encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 1)
+            self.assertIn("recorded", lines[0])
+
+    def test_concurrent_builds_without_chdir(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            dirs = []
+            for i in range(4):
+                base_dir = os.path.join(tmp, f'b{i}')
+                os.makedirs(base_dir)
+                write_config(base_dir, f'shape{i}', 10 * (i + 1))
+                dirs.append(base_dir)
+            results = [None] * len(dirs)
+
+            def build(i):
+                context = BuildContext(dirs[i], 'build.log')
+                results[i] = main(['config.yaml'], context=context)
+
+            threads = [threading.Thread(target=build, args=(i,)) for i in range(len(dirs))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(os.getcwd(), cwd)
+            for i, base_dir in enumerate(dirs):
+                self.assertEqual(results[i], os.path.join(base_dir, 'out', 'output.gds'))
+                with open(os.path.join(base_dir, 'build.log'), encoding='utf-8') as f:
+                    log = f.read()
+                self.assertIn(f'shape{i}', log)
+                self.assertFalse(any(f'shape{j}' in log for j in range(len(dirs)) if j != i))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from gds_utils.frame import Frame
+from gds_utils.estimate import estimate_config, fillet_point_counts
+from gds_utils.generators import generate_vertices
+from gds_utils.utils import parse_ring_rule
+
+
+class TestParseRingRule(unittest.TestCase):
+    def test_scalar(self):
+        self.assertEqual(parse_ring_rule("2"), 2.0)
+        self.assertEqual(parse_ring_rule(1.5), 1.5)
+
+    def test_tuple(self):
+        self.assertEqual(parse_ring_rule("(1, 2, 3)"), [1, 2, 3])
+
+    def test_rules(self):
+        self.assertEqual(parse_ring_rule("[(1, 3, 2), (4, 5, 1)]", inclusive=True), [2, 2, 2, 1, 1])
+        self.assertEqual(parse_ring_rule("[(1, 3, 2), (3, 5, 1)]", inclusive=False), [2, 2, 1, 1])
+        self.assertEqual(parse_ring_rule([(1, 3.0, 2)]), [2, 2, 2])
+
+    def test_invalid(self):
+        for bad in ("[(1, 2)]", "abc", "[]", "{'a': 1}", "[(1, 5.5, 3)]", "[(1, '5', 3)]", "[(True, 5, 3)]"):
+            with self.assertRaises(ValueError):
+                parse_ring_rule(bad)
+
+
+class TestEstimate(unittest.TestCase):
+    def test_fillet_point_counts_match_frame(self):
+        verts = [tuple(p) for p in generate_vertices({'shape_type': 'star', 'outer_radius': 15,
+                                                      'inner_radius': 7}).tolist()]
+        filleted = Frame(verts).apply_adaptive_fillet(1.5, 0.5, precision=0.01, interactive=False)
+        counts = fillet_point_counts(verts, 1.5, 0.5, 0.01)
+        self.assertEqual(int(counts.sum()), len(filleted.get_vertices()))
+
+    def test_estimate_config(self):
+        config = {
+            'gds': {'output_file': 'out.gds'},
+            'shapes': [
+                {'type': 'polygon', 'name': 'square', 'vertices': '0,0:10,0:10,10:0,10'},
+                {'type': 'rings', 'name': 'rings', 'vertices': '0,0:10,0:10,10:0,10',
+                 'ring_width': '2', 'ring_space': '3', 'ring_num': 3},
+                {'type': 'polygon', 'name': 'broken', 'vertices': '0,0:1'},
+            ]
+        }
+        report = estimate_config(config)
+        square, rings, broken = report['shapes']
+        self.assertEqual(square['vertices'], 4)
+        self.assertEqual(square['polygons'], 1)
+        self.assertEqual(rings['polygons'], 3)
+        self.assertEqual(rings['vertices'], 24)
+        self.assertIn('error', broken)
+        self.assertEqual(report['total']['polygons'], 4)
+        self.assertEqual(report['total']['errors'], 1)
+        self.assertGreater(report['total']['bytes'], 0)
+        self.assertGreater(report['total']['seconds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
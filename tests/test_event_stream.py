@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import unittest
+from web_gui.event_stream import EventTail, iter_events, sse_message
+
+
+class TestEventStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'events.jsonl')
+
+    def write(self, *seqs, tail=''):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for seq in seqs:
+                f.write(json.dumps({'seq': seq, 'type': 'progress', 'done': seq}) + '\n')
+            f.write(tail)
+
+    def test_sse_message(self):
+        self.assertEqual(sse_message({'a': '环'}, 'log', 3), 'id: 3\nevent: log\ndata: {"a": "环"}\n\n')
+
+    def test_tail(self):
+        tail = EventTail(self.path, last_id=1)
+        self.assertEqual(tail.read(), [])  # 文件尚未创建
+        self.write(1, 2, tail='{"seq": 3, "ty')
+        self.assertEqual([e['seq'] for _, e in tail.read()], [2])  # 跳过已收到的序号和写到一半的行
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('pe": "log"}\n')
+        self.assertEqual(tail.read(), [('log', {'seq': 3, 'type': 'log'})])
+        self.assertTrue(tail.drained)
+
+    def test_slow_client_skips_events(self):
+        self.write(*range(1, 201))
+        line = len(json.dumps({'seq': 100, 'type': 'progress', 'done': 100})) + 1
+        tail = EventTail(self.path, buffer_bytes=line * 10)
+        results = tail.read()
+        self.assertEqual(results[0][0], 'gap')
+        self.assertEqual(results[0][1]['from'], 1)
+        seqs = [e['seq'] for kind, e in results[1:]]
+        self.assertEqual(seqs[-1], 200)
+        self.assertLessEqual(len(seqs), 10)
+        self.assertEqual(results[0][1]['to'], seqs[0] - 1)
+
+    def test_iter_events(self):
+        self.write(1, 2)
+        states = iter([None, None, None, {'state': 'done'}])
+        sleeps = []
+
+        def finished():
+            status = next(states)
+            if status is not None:
+                self.write(3)  # 结束前最后写出的事件
+            return status
+
+        messages = list(iter_events(self.path, finished, heartbeat_interval=0.5, poll_interval=0.5,
+                                    sleep=sleeps.append))
+        self.assertTrue(messages[0].startswith('retry:'))
+        self.assertEqual([m.split('\n')[0] for m in messages[1:3]], ['id: 1', 'id: 2'])
+        self.assertIn(': keepalive\n\n', messages)
+        self.assertEqual(messages[-2].split('\n')[0], 'id: 3')
+        self.assertTrue(messages[-1].startswith('event: end'))
+        self.assertEqual(sleeps, [0.5, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
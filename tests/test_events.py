@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from gds_utils import Frame, Region
+from gds_utils.events import EventLog, current_events, report_progress
+from gds_utils.utils import logger
+
+
+class TestEvents(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'events.jsonl')
+
+    def read(self):
+        with open(self.path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_inactive_report_is_noop(self):
+        self.assertIsNone(current_events())
+        report_progress('rings', 1, 2)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_build_events(self):
+        frame = Frame([(0, 0), (10, 0), (10, 10), (0, 10)])
+        events = EventLog(self.path, min_interval=3600)
+        with events.activate():
+            events.stage('shapes', 0, 2, 'rings')
+            Region.create_rings(frame, ring_width=2, ring_space=3, ring_num=3)
+            logger.warning('注意')
+            events.stage('shapes', 1, 2, 'other')
+            events.stage('save', 2, 2)
+            events.stage('done', 2, 2)
+        self.assertIsNone(current_events())
+        logger.warning('上下文之外的日志不记录')
+
+        records = self.read()
+        self.assertEqual([r['seq'] for r in records], list(range(1, len(records) + 1)))
+        rings = [(r['done'], r['detail']) for r in records if r['type'] == 'progress' and r['stage'] == 'rings']
+        # 限流时每个阶段只保留第一个和最后一个
+        self.assertEqual(rings, [(1, 'fillet_outer'), (3, 'fillet_outer'), (1, 'fillet_inner'), (3, 'fillet_inner'),
+                                 (1, 'boolean'), (3, 'boolean')])
+        self.assertEqual([r['message'] for r in records if r['type'] == 'log'], ['注意'])
+        timings = [(r['stage'], r['detail']) for r in records if r['type'] == 'timing']
+        self.assertEqual(timings, [('shapes', 'rings'), ('shapes', 'other'), ('save', None)])
+        self.assertEqual(records[-1]['stage'], 'done')
+
+    def test_skipped_ring_reports_completion(self):
+        frame = Frame([(0, 0), (10, 0), (10, 10), (0, 10)])
+        get_vertices = Frame.get_vertices
+
+        def drop_last_outer(f):
+            # 最外一环的外边界（x 达到 22）按顶点不足处理，该环被跳过
+            vertices = get_vertices(f)
+            return [] if max(x for x, _ in vertices) > 21 else vertices
+
+        events = EventLog(self.path, min_interval=3600)
+        with events.activate(), mock.patch.object(Frame, 'get_vertices', drop_last_outer):
+            Region.create_rings(frame, ring_width=2, ring_space=3, ring_num=3)
+
+        boolean = [(r['done'], r['total']) for r in self.read()
+                   if r['type'] == 'progress' and r.get('detail') == 'boolean']
+        self.assertEqual(boolean[-1], (3, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import klayout.db as db
+from gds_utils.gds import GDS, parse_layer_spec
+
+
+def write_template(path):
+    """TOP -> A -> B 的层次结构，另有独立单元格 C，每个单元格一个图层"""
+    layout = db.Layout()
+    for name in ("TOP", "A", "B", "C"):
+        layout.create_cell(name)
+    layout.cell("TOP").insert(db.CellInstArray(layout.cell("A").cell_index(), db.Trans()))
+    layout.cell("A").insert(db.CellInstArray(layout.cell("B").cell_index(), db.Trans()))
+    for name, layer in (("TOP", 1), ("A", 2), ("B", 3), ("C", 1)):
+        layout.cell(name).shapes(layout.layer(layer, 0)).insert(db.Box(0, 0, 10, 10))
+    layout.write(path)
+
+
+class TestSelectiveLoad(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'template.gds')
+        write_template(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_layer_spec(self):
+        self.assertEqual(parse_layer_spec([1, 2]), (1, 2))
+        self.assertEqual(parse_layer_spec("3/4"), (3, 4))
+        self.assertEqual(parse_layer_spec(5), (5, 0))
+        for bad in ("a/b", [1], True, "1/2/3"):
+            with self.assertRaises(ValueError):
+                parse_layer_spec(bad)
+
+    def test_lazy_cells(self):
+        gds = GDS(input_file=self.path)
+        self.assertEqual(gds.cells, {})
+        cell = gds.get_cell("A")
+        self.assertIs(gds.get_cell("A"), cell)
+        self.assertEqual(list(gds.cells), ["A"])
+        self.assertIsNone(gds.get_cell("missing"))
+        self.assertIs(gds.create_cell("A"), cell)
+        self.assertEqual(sorted(c.kdb_cell.name for c in gds.get_cells()), ["A", "B", "C", "TOP"])
+
+    def test_filter_layers_and_cells(self):
+        gds = GDS(input_file=self.path, input_layers=["2/0", [3, 0]], input_cells=["A"])
+        layout = gds.kdb_layout
+        self.assertEqual(sorted(c.name for c in layout.each_cell()), ["A", "B"])
+        self.assertEqual(sorted((li.layer, li.datatype) for li in layout.layer_infos()), [(2, 0), (3, 0)])
+        self.assertEqual(gds.get_cell("B").kdb_cell.shapes(layout.find_layer(3, 0)).size(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
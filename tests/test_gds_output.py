@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+import klayout.db as db
+from gds_utils.gds import GDS, resolve_output_file, make_save_options, output_format, canonical_layout
+from gds_utils.region import Region
+from gds_utils.frame import Frame
+from gds_utils.utils import atomic_write_path
+
+
+class TestOutputOptions(unittest.TestCase):
+    def test_resolve_output_file(self):
+        self.assertEqual(resolve_output_file('out.gds'), 'out.gds')
+        self.assertEqual(resolve_output_file('out.gds', {'format': 'oasis'}), 'out.oas')
+        self.assertEqual(resolve_output_file('out.gds', {'gzip': True}), 'out.gds.gz')
+        self.assertEqual(resolve_output_file('out.gds.gz'), 'out.gds.gz')
+        self.assertEqual(resolve_output_file('out.gds.gz', {'gzip': False}), 'out.gds')
+        self.assertEqual(output_format('out.oasis'), 'oasis')
+        with self.assertRaises(ValueError):
+            output_format('out.gds', {'format': 'dxf'})
+
+    def test_make_save_options(self):
+        options = make_save_options('out.oas', {'cblocks': False, 'strict': False, 'compression_level': 5})
+        self.assertEqual(options.format, 'OASIS')
+        self.assertFalse(options.oasis_write_cblocks)
+        self.assertFalse(options.oasis_strict_mode)
+        self.assertEqual(options.oasis_compression_level, 5)
+        self.assertEqual(make_save_options('out.gds').format, 'GDS2')
+        with self.assertRaises(ValueError):
+            make_save_options('out.oas', {'compression_level': 11})
+
+    def test_save_formats(self):
+        gds = GDS(cell_name='TOP')
+        square = Frame([(0, 0), (10, 0), (10, 10), (0, 10)])
+        gds.get_cell('TOP').add_region(Region.create_polygon(square), (1, 0))
+        with tempfile.TemporaryDirectory() as tmp:
+            base = os.path.join(tmp, 'out.gds')
+            for options, suffix in (({}, '.gds'), ({'format': 'oasis'}, '.oas'), ({'gzip': True}, '.gds.gz')):
+                written = gds.save(base, save_mapping=False, options=options)
+                self.assertTrue(written.endswith(suffix))
+                layout = db.Layout()
+                layout.read(written)
+                region = db.Region(layout.top_cell().begin_shapes_rec(layout.find_layer(1, 0)))
+                self.assertAlmostEqual(region.area() * layout.dbu ** 2, 100)
+            with open(os.path.join(tmp, 'out.gds.gz'), 'rb') as f:
+                self.assertEqual(f.read(2), b'\x1f\x8b')
+            self.assertIsNone(gds.save(base, save_mapping=False, options={'format': 'dxf'}))
+
+
+class TestDeterministicOutput(unittest.TestCase):
+    @staticmethod
+    def build(reverse):
+        """内容相同、单元格/图层/形状/实例创建顺序不同的版图"""
+        gds = GDS(cell_name='TOP')
+        layout = gds.kdb_layout
+        order = (lambda items: items[::-1]) if reverse else list
+        cells = {name: layout.create_cell(name) for name in order(['A', 'B'])}
+        layers = {info: layout.layer(*info) for info in order([(1, 0), (2, 0)])}
+        polygons = [db.Polygon([db.Point(0, 0), db.Point(100, 0), db.Point(100, 100)]),
+                    db.Polygon([db.Point(500, 500), db.Point(600, 500), db.Point(600, 650)])]
+        for polygon in order(polygons):
+            cells['A'].shapes(layers[(1, 0)]).insert(polygon)
+            cells['B'].shapes(layers[(2, 0)]).insert(polygon)
+        for name, trans in order([('A', db.Trans()), ('B', db.Trans(10, 10))]):
+            layout.cell('TOP').insert(db.CellInstArray(cells[name].cell_index(), trans))
+        return gds
+
+    def test_identical_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for options in ({'deterministic': True}, {'deterministic': True, 'format': 'oasis'},
+                            {'deterministic': True, 'gzip': True}):
+                written, digests = [], []
+                for reverse in (False, True):
+                    gds = self.build(reverse)
+                    path = gds.save(os.path.join(tmp, f'out{int(reverse)}.gds'), save_mapping=False, options=options)
+                    with open(path, 'rb') as f:
+                        written.append(f.read())
+                    digests.append(gds.output_digest)
+                self.assertEqual(written[0], written[1], options)
+                self.assertEqual(digests[0], digests[1])
+                self.assertEqual(len(digests[0]), 64)
+
+    def test_timestamps_default(self):
+        self.assertFalse(make_save_options('out.gds', {'deterministic': True}).gds2_write_timestamps)
+        self.assertTrue(make_save_options('out.gds').gds2_write_timestamps)
+
+    def test_canonical_layout_content(self):
+        layout = self.build(True).kdb_layout
+        canonical = canonical_layout(layout)
+        self.assertEqual([cell.name for cell in canonical.each_cell()], ['A', 'B', 'TOP'])
+        for info in ((1, 0), (2, 0)):
+            original = db.Region(layout.top_cell().begin_shapes_rec(layout.find_layer(*info)))
+            copied = db.Region(canonical.top_cell().begin_shapes_rec(canonical.find_layer(*info)))
+            self.assertTrue((original ^ copied).is_empty())
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def test_replace_on_success(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            target = os.path.join(tmp, 'out.gds.gz')
+            with atomic_write_path(target) as temp_file:
+                self.assertTrue(temp_file.endswith('out.gds.gz'))
+                self.assertEqual(os.path.dirname(temp_file), tmp)
+                with open(temp_file, 'w') as f:
+                    f.write('new')
+            with open(target) as f:
+                self.assertEqual(f.read(), 'new')
+            self.assertEqual(os.listdir(tmp), ['out.gds.gz'])
+
+    def test_keep_original_on_failure(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            target = os.path.join(tmp, 'out.gds')
+            with open(target, 'w') as f:
+                f.write('old')
+            with self.assertRaises(RuntimeError):
+                with atomic_write_path(target) as temp_file:
+                    with open(temp_file, 'w') as f:
+                        f.write('partial')
+                    raise RuntimeError('crash')
+            with open(target) as f:
+                self.assertEqual(f.read(), 'old')
+            self.assertEqual(os.listdir(tmp), ['out.gds'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import os
 import yaml
 from gds_utils import GDS, Frame, Region
+from gds_utils.layer import LayerManager
 from gds_utils.utils import setup_logging, logger
 
 class TestGDSUtils(unittest.TestCase):
@@ -62,6 +63,13 @@ class TestGDSUtils(unittest.TestCase):
         if os.path.exists('test_layer_mapping.txt'):
             os.remove('test_layer_mapping.txt')
 
+    @classmethod
+    def tearDownClass(cls):
+        # GDS.save 在输出文件旁写出 <basename>.mapping.json
+        for path in ('test_output.gds', 'test_output.mapping.json', 'test_layer_mapping.txt', 'test_config.yaml'):
+            if os.path.exists(path):
+                os.remove(path)
+
     def test_frame_creation(self):
         """测试Frame创建和基本操作"""
         vertices = [(0, 0), (10, 0), (10, 10), (0, 10)]
@@ -166,5 +174,10 @@ class TestGDSUtils(unittest.TestCase):
         layer_manager.save_mapping('test_layer_mapping.txt')
         self.assertTrue(os.path.exists('test_layer_mapping.txt'))
 
+        # 与 GDS.save() 的映射文件同一格式，可以读回
+        other = LayerManager()
+        other.load_mapping('test_layer_mapping.txt')
+        self.assertEqual(other.get_layer_name((1, 0)), 'metal1')
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,108 @@
+import unittest
+import math
+from unittest import mock
+import numpy as np
+from gds_utils import generators
+from gds_utils.generators import generate_vertices, register_generator, available_generators
+from gds_utils.frame import Frame
+
+
+def signed_area(pts):
+    x, y = pts[:, 0], pts[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+class TestGenerators(unittest.TestCase):
+    def test_builtin_generators_registered(self):
+        for name in ('star', 'circle', 'ellipse', 'regular_polygon', 'rounded_rectangle'):
+            self.assertIn(name, available_generators())
+
+    def test_star_matches_reference_loop(self):
+        cfg = {'shape_type': 'star', 'center_x': 50, 'center_y': 50,
+               'outer_radius': 15, 'inner_radius': 7, 'points': 5}
+        pts = generate_vertices(cfg)
+        expected = []
+        for i in range(10):
+            angle = math.pi / 5 * i - math.pi / 2
+            r = 15 if i % 2 == 0 else 7
+            expected.append((50 + r * math.cos(angle), 50 + r * math.sin(angle)))
+        np.testing.assert_allclose(pts, np.array(expected))
+
+    def test_circle(self):
+        pts = generate_vertices({'shape_type': 'circle', 'center_x': 1, 'center_y': 2,
+                                 'radius': 5, 'segments': 512})
+        self.assertEqual(pts.shape, (512, 2))
+        np.testing.assert_allclose(np.hypot(pts[:, 0] - 1, pts[:, 1] - 2), 5)
+        self.assertGreater(signed_area(pts), 0)
+
+    def test_circle_segments_out_of_range(self):
+        # 与前端预览一致: 精度超出 3-512 时使用默认值 64
+        for segments in (2, 1024):
+            pts = generate_vertices({'shape_type': 'circle', 'radius': 5, 'segments': segments})
+            self.assertEqual(len(pts), 64)
+
+    def test_ellipse_rotation(self):
+        pts = generate_vertices({'shape_type': 'ellipse', 'radius_x': 10, 'radius_y': 5,
+                                 'segments': 4, 'rotation': 90})
+        np.testing.assert_allclose(pts[0], [0, 10], atol=1e-12)
+
+    def test_regular_polygon(self):
+        pts = generate_vertices({'shape_type': 'regular_polygon', 'radius': 2, 'sides': 6})
+        self.assertEqual(len(pts), 6)
+        # 底边水平
+        self.assertAlmostEqual(pts[0][1], pts[-1][1])
+        self.assertGreater(signed_area(pts), 0)
+
+    def test_rounded_rectangle(self):
+        pts = generate_vertices({'shape_type': 'rounded_rectangle', 'width': 20, 'height': 10,
+                                 'corner_radius': 2, 'corner_segments': 8})
+        self.assertEqual(len(pts), 36)
+        self.assertAlmostEqual(pts[:, 0].max(), 10)
+        self.assertAlmostEqual(pts[:, 1].max(), 5)
+        expected_area = 20 * 10 - (4 - math.pi) * 4
+        self.assertAlmostEqual(signed_area(pts), expected_area, delta=0.2)
+
+        plain = generate_vertices({'shape_type': 'rounded_rectangle', 'width': 4, 'height': 2})
+        self.assertEqual(len(plain), 4)
+
+        # 圆角半径等于半高时不应出现重复点
+        stadium = generate_vertices({'shape_type': 'rounded_rectangle', 'width': 4, 'height': 2,
+                                     'corner_radius': 1, 'corner_segments': 4})
+        self.assertFalse(np.any(np.all(np.diff(stadium, axis=0) == 0, axis=1)))
+
+    def test_invalid_config(self):
+        with self.assertRaises(ValueError):
+            generate_vertices({'shape_type': 'unknown'})
+        with self.assertRaises(ValueError):
+            generate_vertices({'shape_type': 'circle', 'radius': 0})
+        with self.assertRaises(ValueError):
+            generate_vertices({'shape_type': 'rounded_rectangle', 'width': 4, 'height': 2, 'corner_radius': 3})
+        for radii in ({'outer_radius': 5, 'inner_radius': 10}, {'outer_radius': 5, 'inner_radius': 5},
+                      {'outer_radius': 10, 'inner_radius': 0}, {'outer_radius': -10, 'inner_radius': -5}):
+            with self.assertRaises(ValueError):
+                generate_vertices({'shape_type': 'star', **radii})
+        # 类型错误的参数同样作为参数错误报告，调用方只需处理 ValueError
+        for gen_config in ({'shape_type': 'circle', 'radius': None}, {'shape_type': 'circle', 'radius': [1]},
+                           {'shape_type': 'star', 'center_x': {}}, {'shape_type': 'circle', 'segments': None},
+                           {'shape_type': 'circle', 'radius': float('inf')}, 'circle'):
+            with self.assertRaises(ValueError):
+                generate_vertices(gen_config)
+
+    def test_custom_generator(self):
+        # 注册表是进程级的，测试结束后恢复，避免影响其他测试
+        registry = mock.patch.dict(generators._GENERATORS)
+        registry.start()
+        self.addCleanup(registry.stop)
+
+        @register_generator('unit_triangle')
+        def _triangle(cfg):
+            return np.array([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+
+        pts = generate_vertices({'shape_type': 'unit_triangle'})
+        frame = Frame([tuple(p) for p in pts.tolist()])
+        self.assertFalse(frame.is_clockwise())
+        self.assertIn('unit_triangle', available_generators())
+
+
+if __name__ == '__main__':
+    unittest.main()
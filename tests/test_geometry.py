@@ -0,0 +1,94 @@
+import math
+import struct
+import unittest
+import numpy as np
+import klayout.db as db
+from gds_utils.geometry import HEADER, LAYER_HEADER, decode_geometry, encode_geometry
+
+
+class TestGeometry(unittest.TestCase):
+    def build(self):
+        layout = db.Layout()
+        top = layout.create_cell('TOP')
+        sub = layout.create_cell('SUB')
+        sub.shapes(layout.layer(2, 0)).insert(db.Box(0, 0, 1000, 500))
+        top.insert(db.CellInstArray(sub.cell_index(), db.Trans(db.Vector(10000, 0))))
+        ring = db.Polygon([db.Point(int(5000 * math.cos(a)), int(5000 * math.sin(a)))
+                           for a in np.linspace(0, 2 * math.pi, 1000, endpoint=False)])
+        ring.insert_hole([db.Point(-1000, -1000), db.Point(-1000, 1000), db.Point(1000, 1000), db.Point(1000, -1000)])
+        top.shapes(layout.layer(1, 0)).insert(ring)
+        return layout
+
+    def test_round_trip(self):
+        layout = self.build()
+        for coord_type in ('int32', 'float32'):
+            result = decode_geometry(encode_geometry(layout, coord_type=coord_type))
+            self.assertEqual(sorted(result['layers']), ['1/0', '2/0'])
+            box = result['layers']['2/0'][0]
+            self.assertEqual(sorted(map(tuple, box.round(6).tolist())),
+                             [(10.0, 0.0), (10.0, 0.5), (11.0, 0.0), (11.0, 0.5)])  # 子单元格展平
+            ring = result['layers']['1/0']
+            self.assertEqual(len(ring), 1)  # 孔洞用切线连接到外轮廓
+            points = set(map(tuple, ring[0].round(6).tolist()))
+            self.assertTrue({(-1.0, -1.0), (-1.0, 1.0), (1.0, 1.0), (1.0, -1.0)} <= points)
+
+    def test_layout_alignment(self):
+        data = encode_geometry(self.build())
+        magic, version, _, _, layer_count, _, origin_x, origin_y, scale = HEADER.unpack_from(data, 0)
+        self.assertEqual((magic, version, layer_count), (b'SGEO', 1, 2))
+        self.assertEqual((origin_x, origin_y, scale), (-5.0, -5.0, 0.001))
+        position = HEADER.size
+        for _ in range(layer_count):
+            self.assertEqual(position % 4, 0)
+            _, _, polygons, points = LAYER_HEADER.unpack_from(data, position)
+            position += LAYER_HEADER.size + (polygons + 1) * 4 + points * 8
+        self.assertEqual(position, len(data))
+
+    def test_viewport_and_quantum(self):
+        layout = self.build()
+        result = decode_geometry(encode_geometry(layout, viewport=(9.5, -1, 20, 1), quantum=0.1))
+        self.assertEqual(list(result['layers']), ['2/0'])
+        self.assertEqual(result['scale'], 0.1)
+        self.assertEqual(result['layers']['2/0'][0].min(axis=0).round(6).tolist(), [10.0, 0.0])
+
+        clipped = decode_geometry(encode_geometry(layout, viewport=(0, 0, 20, 20)))
+        self.assertGreaterEqual(clipped['layers']['1/0'][0].min(), 0.0)
+
+    def test_decimation(self):
+        layout = self.build()
+        full = decode_geometry(encode_geometry(layout))
+        coarse = decode_geometry(encode_geometry(layout, pixels=50))
+        self.assertLess(len(coarse['layers']['1/0'][0]), len(full['layers']['1/0'][0]) / 5)
+        self.assertEqual(len(coarse['layers']['2/0'][0]), 4)  # 小于两个像素的图形以包围框代替
+
+    def test_polygon_over_gds_vertex_limit(self):
+        # 超过 GDS 单个 BOUNDARY 顶点上限的多边形被切分，顶点仍全部保留
+        layout = db.Layout()
+        circle = db.Polygon([db.Point(int(100000 * math.cos(a)), int(100000 * math.sin(a)))
+                             for a in np.linspace(0, 2 * math.pi, 20000, endpoint=False)])
+        layout.create_cell('TOP').shapes(layout.layer(1, 0)).insert(circle)
+        pieces = decode_geometry(encode_geometry(layout))['layers']['1/0']
+        self.assertGreater(len(pieces), 1)
+        self.assertGreaterEqual(sum(len(piece) for piece in pieces), circle.num_points())
+        points = np.concatenate(pieces)
+        np.testing.assert_allclose(points.min(axis=0), [-100, -100], atol=0.01)
+        np.testing.assert_allclose(points.max(axis=0), [100, 100], atol=0.01)
+
+    def test_errors(self):
+        layout = self.build()
+        with self.assertRaises(ValueError):
+            encode_geometry(layout, coord_type='int16')
+        with self.assertRaises(ValueError):
+            encode_geometry(layout, viewport=(1, 1, 0, 0))
+        with self.assertRaises(ValueError):
+            encode_geometry(layout, quantum=0.0001)
+        with self.assertRaises(ValueError):
+            encode_geometry(layout, cell_name='NOPE')
+        with self.assertRaises(ValueError):
+            decode_geometry(struct.pack('<4s36x', b'XXXX'))
+        empty = decode_geometry(encode_geometry(db.Layout()))
+        self.assertEqual(empty['layers'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import Future
+from web_gui.jobs import JobManager, QueueFullError, load_job_settings, PROGRESS_FILE
+
+
+class PendingExecutor:
+    """记录提交的任务，返回由测试控制完成的 Future"""
+
+    def __init__(self, workers):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append((future, args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class TestJobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.executors = []
+        self.manager = JobManager(workers=1, queue_depth=1, executor_factory=self.make_executor)
+
+    def make_executor(self, workers):
+        executor = PendingExecutor(workers)
+        self.executors.append(executor)
+        return executor
+
+    def submit(self, job_id):
+        build_dir = os.path.join(self.tmp.name, job_id)
+        os.makedirs(build_dir)
+        output_file = os.path.join(build_dir, 'output.gds')
+        self.manager.submit(job_id, build_dir, self.tmp.name, ['config.yaml'], output_file, meta={'summary': True})
+        return build_dir, output_file
+
+    def test_load_settings(self):
+        self.assertEqual(load_job_settings(None), {'workers': 2, 'queue_depth': 8})
+        path = os.path.join(self.tmp.name, 'client.json')
+        with open(path, 'w') as f:
+            json.dump({'webgui_port': 5002, 'job_workers': 4, 'job_queue_depth': 0}, f)
+        self.assertEqual(load_job_settings(path), {'workers': 4, 'queue_depth': 0})
+        with open(path, 'w') as f:
+            json.dump({'job_workers': 0}, f)
+        with self.assertRaises(ValueError):
+            load_job_settings(path)
+
+    def test_queue_limit(self):
+        self.submit('build-a')
+        self.submit('build-b')
+        with self.assertRaises(QueueFullError):
+            self.submit('build-c')
+        self.assertEqual(self.manager.stats()['active'], 2)
+        # 完成一个任务后可以继续提交
+        self.executors[0].futures[0][0].set_result(None)
+        self.submit('build-d')
+        self.assertEqual(len(self.executors), 1)  # 进程池只创建一次
+
+    def test_states(self):
+        build_dir, output_file = self.submit('build-a')
+        future, args = self.executors[0].futures[0]
+        self.assertIn('--progress', args[1])
+        self.assertIn('--events', args[1])
+        self.assertEqual(self.manager.status('build-a')['state'], 'queued')
+
+        with open(os.path.join(build_dir, PROGRESS_FILE), 'w') as f:
+            json.dump({'stage': 'shapes', 'done': 1, 'total': 3}, f)
+        status = self.manager.status('build-a')
+        self.assertEqual(status['state'], 'running')
+        self.assertEqual(status['progress']['done'], 1)
+
+        with open(output_file, 'w') as f:
+            f.write('gds')
+        future.set_result(output_file)
+        status = self.manager.status('build-a')
+        self.assertEqual(status['state'], 'done')
+        self.assertIsNotNone(status['finished'])
+        self.assertEqual(self.manager.get('build-a')['meta'], {'summary': True})
+        self.assertIsNone(self.manager.status('build-missing'))
+
+        self.manager.prune(0)
+        self.assertIsNone(self.manager.status('build-a'))
+
+    def test_failed(self):
+        self.submit('build-a')
+        self.submit('build-b')
+        self.executors[0].futures[0][0].set_result(None)
+        self.executors[0].futures[1][0].set_exception(RuntimeError('boom'))
+        self.assertEqual(self.manager.status('build-a')['state'], 'failed')
+        self.assertEqual(self.manager.status('build-b')['error'], 'boom')
+
+    def test_submit_build(self):
+        # 批量生成的构建使用同一个进程池，不登记为任务，也不占用排队名额
+        self.submit('build-a')
+        self.submit('build-b')
+        future = self.manager.submit_build(self.tmp.name, self.tmp.name, ['config.yaml'])
+        self.assertEqual(len(self.executors), 1)
+        self.assertIs(self.executors[0].futures[2][0], future)
+        self.assertEqual(self.executors[0].futures[2][1][1],
+                         ['config.yaml', '--progress', os.path.join(self.tmp.name, PROGRESS_FILE)])
+        self.assertEqual(self.manager.stats()['jobs'], 2)
+        # 执行中的任务和批量构建的目录不按时间清理
+        self.assertEqual(self.manager.active_ids(), {'build-a', 'build-b', os.path.basename(self.tmp.name)})
+        self.executors[0].futures[0][0].set_result(None)
+        future.set_result((None, 0.0))
+        self.assertEqual(self.manager.active_ids(), {'build-b'})
+
+
+if __name__ == '__main__':
+    unittest.main()
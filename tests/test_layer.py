@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import klayout.db as db
+import main
+from gds_utils.cell import Cell
+from gds_utils.gds import GDS
+from gds_utils.layer import LayerManager
+from gds_utils.region import Region
+from gds_utils.frame import Frame
+
+
+class TestSharedLayerRegistry(unittest.TestCase):
+    def test_cells_share_registry(self):
+        gds = GDS(cell_name='TOP')
+        sub = gds.create_cell('SUB')
+        self.assertIs(gds.get_cell('TOP').get_layer_manager(), sub.get_layer_manager())
+
+        square = Region.create_polygon(Frame([(0, 0), (10, 0), (10, 10), (0, 10)]))
+        sub.add_region(square, (5, 1))
+        index = gds.layer_manager.get_layer_index((5, 1))
+        self.assertEqual(index, gds.kdb_layout.find_layer(5, 1))
+        gds.get_cell('TOP').add_region(square, (5, 1))
+        self.assertEqual(len(gds.kdb_layout.layer_indexes()), 1)
+
+    def test_resolve_by_name(self):
+        gds = GDS(cell_name='TOP')
+        gds.layer_manager.create_layer((7, 2), 'metal1')
+        self.assertEqual(gds.resolve_layer('metal1'), (7, 2))
+        self.assertEqual(gds.resolve_layer('3/1'), (3, 1))
+        self.assertEqual(gds.resolve_layer([4, 0]), (4, 0))
+        with self.assertRaises(ValueError):
+            gds.resolve_layer('metal9')
+
+        gds.layer_manager.create_layer((7, 2), 'M1')
+        self.assertIsNone(gds.layer_manager.get_layer_by_name('metal1'))
+        self.assertEqual(gds.resolve_layer('M1'), (7, 2))
+
+    def test_registers_existing_layout_layers(self):
+        layout = db.Layout()
+        layout.layer(db.LayerInfo(1, 0))
+        layout.layer(db.LayerInfo(2, 0, 'poly'))
+        manager = LayerManager(layout)
+        self.assertEqual(manager.get_layer_index((2, 0)), 1)
+        self.assertEqual(manager.resolve('poly'), (2, 0))
+        self.assertEqual(manager.ensure_layer((3, 0)), layout.find_layer(3, 0))
+
+
+
+class TestAddRegions(unittest.TestCase):
+    def test_bulk_insert_and_merge(self):
+        gds = GDS(cell_name='TOP')
+        cell = gds.get_cell('TOP')
+        a = Region.create_polygon(Frame([(0, 0), (10, 0), (10, 10), (0, 10)]))
+        b = Region.create_polygon(Frame([(5, 0), (15, 0), (15, 10), (5, 10)]))
+        c = db.Region(db.Box(100000, 0, 110000, 10000))
+        counts = cell.add_regions({(1, 0): [a, b], (2, 0): [c]})
+        self.assertEqual(counts, {(1, 0): 2, (2, 0): 1})
+
+        counts = cell.add_regions({(3, 0): [a, b]}, merge=True)
+        self.assertEqual(counts, {(3, 0): 1})
+        shapes = cell.kdb_cell.shapes(gds.kdb_layout.find_layer(3, 0))
+        self.assertEqual(shapes.size(), 1)
+        self.assertAlmostEqual(db.Region(shapes).area() * gds.kdb_layout.dbu ** 2, 150)
+
+
+class TestBuildInsert(unittest.TestCase):
+    def build(self, merge, batch=main.INSERT_BATCH_REGIONS):
+        square = '0,0:10,0:10,10:0,10'
+        shifted = '5,0:15,0:15,10:5,10'
+        far = '100,0:110,0:110,10:100,10'
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        config = {
+            'global': {'merge_on_insert': merge, 'layer_mapping': {'save': False}},
+            'gds': {'output_file': os.path.join(tmp.name, 'out.gds')},
+            'shapes': [{'type': 'polygon', 'vertices': square, 'layer': [1, 0]},
+                       {'type': 'polygon', 'vertices': far, 'layer': [2, 0]},
+                       {'type': 'polygon', 'vertices': shifted, 'layer': [1, 0]},
+                       {'type': 'polygon', 'vertices': far, 'layer': [3, 0]},
+                       {'type': 'polygon', 'vertices': '', 'layer': [3, 0]}],
+        }
+        calls = []
+        original = Cell.add_regions
+
+        def add_regions(cell, regions_by_layer, merge=False):
+            calls.append({layer: len(regions) for layer, regions in regions_by_layer.items()})
+            return original(cell, regions_by_layer, merge=merge)
+
+        with mock.patch.object(Cell, 'add_regions', add_regions), \
+                mock.patch.object(main, 'INSERT_BATCH_REGIONS', batch):
+            output_file = main.build_gds(config)
+        layout = db.Layout()
+        layout.read(output_file)
+        top = layout.top_cell()
+        sizes = {(1, 0): top.shapes(layout.find_layer(1, 0)).size()}
+        return calls, sizes
+
+    def test_layers_inserted_after_their_last_shape(self):
+        calls, sizes = self.build(merge=True)
+        # 图层 2 在第二个形状后插入；图层 1 的两个形状一起合并；图层 3 的最后一个形状无效，在结束时插入
+        self.assertEqual(calls, [{(2, 0): 1}, {(1, 0): 2}, {(3, 0): 1}])
+        self.assertEqual(sizes, {(1, 0): 1})
+
+    def test_batch_threshold_without_merge(self):
+        calls, sizes = self.build(merge=False, batch=1)
+        self.assertEqual(calls, [{(1, 0): 1}, {(2, 0): 1}, {(1, 0): 1}, {(3, 0): 1}])
+        self.assertEqual(sizes, {(1, 0): 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import klayout.db as db
+from gds_utils.gds import GDS
+from gds_utils import layout_cache
+from gds_utils.layout_cache import LayoutCache, estimate_layout_bytes
+from gds_utils.gds import read_layout
+
+
+def write_layout(path, size=10):
+    layout = db.Layout()
+    cell = layout.create_cell("TOP")
+    cell.shapes(layout.layer(1, 0)).insert(db.Box(0, 0, size, size))
+    layout.write(path)
+
+
+class TestLayoutCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'template.gds')
+        write_layout(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_returns_independent_copy(self):
+        cache = LayoutCache(1 << 20)
+        first = GDS(input_file=self.path, layout_cache=cache)
+        first.get_cell("TOP").kdb_cell.shapes(first.kdb_layout.layer(2, 0)).insert(db.Box(0, 0, 1, 1))
+        second = GDS(input_file=self.path, layout_cache=cache)
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertIsNone(second.kdb_layout.find_layer(2, 0))
+
+    def test_shared_read_only_layout(self):
+        cache = LayoutCache(1 << 20)
+        first = cache.get(self.path, lambda path: GDS(input_file=path).kdb_layout, copy=False)
+        self.assertIs(cache.get(self.path, lambda path: None, copy=False), first)
+        self.assertIsNot(cache.get(self.path, lambda path: None), first)
+
+    def test_options_and_content_change(self):
+        cache = LayoutCache(1 << 20)
+        GDS(input_file=self.path, layout_cache=cache)
+        GDS(input_file=self.path, layout_cache=cache, input_layers=["1/0"])
+        self.assertEqual(cache.stats()['entries'], 2)
+
+        write_layout(self.path, size=20)
+        os.utime(self.path, ns=(0, 0))
+        gds = GDS(input_file=self.path, layout_cache=cache)
+        self.assertEqual(cache.stats()['misses'], 3)
+        self.assertEqual(gds.get_cell("TOP").kdb_cell.bbox().width(), 20)
+
+    def test_byte_budget_evicts_oldest(self):
+        size = estimate_layout_bytes(read_layout(self.path))
+        other = os.path.join(self.tmp.name, 'other.gds')
+        write_layout(other, size=30)
+        cache = LayoutCache(size + size // 2)
+        GDS(input_file=self.path, layout_cache=cache)
+        GDS(input_file=other, layout_cache=cache)
+        self.assertEqual(cache.stats()['entries'], 1)
+        GDS(input_file=self.path, layout_cache=cache)
+        self.assertEqual(cache.stats()['misses'], 3)
+
+    def test_budget_counts_parsed_layout_not_file_size(self):
+        # .gds.gz 的文件大小远小于解析后的占用，预算按解析后的图形和顶点估算
+        layout = db.Layout()
+        shapes = layout.create_cell("TOP").shapes(layout.layer(1, 0))
+        ring = db.Polygon([db.Point(100 * i, (i % 2) * 100) for i in range(200)] + [db.Point(20000, 5000), db.Point(0, 5000)])
+        for k in range(500):
+            shapes.insert(ring.moved(0, k * 10000))
+        path = os.path.join(self.tmp.name, 'dense.gds.gz')
+        layout.write(path)
+        estimate = estimate_layout_bytes(read_layout(path))
+        self.assertGreater(estimate, 500 * 202 * 8)
+        self.assertGreater(estimate, os.path.getsize(path))
+
+        cache = LayoutCache(estimate // 2)
+        cache.get(path, read_layout, copy=False)
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_digest_memo_is_bounded(self):
+        cache = LayoutCache(1 << 20)
+        with mock.patch.object(layout_cache, 'MAX_DIGESTS', 2):
+            for i in range(4):
+                path = os.path.join(self.tmp.name, f'{i}.gds')
+                write_layout(path, size=10 + i)
+                cache.get(path, read_layout, copy=False)
+        self.assertEqual(len(cache._digests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
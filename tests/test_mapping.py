@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from gds_utils.gds import GDS
+from gds_utils.region import Region
+from gds_utils.frame import Frame
+from gds_utils.mapping import collect_mapping, save_layer_mapping, load_layer_mapping
+
+
+class TestLayerMapping(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.gds = GDS(cell_name='TOP')
+        square = Region.create_polygon(Frame([(0, 0), (10, 0), (10, 10), (0, 10)]))
+        self.gds.get_cell('TOP').add_region(square, (1, 0))
+        sub = self.gds.create_cell('SUB')
+        sub.create_layer((2, 5), 'metal 2')
+        sub.add_region(square, (3, 0))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_round_trip_all_formats(self):
+        records = collect_mapping(self.gds.layer_manager)
+        expected = self.gds.layer_manager.get_all_layers()
+        self.assertEqual(len(expected), 3)
+        for name in ('map.json', 'map.bin', 'map.txt'):
+            save_layer_mapping(self.path(name), records)
+            self.assertEqual(load_layer_mapping(self.path(name)), expected, name)
+
+    def test_save_writes_single_file(self):
+        output_file = self.gds.save(self.path('out.gds'), save_mapping='layers.bin')
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['layers.bin', 'out.gds'])
+
+        self.gds.save(self.path('default.gds'))
+        self.assertTrue(os.path.exists(self.path('default.mapping.json')))
+
+        loaded = GDS(input_file=output_file)
+        self.assertEqual(loaded.load_mapping(self.path('layers.bin')), 3)
+        self.assertEqual(loaded.resolve_layer('metal 2'), (2, 5))
+
+    def test_invalid_binary(self):
+        with open(self.path('bad.bin'), 'wb') as f:
+            f.write(b'XXXX' + b'\0' * 12)
+        with self.assertRaises(ValueError):
+            load_layer_mapping(self.path('bad.bin'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import math
+import unittest
+import klayout.db as db
+from matplotlib.image import imread
+from gds_utils.preview import coverage, decimate_region, render_preview, render_tile, tile_grid
+
+
+def circle(radius, points=2000):
+    return db.Polygon([db.Point(int(radius * math.cos(2 * math.pi * i / points)),
+                                int(radius * math.sin(2 * math.pi * i / points))) for i in range(points)])
+
+
+class TestPreview(unittest.TestCase):
+    def test_decimate_region(self):
+        region = db.Region()
+        region.insert(circle(100000))
+        for i in range(100):
+            region.insert(db.Box(200000 + i * 1000, 0, 200000 + i * 1000 + 300, 300))
+        outlines, details = decimate_region(region, 500)
+        self.assertEqual(outlines.count(), 1)
+        self.assertLess(outlines.edges().count(), 200)  # 2000 个顶点的圆按像素简化
+        self.assertEqual(details.count(), 100)
+
+    def test_coverage(self):
+        region = db.Region(db.Box(0, 0, 150, 100))
+        cover = coverage(region, db.Point(0, 0), 100, 3, 2)
+        self.assertEqual(cover.shape, (2, 3))
+        self.assertEqual(cover[0].tolist(), [1.0, 0.5, 0.0])
+        self.assertEqual(cover[1].tolist(), [0.0, 0.0, 0.0])
+
+    def render(self, **kwargs):
+        layout = db.Layout()
+        top = layout.create_cell('TOP')
+        ring = db.Polygon(circle(50000, 500))
+        ring.insert_hole([p for p in reversed(list(circle(30000, 500).each_point_hull()))])
+        top.shapes(layout.layer(1, 0)).insert(ring)
+        for i in range(1000):
+            top.shapes(layout.layer(2, 0)).insert(db.Box(-50000 + i * 100, -50000, -50000 + i * 100 + 10, -49990))
+        return layout, render_preview(layout, **kwargs)
+
+    def test_render_png(self):
+        _, data = self.render(width=200, height=100)
+        image = imread(io.BytesIO(data))
+        self.assertEqual(image.shape[:2], (100, 200))
+        self.assertTrue((image[50, 100, :3] == 1.0).all())  # 环的孔洞不填充
+        self.assertFalse((image[50, 100 - 40, :3] == 1.0).all())  # 环本身
+        self.assertFalse((image[99, 60, :3] == 1.0).all())  # 小图形栅格化后仍然可见
+
+    def test_render_svg_and_errors(self):
+        layout, data = self.render(image_format='svg')
+        self.assertIn(b'<svg', data)
+        with self.assertRaises(ValueError):
+            render_preview(layout, image_format='bmp')
+        with self.assertRaises(ValueError):
+            render_preview(layout, width=0)
+        with self.assertRaises(ValueError):
+            render_preview(layout, cell_name='NOPE')
+        self.assertIn(b'<svg', render_preview(db.Layout(), image_format='svg'))  # 空版图
+
+    def test_tile_grid(self):
+        layout, _ = self.render(width=10, height=10)
+        grid = tile_grid(layout, tile_size=256)
+        self.assertEqual(grid['origin'], (-50000, -50000))
+        # 100000 个数据库单位需要 2^9 个 256 像素，最高级别一个像素为一个数据库单位
+        self.assertEqual((grid['max_zoom'], grid['extent']), (9, 256 * 2 ** 9))
+
+    def test_render_tile(self):
+        layout, _ = self.render(width=10, height=10)
+        grid = tile_grid(layout)
+        top = imread(io.BytesIO(render_tile(layout, 0, 0, 0, grid=grid)))
+        self.assertEqual(top.shape[:2], (256, 256))
+        # 第 1 级左下角的瓦片（y 从上往下编号）包含环的左下部分，第 2 级右上角的瓦片超出版图范围
+        self.assertFalse((imread(io.BytesIO(render_tile(layout, 1, 0, 1, grid=grid)))[..., :3] == 1.0).all())
+        self.assertTrue((imread(io.BytesIO(render_tile(layout, 2, 3, 0, grid=grid)))[..., :3] == 1.0).all())
+        for z, x, y in [(-1, 0, 0), (grid['max_zoom'] + 1, 0, 0), (1, 2, 0), (1, 0, -1)]:
+            with self.assertRaises(ValueError):
+                render_tile(layout, z, x, y, grid=grid)
+
+
+if __name__ == '__main__':
+    unittest.main()
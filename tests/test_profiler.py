@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+from gds_utils import GDS, Frame, Region
+from gds_utils.profiler import Profiler, profile_stage, current_profiler, profile_report_path
+
+
+class TestProfiler(unittest.TestCase):
+    def test_inactive_profile_stage_is_noop(self):
+        self.assertIsNone(current_profiler())
+        with profile_stage("noop"):
+            pass
+
+    def test_records_build_stages(self):
+        frame = Frame([(0, 0), (10, 0), (10, 10), (0, 10)])
+        fillet = {'type': 'arc', 'radius': 1, 'precision': 0.01, 'interactive': False}
+        profiler = Profiler()
+        with profiler.activate():
+            profiler.start_shape('rings')
+            region = Region.create_rings(frame, ring_width=2, ring_space=3, ring_num=2, fillet_config=fillet)
+            gds = GDS(cell_name='TOP')
+            gds.get_cell('TOP').add_region(region, (1, 0))
+            with tempfile.TemporaryDirectory() as tmp:
+                output_file = os.path.join(tmp, 'out.gds')
+                gds.save(output_file, save_mapping=False)
+                report = profiler.save(profile_report_path(output_file))
+                with open(os.path.join(tmp, 'out.profile.json')) as f:
+                    self.assertEqual(json.load(f)['total'], report['total'])
+        self.assertIsNone(current_profiler())
+
+        for stage in ('offset', 'fillet', 'region', 'boolean', 'add_region', 'save'):
+            self.assertIn(stage, report['stages'])
+        self.assertEqual(report['stages']['boolean']['count'], 2)
+        self.assertEqual(len(report['shapes']), 1)
+        self.assertEqual(report['shapes'][0]['name'], 'rings')
+        self.assertIn('fillet', report['shapes'][0]['stages'])
+        self.assertGreaterEqual(report['total']['wall'], report['stages']['fillet']['wall'])
+
+    @unittest.skipUnless(os.path.exists('/proc/self/statm'), '需要 /proc')
+    def test_rss_delta(self):
+        profiler = Profiler()
+        with profiler.activate():
+            profiler.start_shape('alloc')
+            with profile_stage('alloc'):
+                data = bytearray(64 * 1024 * 1024)
+                data[::4096] = b'x' * len(data[::4096])  # 触碰每一页，计入常驻内存
+            del data
+        report = profiler.report()
+        # 阶段内分配的内存计入该阶段；峰值只作为进程级的值出现在总计中
+        self.assertGreater(report['stages']['alloc']['rss_delta_kb'], 32 * 1024)
+        self.assertNotIn('peak_rss_kb', report['stages']['alloc'])
+        self.assertIn('process_peak_rss_kb', report['total'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import unittest
+from web_gui.result_cache import ResultCache, config_cache_key, load_cache_settings
+
+CONFIG = {
+    'global': {'dbu': '0.001', '_metadata': {'source': 'ui', 'generated_at': '2024-10-14T00:00:00.000Z'}},
+    'gds': {'output_file': '/some/dir/output.gds', 'cell_name': 'TOP'},
+    'shapes': [{'type': 'circle', 'radius': '10', '_metadata': {'source': 'vertices'}}],
+}
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = os.path.join(self.tmp.name, 'cache')
+
+    def make_output(self, name, size):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))
+        return path
+
+    def test_key_ignores_metadata_and_output_dir(self):
+        other = json.loads(json.dumps(CONFIG))
+        other['global']['_metadata']['generated_at'] = '2025-01-01T00:00:00.000Z'
+        del other['shapes'][0]['_metadata']
+        other['gds']['output_file'] = 'output.gds'
+        options = {'format': '', 'gzip': '', 'summary': ''}
+        self.assertEqual(config_cache_key(CONFIG, options, self.tmp.name),
+                         config_cache_key(other, options, self.tmp.name))
+
+        other['shapes'][0]['radius'] = '11'
+        self.assertNotEqual(config_cache_key(CONFIG, options, self.tmp.name),
+                            config_cache_key(other, options, self.tmp.name))
+        self.assertNotEqual(config_cache_key(CONFIG, options, self.tmp.name),
+                            config_cache_key(CONFIG, dict(options, format='oasis'), self.tmp.name))
+
+    def test_key_tracks_input_files(self):
+        config = json.loads(json.dumps(CONFIG))
+        config['gds']['input_file'] = 'base.gds'
+        self.assertIsNone(config_cache_key(config, {}, self.tmp.name))
+
+        path = os.path.join(self.tmp.name, 'base.gds')
+        with open(path, 'wb') as f:
+            f.write(b'a')
+        key = config_cache_key(config, {}, self.tmp.name)
+        with open(path, 'wb') as f:
+            f.write(b'bb')
+        self.assertNotEqual(config_cache_key(config, {}, self.tmp.name), key)
+
+    def test_put_get(self):
+        cache = ResultCache(self.directory, 1024)
+        self.assertIsNone(cache.get('a' * 64))
+
+        output = self.make_output('output.gds', 100)
+        summary = self.make_output('output.summary.json', 10)
+        entry = cache.put('a' * 64, output, [summary, os.path.join(self.tmp.name, 'missing.json')])
+        self.assertEqual(entry['filename'], 'output.gds')
+        self.assertEqual(list(entry['files']), ['output.summary.json'])
+
+        cached = cache.get('a' * 64)
+        self.assertEqual(cached['etag'], entry['etag'])
+        with open(output, 'rb') as a, open(cached['output_file'], 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertEqual(cache.stats(), {'entries': 1, 'bytes': 110, 'max_bytes': 1024, 'hits': 1, 'misses': 1})
+
+    def test_lru_eviction(self):
+        cache = ResultCache(self.directory, 250)
+        for key in ('a', 'b'):
+            cache.put(key * 64, self.make_output(f'{key}.gds', 100))
+        cache.get('a' * 64)  # b 成为最久未使用的项
+        cache.put('c' * 64, self.make_output('c.gds', 100))
+
+        self.assertIsNotNone(cache.get('a' * 64))
+        self.assertIsNone(cache.get('b' * 64))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'b' * 64)))
+        self.assertLessEqual(cache.stats()['bytes'], 250)
+
+        # 超过容量的结果不缓存
+        self.assertIsNone(cache.put('d' * 64, self.make_output('d.gds', 300)))
+
+    def test_pinned_entries_not_evicted(self):
+        cache = ResultCache(self.directory, 250)
+        entry = cache.put('a' * 64, self.make_output('a.gds', 100), pin=True)
+        cache.put('b' * 64, self.make_output('b.gds', 100))
+        self.assertIsNotNone(cache.get('b' * 64, pin=True))
+        # a、b 都在发送中，超出容量时暂不淘汰
+        cache.put('c' * 64, self.make_output('c.gds', 100))
+        self.assertTrue(os.path.exists(entry['output_file']))
+        self.assertEqual(cache.stats()['bytes'], 300)
+        # 解除固定后淘汰最久未使用的 a
+        cache.release('a' * 64)
+        self.assertFalse(os.path.exists(entry['output_file']))
+        self.assertEqual(cache.stats()['entries'], 2)
+        cache.release('b' * 64)
+        self.assertIsNotNone(cache.get('b' * 64))
+
+    def test_reload_from_disk(self):
+        cache = ResultCache(self.directory, 1024)
+        entry = cache.put('a' * 64, self.make_output('output.gds', 100))
+        os.makedirs(os.path.join(self.directory, 'b' * 64))  # 没有 meta.json 的不完整项
+
+        reloaded = ResultCache(self.directory, 1024)
+        self.assertEqual(reloaded.get('a' * 64)['etag'], entry['etag'])
+        self.assertEqual(reloaded.stats()['entries'], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'b' * 64)))
+
+    def test_settings(self):
+        path = os.path.join(self.tmp.name, 'webgui.json')
+        with open(path, 'w') as f:
+            json.dump({'result_cache_mb': 0}, f)
+        self.assertEqual(load_cache_settings(path), 0)
+        self.assertEqual(load_cache_settings(os.path.join(self.tmp.name, 'missing.json')), 256 * 1024 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
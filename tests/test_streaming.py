@@ -0,0 +1,44 @@
+import gzip
+import os
+import tempfile
+import unittest
+from web_gui.streaming import RangeNotSatisfiable, byte_range, encoded_etag, iter_file, iter_gzip
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data = os.urandom(10000)
+        self.path = os.path.join(self.tmp.name, 'output.gds')
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+
+    def test_byte_range(self):
+        self.assertIsNone(byte_range(None, 100))
+        self.assertIsNone(byte_range('garbage', 100))
+        self.assertIsNone(byte_range('bytes=0-1,3-4', 100))  # 多区间按整体返回
+        self.assertEqual(byte_range('bytes=0-9', 100), (0, 10))
+        self.assertEqual(byte_range('bytes=-5', 100), (95, 100))
+        self.assertEqual(byte_range('bytes=50-', 100), (50, 100))
+        self.assertEqual(byte_range('bytes=90-200', 100), (90, 100))
+        with self.assertRaises(RangeNotSatisfiable):
+            byte_range('bytes=200-300', 100)
+
+    def test_iter_file_chunks(self):
+        chunks = list(iter_file(self.path, chunk_size=4096))
+        self.assertEqual([len(chunk) for chunk in chunks], [4096, 4096, 1808])
+        self.assertEqual(b''.join(chunks), self.data)
+        self.assertEqual(b''.join(iter_file(self.path, 100, 5000, chunk_size=1000)), self.data[100:5000])
+
+    def test_iter_gzip(self):
+        compressed = b''.join(iter_gzip(iter_file(self.path, chunk_size=1000)))
+        self.assertEqual(gzip.decompress(compressed), self.data)
+        self.assertEqual(gzip.decompress(b''.join(iter_gzip([]))), b'')
+        # 压缩后的字节不同，ETag 也要不同
+        self.assertEqual(encoded_etag('abc'), 'abc-gz')
+        self.assertIsNone(encoded_etag(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+import klayout.db as db
+from gds_utils.gds import GDS, mapping_path, sidecar_path
+from gds_utils.profiler import profile_report_path
+from gds_utils.summary import layout_summary, summary_report_path
+
+
+class TestSummary(unittest.TestCase):
+    def build(self):
+        gds = GDS(cell_name='TOP')
+        layout = gds.kdb_layout
+        top = layout.cell('TOP')
+        sub = layout.create_cell('SUB')
+        l1, l2 = layout.layer(1, 0), layout.layer(2, 0)
+        top.shapes(l1).insert(db.Box(0, 0, 10000, 10000))
+        top.shapes(l1).insert(db.Box(5000, 0, 15000, 10000))  # 与上一个重叠一半
+        sub.shapes(l2).insert(db.Polygon([db.Point(0, 0), db.Point(2000, 0), db.Point(2000, 1000),
+                                          db.Point(1000, 1000), db.Point(1000, 2000), db.Point(0, 2000)]))
+        top.insert(db.CellInstArray(sub.cell_index(), db.Trans(), db.Vector(3000, 0), db.Vector(0, 3000), 2, 1))
+        layout.layer(3, 0)  # 空图层不出现在统计中
+        return gds
+
+    def test_layers(self):
+        summary = self.build().summary()
+        self.assertEqual(summary['cells'], ['TOP'])
+        self.assertEqual(set(summary['layers']), {'1/0', '2/0'})
+        metal = summary['layers']['1/0']
+        self.assertEqual(metal['polygons'], 2)
+        self.assertEqual(metal['vertices'], 8)
+        self.assertEqual(metal['max_vertices'], 4)
+        self.assertAlmostEqual(metal['area'], 150.0)  # 重叠部分只计一次
+        self.assertEqual(metal['bbox'], [0.0, 0.0, 15.0, 10.0])
+        via = summary['layers']['2/0']
+        self.assertEqual((via['polygons'], via['vertices'], via['max_vertices']), (2, 12, 6))
+        self.assertAlmostEqual(via['area'], 6.0)
+        self.assertEqual(summary['total'], {'polygons': 4, 'vertices': 20, 'max_vertices': 6})
+
+    def test_cell_and_errors(self):
+        gds = self.build()
+        summary = layout_summary(gds.kdb_layout, 'SUB')
+        self.assertEqual(list(summary['layers']), ['2/0'])
+        self.assertEqual(summary['layers']['2/0']['polygons'], 1)
+        with self.assertRaises(ValueError):
+            gds.summary('MISSING')
+
+    def test_report_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(summary_report_path(os.path.join(tmp, 'out.gds.gz')), os.path.join(tmp, 'out.summary.json'))
+            # 映射、性能报告和统计共用同一套旁路文件命名
+            output_file = os.path.join(tmp, 'out.OAS.GZ')
+            self.assertEqual(mapping_path(output_file), os.path.join(tmp, 'out.mapping.json'))
+            self.assertEqual(profile_report_path(output_file), os.path.join(tmp, 'out.profile.json'))
+            self.assertEqual(summary_report_path(output_file), sidecar_path(output_file, '.summary.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import math
+import unittest
+from gds_utils import Frame, Region
+from gds_utils.validate import corner_geometry, fillet_ratios, offset_edges, validate_config, validate_shape
+
+
+def star(outer=5, inner=2.5, points=5):
+    vertices = []
+    for i in range(points * 2):
+        r = outer if i % 2 == 0 else inner
+        angle = math.pi / 2 + i * math.pi / points
+        vertices.append((r * math.cos(angle), r * math.sin(angle)))
+    return vertices
+
+
+def vertex_string(vertices):
+    return ':'.join(f"{x},{y}" for x, y in vertices)
+
+
+class TestValidate(unittest.TestCase):
+    def codes(self, shape, level='error'):
+        return [d['code'] for d in validate_shape(shape)['diagnostics'] if d['level'] == level]
+
+    def test_offset_and_fillet_geometry(self):
+        geometry = corner_geometry([(0, 0), (10, 0), (10, 10), (0, 10)])
+        self.assertTrue(geometry['convex'].all())
+        # 外扩 1 后每条边长 12，与 Frame.offset 一致
+        offset = Frame([(0, 0), (10, 0), (10, 10), (0, 10)]).offset(1).get_vertices()
+        self.assertEqual(offset_edges(geometry, 1).tolist(), [12.0] * 4)
+        self.assertEqual(offset[0], (-1.0, -1.0))
+        # 直角的切点距离等于半径
+        self.assertAlmostEqual(fillet_ratios(geometry, 0, 4, 4)[0], 0.4)
+        self.assertEqual(fillet_ratios(geometry, 0, 0, 4).tolist(), [0.0] * 4)  # 半径为 0 不倒角
+
+    def test_predicts_fillet_failure(self):
+        fillet = {'type': 'arc', 'radius': 1, 'precision': 0.001, 'interactive': False}
+        shape = {'type': 'rings', 'name': 'star', 'vertices': vertex_string(star()), 'zoom': 0,
+                 'ring_width': 3, 'ring_space': 5, 'ring_num': 3, 'fillet': fillet}
+        issue = next(d for d in validate_shape(shape)['diagnostics'] if d['code'] == 'fillet_too_large')
+        self.assertEqual((issue['boundary'], issue['vertices']), ('ring 1 outer', [0, 2, 4, 6, 8]))
+        with self.assertRaises(ValueError):
+            Region.create_rings(Frame(star()), ring_width=3, ring_space=5, ring_num=3, fillet_config=dict(fillet))
+
+        square = dict(shape, vertices="0,0:10,0:10,10:0,10", fillet=dict(fillet, radius=2))
+        self.assertEqual(self.codes(square), [])
+        Region.create_rings(Frame([(0, 0), (10, 0), (10, 10), (0, 10)]), ring_width=3, ring_space=5, ring_num=3,
+                            fillet_config=dict(fillet, radius=2))
+
+    def test_rules_and_vertices(self):
+        base = {'type': 'rings', 'vertices': "0,0:10,0:10,10:0,10", 'ring_width': 1, 'ring_space': 1, 'ring_num': 2}
+        self.assertEqual(self.codes(dict(base, ring_width="[(1, 2)]")), ['ring_width'])
+        self.assertEqual(self.codes(dict(base, ring_num=0)), ['ring_num'])
+        self.assertEqual(self.codes(dict(base, ring_width="(1, -1)")), ['ring_width'])
+        self.assertEqual(self.codes(dict(base, ring_space="[(1, 2, 1)]"), 'warning'), ['ring_count'])
+        # 不缩放的环阵列使用圆弧倒角时，构建会在 zoom 缺省值 [0, 0] 上失败
+        self.assertEqual(self.codes(dict(base, fillet={'type': 'arc', 'radius': 0.2})), ['ring_zoom'])
+        self.assertEqual(self.codes(dict(base, vertices="0,0:1,0")), ['vertices'])
+        self.assertEqual(self.codes({'type': 'polygon', 'vertices_gen': {'shape_type': 'circle', 'radius': None}}),
+                         ['vertices'])
+        self.assertEqual(self.codes(dict(base, type='blob')), ['type'])
+        self.assertEqual(self.codes({'type': 'via', 'vertices': "0,0:10,0:10,10:0,10", 'inner_zoom': 1,
+                                     'outer_zoom': 1}, 'warning'), ['via_empty'])
+
+    def test_validate_config(self):
+        config = {'global': {}, 'gds': {'layers': {'metal': [5, 0], 'bad': 'x/y'}}, 'shapes': [
+            {'type': 'polygon', 'name': 'ok', 'layer': 'metal', 'vertices': "0,0:10,0:10,10:0,10"},
+            {'type': 'polygon', 'name': 'tight', 'layer': 'via', 'vertices': "0,0:10,0:10,10:0,10",
+             'fillet': {'type': 'arc', 'radius': 6}},
+        ]}
+        report = validate_config(config)
+        self.assertFalse(report['valid'])
+        self.assertEqual(len(report['errors']), 1)  # 图层定义错误
+        self.assertEqual([s['name'] for s in report['shapes']], ['ok', 'tight'])
+        self.assertEqual(report['shapes'][0]['diagnostics'], [])
+        self.assertEqual(sorted(d['code'] for d in report['shapes'][1]['diagnostics']), ['fillet_tight', 'layer'])
+        self.assertEqual(validate_config({'shapes': {}})['errors'][-1], "缺少'shapes'配置部分或者不是列表类型")
+
+
+if __name__ == '__main__':
+    unittest.main()
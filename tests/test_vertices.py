@@ -0,0 +1,146 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from gds_utils.vertices import (parse_vertex_string, ensure_counterclockwise, signed_area,
+                                load_vertices_file, VertexParseError)
+from main import parse_vertices, load_vertices
+
+
+class TestParseVertexString(unittest.TestCase):
+    def test_parse(self):
+        pts = parse_vertex_string("0,0:10,0:10,10: 0 , 10")
+        self.assertEqual(pts.shape, (4, 2))
+        self.assertEqual(pts.dtype, np.float64)
+        np.testing.assert_array_equal(pts[2], [10, 10])
+        np.testing.assert_array_equal(pts[3], [0, 10])
+
+    def test_scientific_notation(self):
+        pts = parse_vertex_string("1e-3,-2.5E2:3,4")
+        np.testing.assert_allclose(pts, [[0.001, -250], [3, 4]])
+
+    def test_bad_number_position(self):
+        text = "0,0:10,0:10,abc:0,10"
+        with self.assertRaises(VertexParseError) as ctx:
+            parse_vertex_string(text)
+        self.assertEqual(ctx.exception.index, 2)
+        self.assertEqual(ctx.exception.position, text.index("abc"))
+        self.assertEqual(ctx.exception.token, "abc")
+
+    def test_missing_coordinate(self):
+        with self.assertRaises(VertexParseError) as ctx:
+            parse_vertex_string("0,0:10:10,10")
+        self.assertEqual(ctx.exception.index, 1)
+        self.assertEqual(ctx.exception.position, 4)
+
+    def test_regrouped_pairs(self):
+        # 逗号总数正确但分布错误时不能被重新分组
+        for text, index in (("1,2,3:4", 0), ("0,0:1,2,3:4,5:6", 1)):
+            with self.assertRaises(VertexParseError) as ctx:
+                parse_vertex_string(text)
+            self.assertEqual(ctx.exception.index, index)
+
+    def test_trailing_separator(self):
+        with self.assertRaises(VertexParseError) as ctx:
+            parse_vertex_string("0,0:1,0:1,1:")
+        self.assertEqual(ctx.exception.index, 3)
+
+    def test_non_finite(self):
+        with self.assertRaises(VertexParseError):
+            parse_vertex_string("0,0:1,nan:1,1")
+
+    def test_orientation(self):
+        cw = parse_vertex_string("0,0:0,10:10,10:10,0")
+        self.assertLess(signed_area(cw), 0)
+        ccw = ensure_counterclockwise(cw)
+        self.assertAlmostEqual(signed_area(ccw), 100)
+
+
+class TestMainParseVertices(unittest.TestCase):
+    def test_returns_ccw_array(self):
+        verts = parse_vertices("0,0:0,10:10,10:10,0")
+        self.assertIsInstance(verts, np.ndarray)
+        np.testing.assert_array_equal(verts, [(10.0, 0.0), (10.0, 10.0), (0.0, 10.0), (0.0, 0.0)])
+
+    def test_invalid_returns_empty(self):
+        self.assertEqual(parse_vertices("0,0:1,x:1,1").shape, (0, 2))
+        self.assertEqual(parse_vertices("0,0:1,1").shape, (0, 2))
+
+
+class TestLoadVerticesFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+        self.square = np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=np.float64)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_npy_is_memory_mapped(self):
+        np.save(self.path('square.npy'), self.square)
+        pts = load_vertices_file(self.path('square.npy'))
+        self.assertIsInstance(pts, np.memmap)
+        np.testing.assert_array_equal(pts, self.square)
+
+    def test_raw_binary(self):
+        self.square.astype('<f8').tofile(self.path('square.bin'))
+        pts = load_vertices_file(self.path('square.bin'))
+        self.assertEqual(pts.shape, (4, 2))
+        np.testing.assert_array_equal(pts, self.square)
+
+        with open(self.path('broken.bin'), 'wb') as f:
+            f.write(b'\0' * 20)
+        with self.assertRaises(ValueError):
+            load_vertices_file(self.path('broken.bin'))
+
+    def test_csv_with_header_and_cache(self):
+        with open(self.path('square.csv'), 'w') as f:
+            f.write("x,y\n# comment\n0,0\n10,0\n10,10\n0,10\n")
+        pts = load_vertices_file(self.path('square.csv'), cache_dir=self.cache_dir)
+        np.testing.assert_array_equal(pts, self.square)
+        # 缓存目录中只留下最终的 .npy，没有残留的临时文件
+        self.assertEqual([os.path.splitext(name)[1] for name in os.listdir(self.cache_dir)], ['.npy'])
+
+    def test_csv_error_reports_row(self):
+        with open(self.path('bad.csv'), 'w') as f:
+            f.write("0,0\n10,0\n10;10\n")
+        with self.assertRaises(ValueError) as ctx:
+            load_vertices_file(self.path('bad.csv'), cache_dir=False)
+        self.assertIn('第 3 个', str(ctx.exception))
+
+    def test_non_finite_rejected(self):
+        bad = self.square.copy()
+        bad[2, 1] = np.nan
+        np.save(self.path('nan.npy'), bad)
+        bad[2, 1] = np.inf
+        bad.astype('<f8').tofile(self.path('inf.bin'))
+        with open(self.path('inf.csv'), 'w') as f:
+            f.write("0,0\n10,0\n10,inf\n")
+        for name in ('nan.npy', 'inf.bin'):
+            with self.assertRaises(VertexParseError) as ctx:
+                load_vertices_file(self.path(name))
+            self.assertEqual((ctx.exception.index, ctx.exception.position), (2, 5))
+        with self.assertRaises(VertexParseError) as ctx:
+            load_vertices_file(self.path('inf.csv'), cache_dir=self.cache_dir)
+        self.assertEqual(ctx.exception.index, 2)
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            load_vertices_file(self.path('square.xyz'))
+
+    def test_main_load_vertices(self):
+        np.save(self.path('cw.npy'), self.square[::-1])
+        verts = load_vertices({'path': self.path('cw.npy'), 'format': 'npy'})
+        # 内存映射数组直接返回（逆时针修正只是反向视图），不转换为 Python 元组
+        self.assertIsInstance(verts, np.memmap)
+        self.assertEqual(len(verts), 4)
+        self.assertGreater(signed_area(verts), 0)
+        self.assertEqual(load_vertices(self.path('missing.npy')).shape, (0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
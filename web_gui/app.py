@@ -1,9 +1,15 @@
 import os
 import sys
+import logging
+import re
 import json
 import yaml
+import shutil
+import hashlib
 import tempfile
-from flask import Flask, request, jsonify, render_template, send_file
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from flask import Flask, Response, request, jsonify, render_template, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
@@ -37,6 +43,22 @@ if getattr(sys, 'frozen', False):
     sys.path.insert(0, sys._MEIPASS)
 
 from main import main as gds_main
+from gds_utils.estimate import estimate_config
+from gds_utils.validate import validate_config as check_config
+from gds_utils.profiler import profile_report_path
+from gds_utils.summary import summary_report_path
+from gds_utils.gds import resolve_output_file, read_layout_shared
+from gds_utils.layout_cache import configure_shared_cache, shared_cache
+from gds_utils.utils import atomic_write_path, logger as gds_logger
+from gds_utils.context import BuildContext
+from gds_utils.preview import render_preview_file, render_tile, tile_grid, \
+    DEFAULT_SIZE as PREVIEW_SIZE, IMAGE_FORMATS, MAX_SIZE
+from gds_utils.geometry import encode_geometry_file, COORD_TYPES, DEFAULT_PIXELS, MIME_TYPE as GEOMETRY_MIMETYPE
+from web_gui.jobs import JobManager, QueueFullError, load_job_settings, BUILD_LOG_FILE
+from web_gui.result_cache import ResultCache, config_cache_key, load_cache_settings
+from web_gui.streaming import RangeNotSatisfiable, byte_range, encoded_etag, iter_file, iter_gzip
+from web_gui.event_stream import iter_events
+from web_gui.batch import MANIFEST_FILE, ZipStream, archive_name, parse_batch
 
 # 配置 Flask 的模板和静态文件路径,兼容打包环境
 if getattr(sys, 'frozen', False):
@@ -53,6 +75,10 @@ app = Flask(__name__,
             static_folder=static_folder)
 CORS(app)  # 启用跨域请求
 
+# 每次构建的 build.log 只能收到 gds_utils logger 放行的记录，服务启动时配置一次，构建过程不再修改
+if gds_logger.level == logging.NOTSET:
+    gds_logger.setLevel(logging.DEBUG)
+
 # 配置上传文件目录 - 使用用户可访问的目录,避免权限问题
 BASE_PATH = get_base_path()
 UPLOAD_FOLDER = os.path.join(BASE_PATH, 'uploads')
@@ -66,6 +92,35 @@ if not os.path.exists(TEMP_FOLDER):
     os.makedirs(TEMP_FOLDER)
 app.config['TEMP_FOLDER'] = TEMP_FOLDER
 
+# 每次构建的临时目录: TEMP_FOLDER/build-xxxx，超过一小时的目录在后续请求时清理
+BUILD_DIR_PREFIX = 'build-'
+BUILD_DIR_MAX_AGE = 3600
+BUILD_ID_PATTERN = re.compile(r'build-[A-Za-z0-9_]+')  # tempfile.mkdtemp 生成的目录名
+
+# 缓存已解析的 input_file 模板，多个请求共用同一份基础版图
+configure_shared_cache()
+
+def default_webgui_config_file():
+    """默认的 config/webgui_client_config.json，位置与 run.py 切换到的工作目录一致:
+    打包环境在可执行文件所在目录，开发环境在项目根目录"""
+    if getattr(sys, 'frozen', False):
+        root = os.path.dirname(sys.executable)
+    else:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(root, 'config', 'webgui_client_config.json')
+
+# 异步构建任务队列，进程池大小和排队上限读取 Web GUI 配置文件（job_workers / job_queue_depth）。
+# 启动器（run.py / qt_launcher.py）通过环境变量 SUMMER_GDS_WEBGUI_CONFIG 传入 --config 指定的文件，
+# 未指定时使用 default_webgui_config_file()
+WEBGUI_CONFIG_FILE = os.environ.get('SUMMER_GDS_WEBGUI_CONFIG') or default_webgui_config_file()
+job_manager = JobManager(**load_job_settings(WEBGUI_CONFIG_FILE))
+
+# 生成结果缓存: 相同配置的同步请求直接返回上次的文件，容量读取同一配置文件中的 result_cache_mb（0 关闭）
+RESULT_CACHE_BYTES = load_cache_settings(WEBGUI_CONFIG_FILE)
+RESULT_KEY_PATTERN = re.compile(r'[0-9a-f]{64}')
+result_cache = ResultCache(os.path.join(TEMP_FOLDER, 'result-cache'), RESULT_CACHE_BYTES) \
+    if RESULT_CACHE_BYTES > 0 else None
+
 # 默认配置模板
 DEFAULT_CONFIG = {
     "global": {
@@ -76,8 +131,7 @@ DEFAULT_CONFIG = {
             "precision": 0.01
         },
         "layer_mapping": {
-            "save": True,
-            "file": "layer_mapping.txt"
+            "save": True
         }
     },
     "gds": {
@@ -139,6 +193,86 @@ def ensure_metadata_compatibility(config_data):
 
     return config_data
 
+def apply_output_overrides(gds_config, args):
+    """把查询参数中的输出选项合并进 gds.output
+
+    返回:
+        dict: 合并后的输出选项
+    """
+    output_options = dict(gds_config.get('output') or {})
+    if args.get('format'):
+        output_options['format'] = args.get('format').lower()
+    if args.get('gzip'):
+        output_options['gzip'] = args.get('gzip').lower() in ('1', 'true', 'yes')
+    if output_options:
+        gds_config['output'] = output_options
+    return output_options
+
+def create_build_dir():
+    """在 TEMP_FOLDER 下创建本次构建独占的临时目录"""
+    return tempfile.mkdtemp(prefix=BUILD_DIR_PREFIX, dir=app.config['TEMP_FOLDER'])
+
+def cleanup_build_dirs(max_age=BUILD_DIR_MAX_AGE):
+    """删除超过 max_age 秒的构建目录
+
+    构建结果在响应返回后仍需保留一段时间（例如下载性能分析报告），因此按时间清理而不是立即删除。
+    仍在排队或执行的任务可能很久不写入构建目录，它们的目录不清理。
+    """
+    now = time.time()
+    temp_folder = app.config['TEMP_FOLDER']
+    active = job_manager.active_ids()
+    for name in os.listdir(temp_folder):
+        path = os.path.join(temp_folder, name)
+        if not name.startswith(BUILD_DIR_PREFIX) or name in active or not os.path.isdir(path):
+            continue
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass  # 其他请求可能同时删除了该目录
+    job_manager.prune(max_age)
+
+def attach_profile_report(response, output_file, build_id):
+    """把性能分析报告附加到响应头
+
+    X-GDS-Profile 只包含总计和各阶段汇总（形状明细可能很长），
+    完整报告作为旁路文件保存在输出文件旁，路径 <构建目录>/<文件名> 通过 X-GDS-Profile-File 给出。
+    """
+    report_file = profile_report_path(output_file)
+    if not os.path.exists(report_file):
+        return response
+    with open(report_file, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    summary = {"total": report.get("total"), "stages": report.get("stages")}
+    response.headers['X-GDS-Profile'] = json.dumps(summary, separators=(',', ':'))
+    response.headers['X-GDS-Profile-File'] = f"{build_id}/{os.path.basename(report_file)}"
+    return expose_headers(response, 'X-GDS-Profile', 'X-GDS-Profile-File')
+
+def expose_headers(response, *names):
+    """把自定义响应头加入 Access-Control-Expose-Headers，跨域的前端才能读取"""
+    exposed = [h.strip() for h in response.headers.get('Access-Control-Expose-Headers', '').split(',') if h.strip()]
+    response.headers['Access-Control-Expose-Headers'] = ', '.join(exposed + [n for n in names if n not in exposed])
+    return response
+
+def attach_summary(response, output_file, summary_url):
+    """把版图统计附加到响应头
+
+    按图层的统计随图层数增长，可能超过代理和服务器的响应头上限（常见为 8 KB），
+    因此 X-GDS-Summary 只包含总计和图层数，完整统计通过 X-GDS-Summary-URL 给出的地址下载。
+    """
+    report_file = summary_report_path(output_file)
+    if not os.path.exists(report_file):
+        return response
+    with open(report_file, 'r', encoding='utf-8') as f:
+        summary = json.load(f)
+    brief = {"total": summary.get("total"), "layers": len(summary.get("layers") or {})}
+    response.headers['X-GDS-Summary'] = json.dumps(brief, separators=(',', ':'))
+    names = ['X-GDS-Summary']
+    if summary_url:
+        response.headers['X-GDS-Summary-URL'] = summary_url
+        names.append('X-GDS-Summary-URL')
+    return expose_headers(response, *names)
+
 @app.route('/')
 def index():
     """渲染主页"""
@@ -149,96 +283,814 @@ def get_default_config():
     """获取默认配置"""
     return jsonify(DEFAULT_CONFIG)
 
-@app.route('/api/generate-gds', methods=['POST'])
-def generate_gds():
-    """根据配置生成GDS文件"""
+def project_dir():
+    """main.py 所在的目录，配置中的相对路径相对于它（通过 BuildContext 解析，不切换工作目录）"""
+    if getattr(sys, 'frozen', False):
+        # 打包环境:可执行文件所在目录
+        return os.path.dirname(sys.executable)
+    # 开发环境
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def build_flag(config_data, args, name):
+    """构建开关: 查询参数 ?<name>=1 或配置 global.<name>: true"""
+    return args.get(name, '').lower() in ('1', 'true', 'yes') or \
+        bool(((config_data or {}).get('global') or {}).get(name))
+
+def prepare_build(config_data, args):
+    """为一次构建准备独立的构建目录、配置文件和 main.py 参数
+
+    参数:
+        config_data: 请求中的配置
+        args: 查询参数（format / gzip / profile / summary）
+
+    返回:
+        dict: build_dir, build_id, config_file, output_file, work_dir, argv, profile, summary
+
+    异常:
+        ValueError: 输出选项非法
+    """
+    # 处理元数据
+    config_data = process_metadata(config_data)
+
+    # 确保ring_width和ring_space保持为字符串类型
+    config_data = ensure_string_values(config_data)
+
+    # 每次构建使用独立的临时目录，并发请求互不覆盖配置和输出
+    cleanup_build_dirs()
+    build_dir = create_build_dir()
+    config_file = os.path.join(build_dir, 'temp_config.yaml')
+
+    # 设置输出文件路径
+    output_name = os.path.basename(config_data.get('gds', {}).get('output_file') or 'output.gds')
+    output_file = os.path.join(build_dir, output_name)
+    config_data.setdefault('gds', {})['output_file'] = output_file
+    # 图层映射文件同样限制在构建目录内
+    layer_mapping = (config_data.get('global') or {}).get('layer_mapping')
+    if isinstance(layer_mapping, dict) and layer_mapping.get('file'):
+        layer_mapping['file'] = os.path.basename(layer_mapping['file'])
+
+    # 输出选项: 查询参数 ?format=oasis&gzip=1 覆盖配置中的 gds.output
+    output_options = apply_output_overrides(config_data['gds'], args)
     try:
-        # 获取请求数据
-        if request.content_type == 'application/json':
-            config_data = request.json
-        else:
-            config_data = yaml.safe_load(request.form.get('config', '{}'))
+        output_file = resolve_output_file(output_file, output_options)
+    except ValueError:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
 
-        # 处理元数据
-        config_data = process_metadata(config_data)
+    # 写入配置文件
+    with open(config_file, 'w') as f:
+        yaml.dump(config_data, f, default_style='"')  # 使用双引号来确保字符串类型
 
-        # 确保ring_width和ring_space保持为字符串类型
-        config_data = ensure_string_values(config_data)
+    # 是否开启性能分析: 查询参数 ?profile=1 或配置 global.profile: true
+    profile = build_flag(config_data, args, 'profile')
+
+    # 是否统计版图: 查询参数 ?summary=1 或配置 global.summary: true
+    summary = build_flag(config_data, args, 'summary')
+
+    return {
+        'build_dir': build_dir,
+        'build_id': os.path.basename(build_dir),
+        'config_file': config_file,
+        'output_file': output_file,
+        'work_dir': project_dir(),
+        'argv': [config_file] + (['--profile'] if profile else []) + (['--summary'] if summary else []),
+        'profile': profile,
+        'summary': summary,
+    }
+
+def request_config():
+    """读取请求中的配置（JSON 或表单中的 YAML）"""
+    if request.content_type == 'application/json':
+        return request.json
+    return yaml.safe_load(request.form.get('config', '{}'))
+
+def remove_on_close(response, directory):
+    """响应关闭（发送完毕或客户端断开）后删除目录"""
+    if directory:
+        response.call_on_close(lambda: shutil.rmtree(directory, ignore_errors=True))
+    return response
 
-        # 创建临时配置文件
-        config_file = os.path.join(app.config['TEMP_FOLDER'], 'temp_config.yaml')
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f, default_style='"')  # 使用双引号来确保字符串类型
+def wants_gzip(filename):
+    """流式返回时是否边发送边压缩: 请求 ?compress=1、客户端接受 gzip 且文件本身不是 .gz"""
+    return build_flag(None, request.args, 'compress') and 'gzip' in request.accept_encodings and \
+        not filename.lower().endswith('.gz')
 
-        # 设置输出文件路径
-        output_file = os.path.join(app.config['TEMP_FOLDER'], config_data.get('gds', {}).get('output_file', 'output.gds'))
-        config_data['gds']['output_file'] = output_file
+def stream_result(output_file, etag=None, cleanup_dir=None):
+    """分块流式返回输出文件，不把整个文件读入内存
 
-        # 重写配置文件
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f, default_style='"')  # 使用双引号来确保字符串类型
+    支持单区间 Range（206，If-Range 与 ETag 不一致时整体返回）；
+    请求 ?compress=1 且客户端接受 gzip 时边读边压缩（Content-Encoding: gzip，长度未知，忽略 Range），
+    ETag 使用 encoded_etag 区分编码。
+
+    参数:
+        output_file: 输出文件
+        etag: 响应的 ETag
+        cleanup_dir: 响应关闭后删除的目录（构建目录），None 表示保留
+    """
+    size = os.path.getsize(output_file)
+    filename = os.path.basename(output_file)
+    compress = wants_gzip(filename)
+    status = 200
+    if compress:
+        body = iter_gzip(iter_file(output_file))
+        headers = {'Content-Encoding': 'gzip'}
+        etag = encoded_etag(etag)
+    else:
+        if_range = request.if_range
+        try:
+            span = None if (if_range.etag or if_range.date) and if_range.etag != etag else \
+                byte_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable as e:
+            response = jsonify({"success": False, "error": str(e)})
+            response.status_code = 416
+            response.headers['Content-Range'] = f"bytes */{size}"
+            return remove_on_close(response, cleanup_dir)
+        start, stop = span or (0, size)
+        body = iter_file(output_file, start, stop)
+        headers = {'Content-Length': str(stop - start), 'Accept-Ranges': 'bytes'}
+        if span:
+            status = 206
+            headers['Content-Range'] = f"bytes {start}-{stop - 1}/{size}"
+    # 不使用 direct_passthrough: 否则 werkzeug 直接返回生成器，call_on_close 注册的清理不会执行
+    response = app.response_class(body, status=status, headers=headers, mimetype='application/octet-stream')
+    response.headers.set('Content-Disposition', 'attachment', filename=filename)
+    response.headers['Vary'] = 'Accept-Encoding'
+    if etag:
+        response.set_etag(etag)
+    return remove_on_close(response, cleanup_dir)
+
+def send_build_result(output_file, build_id, profile, summary, etag=None, stream=False, cleanup_dir=None,
+                      summary_url=None):
+    """返回生成的文件，按需附加性能分析和统计响应头
+
+    参数:
+        stream: 分块流式返回（见 stream_result），cleanup_dir 只在流式返回时使用
+        summary_url: 完整统计的下载地址，None 时为构建目录中的旁路文件（/api/summary/<构建目录>/<文件名>）
+    """
+    if stream:
+        response = stream_result(output_file, etag, cleanup_dir)
+    else:
+        response = send_file(output_file, as_attachment=True, download_name=os.path.basename(output_file),
+                             etag=etag or True)
+    if profile:
+        attach_profile_report(response, output_file, build_id)
+    if summary:
+        if summary_url is None and build_id:
+            summary_url = f"/api/summary/{build_id}/{os.path.basename(summary_report_path(output_file))}"
+        attach_summary(response, output_file, summary_url)
+    return response
 
-        # 保存当前工作目录
-        original_dir = os.getcwd()
+def result_cache_key(config_data, args):
+    """同步生成请求的结果缓存键
 
-        # 切换到包含main.py的父目录
-        if getattr(sys, 'frozen', False):
-            # 打包环境:需要切换到可执行文件的父目录
-            work_dir = os.path.dirname(sys.executable)
+    缓存关闭、请求 ?cache=0 或需要性能分析（报告属于单次构建）时返回 None。
+    """
+    if result_cache is None or args.get('cache', '').lower() in ('0', 'false', 'no'):
+        return None
+    if build_flag(config_data, args, 'profile'):
+        return None
+    options = {name: args.get(name, '').lower() for name in ('format', 'gzip', 'summary')}
+    return config_cache_key(config_data, options, project_dir())
+
+def send_cached_result(key, entry, summary, state, stream=False, cleanup_dir=None):
+    """返回缓存中的生成结果
+
+    参数:
+        key: 缓存键，响应头 X-GDS-Result 给出可用 GET 重复下载（支持条件请求和 Range）的地址
+        entry: ResultCache.get/put 以 pin=True 返回的缓存项，响应关闭（文件发送完毕）后解除固定
+        summary: 是否附加统计响应头
+        state: X-GDS-Cache 响应头的取值（hit / miss）
+        stream: 分块流式返回
+        cleanup_dir: 响应关闭后删除的目录（已复制进缓存的构建目录）
+    """
+    try:
+        # 浏览器只对 GET 自动处理条件请求，POST 的 If-None-Match 在这里判断
+        # 与本次响应的编码对应的 ETag（见 stream_result）
+        etag = encoded_etag(entry['etag']) if stream and wants_gzip(entry['filename']) else entry['etag']
+        if request.method == 'POST' and request.if_none_match.contains(etag):
+            response = remove_on_close(app.response_class(status=304), cleanup_dir)
+            response.set_etag(etag)
+            response.headers['Vary'] = 'Accept-Encoding'
         else:
-            # 开发环境
-            work_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            response = send_build_result(entry['output_file'], None, False, summary, etag=entry['etag'],
+                                         stream=stream, cleanup_dir=cleanup_dir,
+                                         summary_url=f"/api/results/{key}/summary")
+    except Exception:
+        result_cache.release(key)
+        raise
+    if stream:
+        # 流式返回在响应体迭代时才打开文件，发送期间缓存项不能被并发的 put 淘汰
+        response.call_on_close(lambda: result_cache.release(key))
+    else:
+        # send_file 已经打开文件（并使用 direct_passthrough，不会执行 call_on_close）
+        result_cache.release(key)
+    response.headers['X-GDS-Cache'] = state
+    response.headers['X-GDS-Result'] = f"/api/results/{key}"
+    return expose_headers(response, 'ETag', 'X-GDS-Cache', 'X-GDS-Result')
+
+def run_sync_build(build):
+    """在当前线程中执行 prepare_build 准备好的构建
 
-        os.chdir(work_dir)
+    返回:
+        bool: 输出文件是否已生成
+    """
+    # 调用main.py的main函数: 参数直接传入而不是改写全局的 sys.argv，
+    # 相对路径和日志由独立的构建上下文处理，不切换工作目录，多个请求可以在不同线程中同时构建
+    context = BuildContext(build['work_dir'], os.path.join(build['build_dir'], BUILD_LOG_FILE))
+    gds_main(build['argv'], context=context)
+    return os.path.exists(build['output_file'])
 
-        # 调用main_oop.py的main函数
-        sys.argv = ['main_oop.py', config_file]
-        gds_main()
+@app.route('/api/generate-gds', methods=['POST'])
+def generate_gds():
+    """根据配置生成GDS文件
+
+    相同配置（忽略 _metadata）和输出选项的请求直接返回结果缓存中的文件，见 result_cache_key。
+    """
+    try:
+        config_data = request_config()
+        # ?stream=1: 分块流式返回，发送完毕后立即删除构建目录（需要保留性能分析报告时除外）
+        stream = build_flag(None, request.args, 'stream')
+        cache_key = result_cache_key(config_data, request.args)
+        if cache_key:
+            entry = result_cache.get(cache_key, pin=True)
+            if entry is not None:
+                return send_cached_result(cache_key, entry, build_flag(config_data, request.args, 'summary'),
+                                          'hit', stream)
 
-        # 恢复工作目录
-        os.chdir(original_dir)
+        try:
+            build = prepare_build(config_data, request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
 
         # 检查文件是否存在
-        if not os.path.exists(output_file):
+        if not run_sync_build(build):
             return jsonify({"success": False, "error": "GDS文件生成失败"}), 500
 
+        # 性能分析报告和统计的旁路文件在构建目录中，需要时保留
+        cleanup_dir = build['build_dir'] if stream and not (build['profile'] or build['summary']) else None
+        if cache_key:
+            entry = result_cache.put(cache_key, build['output_file'], [summary_report_path(build['output_file'])],
+                                     pin=True)
+            if entry is not None:
+                return send_cached_result(cache_key, entry, build['summary'], 'miss', stream, cleanup_dir)
+
         # 返回GDS文件供下载
-        return send_file(output_file, as_attachment=True, download_name=os.path.basename(output_file))
+        return send_build_result(build['output_file'], build['build_id'], build['profile'], build['summary'],
+                                 stream=stream, cleanup_dir=cleanup_dir)
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route('/api/validate-config', methods=['POST'])
-def validate_config():
-    """验证配置文件格式"""
+def plan_batch(items, args):
+    """确定批量生成中每个配置的归档文件名和结果缓存键
+
+    参数:
+        items: parse_batch 的结果
+        args: 查询参数
+
+    返回:
+        list: 每个配置一个 dict（index, name, file, config, key, summary_requested, state, error ...），即清单中的条目
+    """
+    entries = []
+    used = set()
+    for index, (name, config_data) in enumerate(items):
+        entry = {'index': index, 'name': name, 'file': None, 'state': None, 'cache_key': None,
+                 'wall': None, 'build': None, 'bytes': None, 'sha256': None, 'error': None}
+        try:
+            gds_config = dict(config_data.get('gds') or {})
+            output_name = os.path.basename(gds_config.get('output_file') or 'output.gds')
+            output_name = os.path.basename(resolve_output_file(output_name, apply_output_overrides(gds_config, args)))
+        except (AttributeError, ValueError) as e:
+            entry.update(state='failed', error=str(e))
+        else:
+            entry['file'] = archive_name(name, output_name, used)
+            entry['cache_key'] = result_cache_key(config_data, args)
+        entry['_config'] = config_data
+        entry['_summary'] = build_flag(config_data, args, 'summary')
+        entries.append(entry)
+    return entries
+
+def write_batch_entry(archive, entry, output_file, state):
+    """把一个输出文件写入批量归档并在清单条目中记录大小、哈希和统计（生成器，用 yield from 调用）"""
+    try:
+        sha256 = yield from archive.add_file(entry['file'], output_file,
+                                             compress=not output_file.lower().endswith('.gz'))
+    except OSError as e:  # 缓存项在读取前被淘汰
+        entry.update(state='failed', error=str(e))
+        return
+    entry.update(state=state, bytes=os.path.getsize(output_file), sha256=sha256)
+    report_file = summary_report_path(output_file)
+    if entry['_summary'] and os.path.exists(report_file):
+        with open(report_file, 'r', encoding='utf-8') as f:
+            entry['summary'] = json.load(f)
+
+def finish_batch_group(archive, group, future):
+    """写入一个已完成构建的结果（包括批量中与它配置相同的条目），失败时写入构建日志"""
+    build, entries = group['build'], group['entries']
+    wall = round(time.perf_counter() - group['submitted'], 6)
+    try:
+        output, seconds = future.result()
+        error = None if output and os.path.exists(build['output_file']) else "GDS文件生成失败"
+    except Exception as e:
+        seconds, error = None, str(e)
+    build_seconds = round(seconds, 6) if seconds is not None else None
+    for entry in entries:
+        entry.update(wall=wall, build=build_seconds)
+    if error:
+        log_file = os.path.join(build['build_dir'], BUILD_LOG_FILE)
+        for entry in entries:
+            entry.update(state='failed', error=error)
+        if os.path.exists(log_file):
+            entries[0]['log'] = f"{entries[0]['file']}.log"
+            yield from archive.add_file(entries[0]['log'], log_file)
+        return
+
+    output_file = build['output_file']
+    state = 'built'
+    if group['key']:
+        result_cache.put(group['key'], output_file, [summary_report_path(output_file)])
+        state = 'miss'
+    for i, entry in enumerate(entries):
+        yield from write_batch_entry(archive, entry, output_file, state if i == 0 else 'duplicate')
+    report_file = profile_report_path(output_file)
+    if build['profile'] and os.path.exists(report_file):
+        entries[0]['profile'] = f"{entries[0]['file']}.profile.json"
+        yield from archive.add_file(entries[0]['profile'], report_file)
+
+def iter_batch(entries, args):
+    """批量生成的 zip 归档流
+
+    缓存命中的结果先写入；其余配置在任务的常驻进程池中构建（同时提交的数量不超过进程池大小，
+    不会让排队的异步任务等待整个批量），构建完成一个写入一个，相同配置只构建一次，最后写入 manifest.json。
+    客户端断开时取消尚未开始的构建，构建目录在构建结束后删除。
+    """
+    start = time.perf_counter()
+    archive = ZipStream()
+    groups = {}  # 缓存键（或序号）-> {'key', 'entries', 'build', 'submitted'}
+    waiting = []
+    running = {}  # Future -> group
+    try:
+        for entry in entries:
+            if entry['state'] == 'failed':
+                continue
+            key = entry['cache_key']
+            if key:
+                cached = result_cache.get(key, pin=True)
+                if cached is not None:
+                    try:
+                        yield from write_batch_entry(archive, entry, cached['output_file'], 'hit')
+                    finally:
+                        result_cache.release(key)
+                    continue
+                if key in groups:
+                    groups[key]['entries'].append(entry)
+                    continue
+            group = {'key': key, 'entries': [entry], 'build': None, 'submitted': None}
+            groups[key or entry['index']] = group
+            waiting.append(group)
+
+        waiting.reverse()
+        while waiting or running:
+            while waiting and len(running) < job_manager.workers:
+                group = waiting.pop()
+                try:
+                    group['build'] = build = prepare_build(group['entries'][0]['_config'], args)
+                except ValueError as e:
+                    for entry in group['entries']:
+                        entry.update(state='failed', error=str(e))
+                    continue
+                group['submitted'] = time.perf_counter()
+                running[job_manager.submit_build(build['build_dir'], build['work_dir'], build['argv'])] = group
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                group = running.pop(future)
+                try:
+                    yield from finish_batch_group(archive, group, future)
+                finally:
+                    shutil.rmtree(group['build']['build_dir'], ignore_errors=True)
+
+        failed = sum(1 for entry in entries if entry['state'] == 'failed')
+        manifest = {
+            'success': failed == 0,
+            'configs': len(entries),
+            'failed': failed,
+            'seconds': round(time.perf_counter() - start, 6),
+            'entries': [{k: v for k, v in entry.items() if not k.startswith('_')} for entry in entries],
+        }
+        yield archive.add_bytes(MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, indent=2))
+        yield archive.close()
+    finally:
+        # 客户端断开: 未开始的构建取消，正在执行的构建结束后再删除目录
+        for future, group in running.items():
+            build_dir = group['build']['build_dir']
+            future.cancel()
+            future.add_done_callback(lambda _, d=build_dir: shutil.rmtree(d, ignore_errors=True))
+
+@app.route('/api/generate-batch', methods=['POST'])
+def generate_batch():
+    """一次生成多个配置，以 zip 归档流式返回（见 web_gui/batch.py）
+
+    请求体为 JSON: 配置列表或 {"configs": [...]}，每项也可以是 {"name": 归档中的文件名, "config": 配置}；
+    查询参数与 /api/generate-gds 相同（format / gzip / summary / profile / cache）。
+    单个配置失败不影响其他配置，结果记录在归档最后的 manifest.json 中。
+    """
+    try:
+        entries = plan_batch(parse_batch(request.get_json(silent=True)), request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    # 生成器在请求结束后仍在执行，查询参数复制一份
+    response = app.response_class(iter_batch(entries, request.args.copy()), mimetype='application/zip')
+    response.headers.set('Content-Disposition', 'attachment', filename='batch.zip')
+    response.headers['X-Accel-Buffering'] = 'no'  # 反向代理不要缓冲，结果就绪即发送
+    return response
+
+def preview_options(args):
+    """预览的查询参数 image / width / height / cell
+
+    异常:
+        ValueError: 取值非法
+    """
+    image_format = args.get('image', 'png').lower()
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"不支持的预览格式: {image_format}，可选 {', '.join(IMAGE_FORMATS)}")
+    try:
+        width = int(args.get('width', PREVIEW_SIZE))
+        height = int(args.get('height', PREVIEW_SIZE))
+    except ValueError:
+        raise ValueError("width / height 应为整数")
+    if not (0 < width <= MAX_SIZE and 0 < height <= MAX_SIZE):
+        raise ValueError(f"预览尺寸应在 1 到 {MAX_SIZE} 像素之间: {width}x{height}")
+    return {'image_format': image_format, 'width': width, 'height': height, 'cell_name': args.get('cell') or None}
+
+def ensure_layout(config_data, cache_key):
+    """请求对应的版图文件: 结果缓存中已有时直接使用，否则构建并写入缓存
+
+    参数:
+        config_data: 请求中的配置
+        cache_key: result_cache_key 的结果，None 表示不使用缓存
+
+    返回:
+        tuple: (layout_file, build)；build 为本次构建，调用方用完后删除其构建目录，命中缓存时为 None
+
+    异常:
+        ValueError: 输出选项非法
+        RuntimeError: 构建失败
+    """
+    entry = result_cache.get(cache_key) if cache_key else None
+    if entry is not None:
+        return entry['output_file'], None
+    build = prepare_build(config_data, request.args)
+    if not run_sync_build(build):
+        shutil.rmtree(build['build_dir'], ignore_errors=True)
+        raise RuntimeError("GDS文件生成失败")
+    if cache_key:
+        result_cache.put(cache_key, build['output_file'], [summary_report_path(build['output_file'])])
+    return build['output_file'], build
+
+def derived_result(config_data, kind, options, render, mimetype, filename):
+    """由生成的版图派生的结果（预览图、二进制几何等）
+
+    版图和派生结果都保存在结果缓存中：先生成过的配置不再构建，相同参数的重复请求不再计算。
+
+    参数:
+        config_data: 请求中的配置
+        kind: 结果种类，与 options 一起组成缓存键
+        options: 影响结果的参数（可 JSON 序列化）
+        render: render(layout_file) -> bytes，可抛出 ValueError（返回 400）
+        mimetype: 响应的 MIME 类型
+        filename: 结果在缓存中的文件名
+    """
+    cache_key = result_cache_key(config_data, request.args)
+    derived_key = None
+    if cache_key:
+        derived_key = hashlib.sha256(json.dumps([cache_key, kind, options], sort_keys=True)
+                                     .encode('utf-8')).hexdigest()
+        cached = result_cache.get(derived_key)
+        if cached is not None:
+            response = send_file(cached['output_file'], mimetype=mimetype, etag=cached['etag'])
+            response.headers['X-GDS-Cache'] = 'hit'
+            return expose_headers(response, 'ETag', 'X-GDS-Cache')
+
+    try:
+        layout_file, build = ensure_layout(config_data, cache_key)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    try:
+        data = render(layout_file)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    finally:
+        if build is not None:
+            shutil.rmtree(build['build_dir'], ignore_errors=True)
+
+    response = app.response_class(data, mimetype=mimetype)
+    response.set_etag(hashlib.sha256(data).hexdigest())
+    if derived_key:
+        result_cache.put_bytes(derived_key, filename, data)
+    response.headers['X-GDS-Cache'] = 'miss'
+    return expose_headers(response, 'ETag', 'X-GDS-Cache')
+
+@app.route('/api/preview', methods=['POST'])
+def preview():
+    """渲染生成结果的预览图（PNG / SVG）
+
+    请求体与 /api/generate-gds 相同，查询参数 image=png|svg、width、height、cell 控制渲染。
+    """
+    try:
+        config_data = request_config()
+        try:
+            options = preview_options(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        mimetype = 'image/svg+xml' if options['image_format'] == 'svg' else 'image/png'
+        return derived_result(config_data, 'preview', options, lambda path: render_preview_file(path, **options),
+                              mimetype, f"preview.{options['image_format']}")
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def geometry_options(args):
+    """二进制几何的查询参数 coords / viewport / pixels / quantum / cell
+
+    未给出 pixels 时按 DEFAULT_PIXELS 简化（没有 viewport 时对应整个版图），pixels=0 返回全部顶点。
+
+    异常:
+        ValueError: 取值非法
+    """
+    coord_type = args.get('coords', 'int32').lower()
+    if coord_type not in COORD_TYPES:
+        raise ValueError(f"不支持的坐标类型: {coord_type}，可选 {', '.join(COORD_TYPES)}")
+    try:
+        viewport = [float(v) for v in args['viewport'].split(',')] if args.get('viewport') else None
+        pixels = int(args['pixels']) if args.get('pixels') else DEFAULT_PIXELS
+        quantum = float(args['quantum']) if args.get('quantum') else None
+    except ValueError:
+        raise ValueError("viewport 应为 left,bottom,right,top（微米），pixels 应为整数，quantum 应为数值")
+    if viewport is not None and len(viewport) != 4:
+        raise ValueError("viewport 应为 left,bottom,right,top（微米）")
+    return {'coord_type': coord_type, 'viewport': viewport, 'pixels': pixels or None, 'quantum': quantum,
+            'cell_name': args.get('cell') or None}
+
+@app.route('/api/geometry', methods=['POST'])
+def geometry():
+    """按图层返回紧凑的二进制几何，供前端直接绘制（格式见 gds_utils/geometry.py）
+
+    请求体与 /api/generate-gds 相同，查询参数 coords=int32|float32、viewport、pixels、quantum、cell。
+    """
+    try:
+        config_data = request_config()
+        try:
+            options = geometry_options(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        return derived_result(config_data, 'geometry', options, lambda path: encode_geometry_file(path, **options),
+                              GEOMETRY_MIMETYPE, 'geometry.bin')
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/tiles', methods=['POST'])
+def create_tiles():
+    """为生成的版图准备瓦片金字塔预览
+
+    请求体与 /api/generate-gds 相同。版图保存在结果缓存中，返回缓存键和瓦片地址模板，
+    瓦片在第一次请求时渲染（GET /api/tiles/<key>/<z>/<x>/<y>.png），之后从磁盘缓存读取。
+    """
+    try:
+        config_data = request_config()
+        cache_key = result_cache_key(config_data, request.args)
+        if not cache_key:
+            return jsonify({"success": False,
+                            "error": "瓦片预览按版图哈希缓存，需要启用结果缓存（且不能使用 profile 或 cache=0）"}), 400
+        try:
+            layout_file, build = ensure_layout(config_data, cache_key)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        if build is not None:
+            shutil.rmtree(build['build_dir'], ignore_errors=True)
+        entry = result_cache.get(cache_key)
+        if entry is None:
+            return jsonify({"success": False, "error": "版图超过结果缓存容量，无法提供瓦片预览"}), 400
+        layout = read_layout_shared(entry['output_file'])
+        grid = tile_grid(layout)
+        dbu = layout.dbu
+        return jsonify({
+            "success": True,
+            "key": cache_key,
+            "tile_url": f"/api/tiles/{cache_key}/{{z}}/{{x}}/{{y}}.png",
+            "tile_size": grid['tile_size'],
+            "max_zoom": grid['max_zoom'],
+            "origin": [grid['origin'][0] * dbu, grid['origin'][1] * dbu],
+            "extent": grid['extent'] * dbu,
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/tiles/<key>/<int:z>/<int:x>/<int:y>.png', methods=['GET'])
+def get_tile(key, z, x, y):
+    """按需渲染并缓存一个预览瓦片"""
+    if result_cache is None or not RESULT_KEY_PATTERN.fullmatch(key):
+        return jsonify({"success": False, "error": "无效的版图键"}), 404
+    tile_key = hashlib.sha256(json.dumps([key, 'tile', z, x, y]).encode('utf-8')).hexdigest()
+    cached = result_cache.get(tile_key)
+    if cached is None:
+        entry = result_cache.get(key)
+        if entry is None:
+            return jsonify({"success": False, "error": "版图不存在或已被淘汰，请重新提交 /api/tiles"}), 404
+        try:
+            data = render_tile(read_layout_shared(entry['output_file']), z, x, y)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 404
+        cached = result_cache.put_bytes(tile_key, f"{z}-{x}-{y}.png", data)
+        if cached is None:
+            response = app.response_class(data, mimetype='image/png')
+            response.set_etag(hashlib.sha256(data).hexdigest())
+            return response.make_conditional(request)
+    # 瓦片由版图内容和编号唯一确定，不会变化
+    response = send_file(cached['output_file'], mimetype='image/png', etag=cached['etag'], max_age=86400)
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/api/results/<key>', methods=['GET'])
+def get_cached_result(key):
+    """按缓存键下载生成结果，支持 If-None-Match（304）和 Range"""
+    entry = result_cache.get(key, pin=True) if result_cache is not None and RESULT_KEY_PATTERN.fullmatch(key) \
+        else None
+    if entry is None:
+        return jsonify({"success": False, "error": "结果不存在或已被淘汰"}), 404
+    return send_cached_result(key, entry, build_flag(None, request.args, 'summary'), 'hit',
+                              build_flag(None, request.args, 'stream'))
+
+@app.route('/api/result-cache', methods=['GET'])
+def get_result_cache_stats():
+    """生成结果缓存的统计信息"""
+    if result_cache is None:
+        return jsonify({"success": True, "enabled": False})
+    return jsonify({"success": True, "enabled": True, **result_cache.stats()})
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """提交异步构建任务，立即返回任务 ID
+
+    请求体和查询参数与 /api/generate-gds 相同；队列已满时返回 503。
+    """
+    try:
+        try:
+            build = prepare_build(request_config(), request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        job_id = build['build_id']
+        try:
+            job_manager.submit(job_id, build['build_dir'], build['work_dir'], build['argv'], build['output_file'],
+                               meta={'profile': build['profile'], 'summary': build['summary']})
+        except QueueFullError as e:
+            shutil.rmtree(build['build_dir'], ignore_errors=True)
+            response = jsonify({"success": False, "error": str(e)})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "status_url": f"/api/jobs/{job_id}",
+            "events_url": f"/api/jobs/{job_id}/events",
+            "download_url": f"/api/jobs/{job_id}/download",
+        }), 202
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def get_job_queue_stats():
+    """任务队列统计"""
+    return jsonify({"success": True, **job_manager.stats()})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """查询任务状态和进度"""
+    status = job_manager.status(job_id) if BUILD_ID_PATTERN.fullmatch(job_id) else None
+    if status is None:
+        return jsonify({"success": False, "error": "任务不存在"}), 404
+    return jsonify({"success": True, **status})
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """以 Server-Sent Events 推送任务的进度、阶段耗时和警告，任务结束时发送 end 事件后关闭
+
+    支持断线重连时的 Last-Event-ID 请求头（或 ?last_id=），只发送之后的事件。
+    """
+    job = job_manager.get(job_id) if BUILD_ID_PATTERN.fullmatch(job_id) else None
+    if job is None:
+        return jsonify({"success": False, "error": "任务不存在"}), 404
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_id') or '0'
+    if not last_id.isdigit():
+        return jsonify({"success": False, "error": f"无效的事件序号: {last_id}"}), 400
+
+    def finished():
+        status = job_manager.status(job_id)
+        if status is None:  # 任务已被清理
+            return {"job_id": job_id, "state": "failed", "error": "任务不存在"}
+        return status if status['state'] in ('done', 'failed') else None
+
+    response = Response(iter_events(job['events_file'], finished, int(last_id)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # 反向代理不要缓冲
+    return response
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+def download_job_result(job_id):
+    """下载已完成任务的输出文件"""
+    status = job_manager.status(job_id) if BUILD_ID_PATTERN.fullmatch(job_id) else None
+    if status is None:
+        return jsonify({"success": False, "error": "任务不存在"}), 404
+    if status['state'] != 'done':
+        return jsonify({"success": False, "state": status['state'], "error": status['error'] or "任务尚未完成"}), 409
+    job = job_manager.get(job_id)
+    return send_build_result(job['output_file'], job_id, job['meta'].get('profile'), job['meta'].get('summary'),
+                             stream=build_flag(None, request.args, 'stream'))
+
+@app.route('/api/profile/<build_id>/<filename>', methods=['GET'])
+def get_profile_report(build_id, filename):
+    """下载完整的性能分析报告（JSON 旁路文件）"""
+    filename = secure_filename(filename)
+    if not BUILD_ID_PATTERN.fullmatch(build_id) or not filename.endswith('.profile.json'):
+        return jsonify({"success": False, "error": "无效的报告文件名"}), 400
+    report_file = os.path.join(app.config['TEMP_FOLDER'], build_id, filename)
+    if not os.path.exists(report_file):
+        return jsonify({"success": False, "error": "报告不存在"}), 404
+    return send_file(report_file, mimetype='application/json')
+
+@app.route('/api/summary/<build_id>/<filename>', methods=['GET'])
+def get_summary_report(build_id, filename):
+    """下载构建目录中的完整版图统计（JSON 旁路文件）"""
+    filename = secure_filename(filename)
+    if not BUILD_ID_PATTERN.fullmatch(build_id) or not filename.endswith('.summary.json'):
+        return jsonify({"success": False, "error": "无效的统计文件名"}), 400
+    report_file = os.path.join(app.config['TEMP_FOLDER'], build_id, filename)
+    if not os.path.exists(report_file):
+        return jsonify({"success": False, "error": "统计不存在"}), 404
+    return send_file(report_file, mimetype='application/json')
+
+@app.route('/api/results/<key>/summary', methods=['GET'])
+def get_cached_summary(key):
+    """下载结果缓存中生成结果的完整版图统计"""
+    entry = result_cache.get(key) if result_cache is not None and RESULT_KEY_PATTERN.fullmatch(key) else None
+    report_file = summary_report_path(entry['output_file']) if entry is not None else None
+    if report_file is None or not os.path.exists(report_file):
+        return jsonify({"success": False, "error": "统计不存在或结果已被淘汰"}), 404
+    return send_file(report_file, mimetype='application/json')
+
+@app.route('/api/layout-cache', methods=['GET'])
+def get_layout_cache_stats():
+    """输入版图缓存的统计信息"""
+    cache = shared_cache()
+    if cache is None:
+        return jsonify({"success": True, "enabled": False})
+    return jsonify({"success": True, "enabled": True, **cache.stats()})
+
+@app.route('/api/estimate', methods=['POST'])
+def estimate():
+    """估算配置的生成代价（顶点数、多边形数、输出大小、耗时），不构建几何"""
     try:
         if request.content_type == 'application/json':
             config_data = request.json
         else:
             config_data = yaml.safe_load(request.form.get('config', '{}'))
 
-        # 处理元数据
-        config_data = process_metadata(config_data)
+        if not isinstance(config_data, dict):
+            return jsonify({"success": False, "error": "配置必须是一个有效的YAML对象"}), 400
 
         # 确保ring_width和ring_space保持为字符串类型
         config_data = ensure_string_values(config_data)
 
-        # 基本验证
-        if not isinstance(config_data, dict):
-            return jsonify({"valid": False, "errors": ["配置必须是一个有效的YAML对象"]}), 400
+        with BuildContext(project_dir()).activate():
+            report = estimate_config(config_data)
+        return jsonify({"success": True, "estimate": report})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
 
-        if "global" not in config_data:
-            return jsonify({"valid": False, "errors": ["缺少'global'配置部分"]}), 400
+@app.route('/api/validate-config', methods=['POST'])
+def validate_config():
+    """验证配置文件
 
-        if "gds" not in config_data:
-            return jsonify({"valid": False, "errors": ["缺少'gds'配置部分"]}), 400
+    除了检查 global / gds / shapes 是否存在，还解析每个形状的顶点、环规则和倒角配置，
+    按构建流程推算每条边界并检查倒角是否可行（不构建几何），返回逐形状、逐顶点的诊断。
+    """
+    try:
+        if request.content_type == 'application/json':
+            config_data = request.json
+        else:
+            config_data = yaml.safe_load(request.form.get('config', '{}'))
 
-        if "shapes" not in config_data or not isinstance(config_data["shapes"], list):
-            return jsonify({"valid": False, "errors": ["缺少'shapes'配置部分或者不是列表类型"]}), 400
+        # 处理元数据
+        config_data = process_metadata(config_data)
 
-        # 可以添加更多详细的验证规则
+        # 确保ring_width和ring_space保持为字符串类型
+        config_data = ensure_string_values(config_data)
 
-        return jsonify({"valid": True})
+        # 相对路径（vertices_file 等）与生成时一样相对于项目目录
+        with BuildContext(project_dir()).activate():
+            report = check_config(config_data)
+        return jsonify(report), 200 if report['valid'] else 400
     except Exception as e:
         return jsonify({"valid": False, "errors": [str(e)]}), 400
 
@@ -263,7 +1115,7 @@ def save_config():
 
         # 提取并保存配置
         config_content = config_data.get('config', {})
-        with open(file_path, 'w', encoding='utf-8') as f:
+        with atomic_write_path(file_path) as temp_file, open(temp_file, 'w', encoding='utf-8') as f:
             yaml.dump(config_content, f,
                      default_style='"',  # 使用双引号来确保字符串类型
                      allow_unicode=True,
@@ -0,0 +1,149 @@
+"""批量生成: 一次请求构建多个配置，结果以 zip 归档流式返回
+
+归档按结果就绪的顺序逐个写入输出文件，最后写入 manifest.json（每个配置的缓存状态、耗时、大小和 SHA-256）。
+zip 使用数据描述符格式，写完一个文件后不需要回写文件头，整个归档可以边生成边发送，不在内存或磁盘上拼装。
+"""
+
+import hashlib
+import os
+import re
+import time
+import zipfile
+
+MAX_BATCH_CONFIGS = 64
+MANIFEST_FILE = 'manifest.json'
+CHUNK_SIZE = 1 << 20  # 1 MiB
+_UNSAFE_CHARS = re.compile(r'[^\w.-]+')
+_LAYOUT_EXTENSION = re.compile(r'\.(gds2?|oas(is)?)(\.gz)?$', re.IGNORECASE)
+
+
+def parse_batch(body, max_configs=MAX_BATCH_CONFIGS):
+    """解析批量生成的请求体
+
+    参数:
+        body: 配置列表或 {"configs": [...]}；每一项为配置本身，或 {"name": 归档中的文件名, "config": 配置}
+        max_configs: 一次最多生成的配置数
+
+    返回:
+        list: [(name | None, config)]
+
+    异常:
+        ValueError: 请求体格式不正确或配置数超过上限
+    """
+    configs = body.get('configs') if isinstance(body, dict) else body
+    if not isinstance(configs, list) or not configs:
+        raise ValueError('请求体应为非空的配置列表或 {"configs": [...]}')
+    if len(configs) > max_configs:
+        raise ValueError(f"一次最多生成 {max_configs} 个配置: {len(configs)}")
+    items = []
+    for i, item in enumerate(configs, 1):
+        if not isinstance(item, dict):
+            raise ValueError(f"第 {i} 项不是配置对象")
+        if isinstance(item.get('config'), dict):
+            name, config = item.get('name'), item['config']
+        else:
+            name, config = None, item
+        if name is not None and not isinstance(name, str):
+            raise ValueError(f"第 {i} 项的 name 应为字符串: {name!r}")
+        items.append((name, config))
+    return items
+
+
+def archive_name(name, output_name, used):
+    """确定输出文件在归档中的文件名
+
+    参数:
+        name: 请求中给出的名称，None 或空串时使用输出文件名；扩展名总是取自输出文件，名称中的版图扩展名被去掉
+        output_name: 输出文件名（已按输出选项确定扩展名，见 gds.resolve_output_file）
+        used: 已使用的文件名集合，重名时追加 -2、-3 …，结果会加入其中
+
+    返回:
+        str: 归档中的文件名
+    """
+    gz = output_name[-3:] if output_name.lower().endswith('.gz') else ''
+    stem, ext = os.path.splitext(output_name[:len(output_name) - len(gz)])
+    ext += gz
+    if name:
+        name = _LAYOUT_EXTENSION.sub('', name)
+        if name.lower().endswith(ext.lower()):
+            name = name[:-len(ext)]
+        stem = _UNSAFE_CHARS.sub('_', name).strip('._') or stem
+    candidate = stem + ext
+    n = 2
+    while candidate in used or candidate == MANIFEST_FILE:
+        candidate = f"{stem}-{n}{ext}"
+        n += 1
+    used.add(candidate)
+    return candidate
+
+
+class _Buffer:
+    """zipfile 的写入目标（不可 seek），收集写出的字节供生成器取走"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ZipStream:
+    """边写边输出的 zip 归档
+
+    add_file 是生成器，逐块产生归档字节，结束时返回文件的 SHA-256，调用方用 yield from 串接到响应中。
+    """
+
+    def __init__(self):
+        self._buffer = _Buffer()
+        # 目标不支持 tell/seek 时 zipfile 自动使用数据描述符
+        self._zip = zipfile.ZipFile(self._buffer, 'w', zipfile.ZIP_DEFLATED)
+
+    def add_file(self, name, path, compress=True, chunk_size=CHUNK_SIZE):
+        """把文件逐块写入归档
+
+        参数:
+            name: 归档中的文件名
+            path: 文件路径；在写出任何字节之前打开，文件不存在时直接抛出 OSError
+            compress: 是否 deflate 压缩（已经 gzip 压缩的文件应关闭）
+            chunk_size: 读取块大小（字节）
+
+        返回:
+            str: 文件内容的 SHA-256（十六进制），作为生成器的返回值
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            info.file_size = os.fstat(f.fileno()).st_size  # 据此决定是否需要 zip64
+            with self._zip.open(info, 'w') as dest:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    digest.update(chunk)
+                    dest.write(chunk)
+                    data = self._buffer.take()
+                    if data:
+                        yield data
+        data = self._buffer.take()
+        if data:
+            yield data
+        return digest.hexdigest()
+
+    def add_bytes(self, name, data):
+        """写入内存中的数据，返回对应的归档字节"""
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        self._zip.writestr(info, data)
+        return self._buffer.take()
+
+    def close(self):
+        """写出中央目录，返回最后的归档字节"""
+        self._zip.close()
+        return self._buffer.take()
@@ -0,0 +1,121 @@
+"""构建事件的 SSE（Server-Sent Events）推送
+
+构建进程把事件逐行追加到 events.jsonl（见 gds_utils/events.py），每个客户端各自打开文件从上次的位置继续读取，
+构建进程从不等待客户端。每个客户端一次最多读取 buffer_bytes 字节；落后超过这个量时跳过中间的事件，
+先发送一个 gap 事件说明跳过的序号范围，再从较新的事件继续，因此慢的客户端只会丢事件，不会占用更多内存。
+"""
+
+import json
+import os
+import time
+
+DEFAULT_BUFFER_BYTES = 256 * 1024
+POLL_INTERVAL = 0.25
+HEARTBEAT_INTERVAL = 15
+RETRY_MS = 2000
+
+
+def sse_message(data, event=None, event_id=None):
+    """格式化一条 SSE 消息，data 序列化为单行 JSON"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+class EventTail:
+    """一个客户端对事件文件的读取位置"""
+
+    def __init__(self, path, last_id=0, buffer_bytes=DEFAULT_BUFFER_BYTES):
+        """初始化读取位置
+
+        参数:
+            path: 事件文件路径，可以尚不存在
+            last_id: 客户端已收到的最后一个序号（Last-Event-ID），不再重复发送
+            buffer_bytes: 每次最多读取的字节数，也是允许落后的最大字节数
+        """
+        self.path = path
+        self.last_id = last_id
+        self.buffer_bytes = buffer_bytes
+        self.position = 0
+        self.drained = True  # 上次读取是否已经读到文件末尾
+
+    def read(self):
+        """读取新的完整事件
+
+        返回:
+            list: [(event_type, event)]，event_type 为事件的 type 或 gap
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                skipped = size - self.position > self.buffer_bytes
+                if skipped:
+                    # 落后太多，只保留最近 buffer_bytes 字节中从下一行开始的事件
+                    f.seek(size - self.buffer_bytes)
+                    f.readline()
+                    self.position = f.tell()
+                else:
+                    f.seek(self.position)
+                data = f.read(min(self.buffer_bytes, size - self.position))
+        except FileNotFoundError:
+            return []
+        end = data.rfind(b'\n') + 1  # 写到一半的行留到下次读取
+        if end == 0 and len(data) == self.buffer_bytes:
+            end = len(data)  # 单行超过上限时丢弃，剩余部分在下次读取时解析失败并跳过
+        # 读到了文件末尾（最多剩下写到一半的行）时，需要等待构建进程继续写入
+        self.drained = self.position + len(data) >= size
+        self.position += end
+        results = []
+        for line in data[:end].splitlines():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            seq = event.get('seq', 0)
+            if seq <= self.last_id:
+                continue
+            if skipped and seq > self.last_id + 1:
+                results.append(('gap', {'from': self.last_id + 1, 'to': seq - 1}))
+            skipped = False
+            self.last_id = seq
+            results.append((event.get('type', 'message'), event))
+        return results
+
+
+def iter_events(path, finished, last_id=0, buffer_bytes=DEFAULT_BUFFER_BYTES,
+                poll_interval=POLL_INTERVAL, heartbeat_interval=HEARTBEAT_INTERVAL, sleep=time.sleep):
+    """生成一个构建的 SSE 消息流
+
+    参数:
+        path: 事件文件路径
+        finished: finished() -> dict | None，构建结束后返回最终状态（作为 end 事件发送），否则返回 None
+        last_id: 客户端的 Last-Event-ID
+        buffer_bytes: 每个客户端的读取上限，见 EventTail
+        poll_interval: 没有新事件时的轮询间隔（秒）
+        heartbeat_interval: 没有事件时发送注释行保持连接的间隔（秒）
+        sleep: 等待函数（测试用）
+    """
+    tail = EventTail(path, last_id, buffer_bytes)
+    yield f"retry: {RETRY_MS}\n\n"
+    idle = 0.0
+    while True:
+        # 先取状态再读文件，结束前写出的事件一定会在 end 之前发送
+        status = finished()
+        events = tail.read()
+        for event_type, event in events:
+            yield sse_message(event, event_type, event.get('seq'))
+        if status is not None and tail.drained:
+            yield sse_message(status, 'end')
+            return
+        if events or not tail.drained:
+            idle = 0.0
+            continue
+        if idle >= heartbeat_interval:
+            yield ": keepalive\n\n"
+            idle = 0.0
+        sleep(poll_interval)
+        idle += poll_interval
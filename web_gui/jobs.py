@@ -0,0 +1,263 @@
+"""异步构建任务队列
+
+POST /api/jobs 立即返回任务 ID，构建在有界的进程池中执行，状态和进度通过轮询或事件流（SSE）获取。
+每个任务对应一个独立的构建目录，任务 ID 即构建目录名。
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_DEPTH = 8
+PROGRESS_FILE = 'progress.json'
+EVENTS_FILE = 'events.jsonl'
+BUILD_LOG_FILE = 'build.log'
+
+
+class QueueFullError(RuntimeError):
+    """排队的任务数已达上限"""
+
+
+def load_job_settings(config_path):
+    """从 Web GUI 配置文件读取任务队列设置
+
+    参数:
+        config_path: config/webgui_client_config.json 路径，不存在时使用默认值
+
+    返回:
+        dict: {"workers": 进程池大小, "queue_depth": 最多排队（未开始执行）的任务数}
+
+    异常:
+        ValueError: 取值非法
+    """
+    config = {}
+    if config_path and os.path.exists(config_path):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    workers = int(config.get('job_workers', DEFAULT_WORKERS))
+    queue_depth = int(config.get('job_queue_depth', DEFAULT_QUEUE_DEPTH))
+    if workers < 1 or queue_depth < 0:
+        raise ValueError(f"job_workers 应 >= 1、job_queue_depth 应 >= 0: {workers}, {queue_depth}")
+    return {'workers': workers, 'queue_depth': queue_depth}
+
+
+def run_build(work_dir, argv, progress_file):
+    """在工作进程中执行一次构建
+
+    参数:
+        work_dir: 工作目录（配置中的相对路径相对于它）
+        argv: 传给 main.main 的参数
+        progress_file: 进度文件，开始执行时先写入 start；构建日志写在同目录的 build.log
+
+    返回:
+        str | None: 输出文件路径，失败返回 None
+    """
+    from main import main as gds_main, progress_file_writer
+    from gds_utils.context import BuildContext
+    progress_file_writer(progress_file)('start')
+    log_file = os.path.join(os.path.dirname(progress_file), BUILD_LOG_FILE)
+    return gds_main(argv, context=BuildContext(work_dir, log_file))
+
+
+def run_timed_build(work_dir, argv, progress_file):
+    """执行一次构建并计时（批量生成用），参数同 run_build
+
+    返回:
+        tuple: (输出文件路径 | None, 工作进程中的构建耗时（秒）)
+    """
+    start = time.perf_counter()
+    result = run_build(work_dir, argv, progress_file)
+    return result, time.perf_counter() - start
+
+
+def init_worker():
+    """工作进程启动时启用共享版图缓存，同一进程后续的构建复用已解析的 input_file"""
+    from gds_utils.layout_cache import configure_shared_cache
+    configure_shared_cache()
+
+
+def read_progress(progress_file):
+    """读取进度文件，不存在或无法解析时返回 None"""
+    try:
+        with open(progress_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class JobManager:
+    """有界的构建任务队列
+
+    同时执行的任务数为 workers，另外最多 queue_depth 个任务排队，超过时 submit 抛出 QueueFullError。
+    进程池在第一次提交时创建，使用 spawn 启动方式，避免在多线程的 Web 服务中 fork；
+    工作进程常驻并各自保留共享版图缓存（见 init_worker），批量生成（submit_build）也使用同一个进程池。
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, queue_depth=DEFAULT_QUEUE_DEPTH, executor_factory=None):
+        """初始化任务队列
+
+        参数:
+            workers: 进程池大小
+            queue_depth: 最多排队的任务数
+            executor_factory: executor_factory(workers) -> Executor，默认为 spawn 进程池
+        """
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._executor_factory = executor_factory or (
+            lambda n: ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context('spawn'),
+                                          initializer=init_worker))
+        self._executor = None
+        self._jobs = {}
+        self._builds = set()  # submit_build 提交、尚未结束的构建目录
+        self._lock = threading.Lock()
+
+    def _active(self):
+        return sum(1 for job in self._jobs.values() if not job['future'].done())
+
+    def submit(self, job_id, build_dir, work_dir, argv, output_file, meta=None):
+        """提交构建任务
+
+        参数:
+            job_id: 任务 ID（构建目录名）
+            build_dir: 构建目录，进度文件和事件文件写在其中
+            work_dir: 构建的工作目录
+            argv: 传给 main.main 的参数
+            output_file: 预期的输出文件路径
+            meta: 调用方附加的信息，原样保存在任务记录中
+
+        返回:
+            str: 任务 ID
+
+        异常:
+            QueueFullError: 队列已满
+        """
+        progress_file = os.path.join(build_dir, PROGRESS_FILE)
+        events_file = os.path.join(build_dir, EVENTS_FILE)
+        with self._lock:
+            if self._active() >= self.workers + self.queue_depth:
+                raise QueueFullError(f"任务队列已满（{self.workers} 个执行中 + {self.queue_depth} 个排队）")
+            future = self._submit(run_build, work_dir, argv + ['--progress', progress_file, '--events', events_file],
+                                  progress_file)
+            self._jobs[job_id] = {
+                'future': future,
+                'build_dir': build_dir,
+                'output_file': output_file,
+                'progress_file': progress_file,
+                'events_file': events_file,
+                'meta': meta or {},
+                'created': time.time(),
+                'finished': None,
+            }
+        future.add_done_callback(lambda _: self._mark_finished(job_id))
+        return job_id
+
+    def _submit(self, *args):
+        """提交到进程池（调用方持有锁）"""
+        if self._executor is None:
+            self._executor = self._executor_factory(self.workers)
+        try:
+            return self._executor.submit(*args)
+        except BrokenProcessPool:
+            # 工作进程异常退出（崩溃、被 OOM 终止）后进程池不可再用，换一个新的
+            self._executor.shutdown(wait=False)
+            self._executor = self._executor_factory(self.workers)
+            return self._executor.submit(*args)
+
+    def submit_build(self, build_dir, work_dir, argv):
+        """把一次构建提交到任务使用的进程池，不登记为任务，也不受排队上限限制
+
+        用于批量生成，调用方自行限制同时提交的数量（通常不超过 workers），以免排在后面的任务等待过久。
+
+        参数:
+            build_dir: 构建目录，进度文件写在其中
+            work_dir: 构建的工作目录
+            argv: 传给 main.main 的参数
+
+        返回:
+            Future: 结果为 run_timed_build 的 (输出文件路径 | None, 构建耗时)
+        """
+        progress_file = os.path.join(build_dir, PROGRESS_FILE)
+        with self._lock:
+            future = self._submit(run_timed_build, work_dir, argv + ['--progress', progress_file], progress_file)
+            self._builds.add(build_dir)
+        future.add_done_callback(lambda _: self._discard_build(build_dir))
+        return future
+
+    def _discard_build(self, build_dir):
+        with self._lock:
+            self._builds.discard(build_dir)
+
+    def active_ids(self):
+        """尚未结束的任务 ID 和批量构建的目录名，这些构建目录不能按时间清理"""
+        with self._lock:
+            ids = {job_id for job_id, job in self._jobs.items() if not job['future'].done()}
+            return ids | {os.path.basename(build_dir) for build_dir in self._builds}
+
+    def _mark_finished(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job['finished'] = time.time()
+
+    def get(self, job_id):
+        """返回任务的内部记录，不存在时为 None"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """任务状态
+
+        返回:
+            dict | None: {"job_id", "state", "progress", "error", "created", "finished"}，
+                         state 为 queued / running / done / failed，任务不存在时为 None
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        future = job['future']
+        progress = read_progress(job['progress_file'])
+        error = None
+        if not future.done():
+            state = 'running' if progress else 'queued'
+        elif future.cancelled():
+            state, error = 'failed', '任务已取消'
+        elif future.exception() is not None:
+            state, error = 'failed', str(future.exception())
+        elif future.result() and os.path.exists(job['output_file']):
+            state = 'done'
+        else:
+            state, error = 'failed', 'GDS文件生成失败'
+        return {
+            'job_id': job_id,
+            'state': state,
+            'progress': progress,
+            'error': error,
+            'created': job['created'],
+            'finished': job['finished'],
+        }
+
+    def prune(self, max_age):
+        """忘记完成超过 max_age 秒的任务（构建目录由调用方清理）"""
+        now = time.time()
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job['finished'] is not None and now - job['finished'] > max_age]:
+                del self._jobs[job_id]
+
+    def stats(self):
+        """队列统计: workers, queue_depth, active, jobs"""
+        with self._lock:
+            return {'workers': self.workers, 'queue_depth': self.queue_depth,
+                    'active': self._active(), 'jobs': len(self._jobs)}
+
+    def shutdown(self, wait=True):
+        """关闭进程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -11,6 +11,8 @@ import argparse
 import importlib
 import json
 import logging
+import multiprocessing
+import os
 import sys
 import time
 from dataclasses import dataclass
@@ -289,6 +291,9 @@ def main(argv: Optional[list[str]] = None) -> int:
             parser.error(str(exc))
 
     options = _merge_options(args, config, config_path)
+    if config_path is not None:
+        # web_gui.app 导入时从这里读取任务队列和结果缓存的配置
+        os.environ["SUMMER_GDS_WEBGUI_CONFIG"] = str(config_path)
 
     if options.headless_max_secs is not None and options.headless_max_secs <= 0:
         parser.error("--headless-exit-seconds 需为正数")
@@ -307,4 +312,6 @@ def main(argv: Optional[list[str]] = None) -> int:
 
 
 if __name__ == "__main__":
+    # 打包后任务进程池的工作进程会重新执行启动器，先转入工作进程的入口
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -0,0 +1,286 @@
+"""生成结果的磁盘缓存
+
+相同的配置（去掉 _metadata 等不影响生成的字段后）直接返回上次生成的文件，不重新构建。
+缓存项以规范化配置的 SHA-256 为键，按字节预算淘汰最久未使用的项。
+"""
+
+import copy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import klayout
+from gds_utils.layout_cache import file_digest
+
+DEFAULT_CACHE_MB = 256
+META_FILE = 'meta.json'
+# 生成逻辑变化导致相同配置的输出不同时递增，使旧缓存失效
+CACHE_VERSION = 1
+
+
+def load_cache_settings(config_path):
+    """从 Web GUI 配置文件读取结果缓存容量
+
+    参数:
+        config_path: config/webgui_client_config.json 路径，不存在时使用默认值
+
+    返回:
+        int: 容量（字节），0 表示关闭
+    """
+    config = {}
+    if config_path and os.path.exists(config_path):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    return int(float(config.get('result_cache_mb', DEFAULT_CACHE_MB)) * 1024 * 1024)
+
+
+def _strip_metadata(value):
+    if isinstance(value, dict):
+        return {k: _strip_metadata(v) for k, v in value.items() if k != '_metadata'}
+    if isinstance(value, list):
+        return [_strip_metadata(v) for v in value]
+    return value
+
+
+def canonical_config(config_data):
+    """去掉不影响生成结果的字段
+
+    - 所有层级的 _metadata（前端记录的来源和时间戳）
+    - gds.output_file 与 layer_mapping.file 的目录部分（Web 服务只使用文件名）
+    """
+    config = _strip_metadata(copy.deepcopy(config_data or {}))
+    gds_config = config.get('gds') or {}
+    if gds_config.get('output_file'):
+        gds_config['output_file'] = os.path.basename(gds_config['output_file'])
+    layer_mapping = (config.get('global') or {}).get('layer_mapping')
+    if isinstance(layer_mapping, dict) and layer_mapping.get('file'):
+        layer_mapping['file'] = os.path.basename(layer_mapping['file'])
+    return config
+
+
+def _input_files(config):
+    """配置引用的外部文件: gds.input_file 与各形状的 vertices_file"""
+    files = []
+    input_file = (config.get('gds') or {}).get('input_file')
+    if input_file:
+        files.append(input_file)
+    for shape in config.get('shapes') or []:
+        file_config = shape.get('vertices_file') if isinstance(shape, dict) else None
+        if isinstance(file_config, dict):
+            file_config = file_config.get('path')
+        if file_config:
+            files.append(file_config)
+    return files
+
+
+def config_cache_key(config_data, options, base_dir):
+    """计算请求的缓存键
+
+    参数:
+        config_data: 请求中的配置
+        options: 影响输出的请求选项（输出格式、gzip、是否统计）
+        base_dir: 配置中相对路径的基准目录
+
+    返回:
+        str | None: SHA-256 十六进制串；引用的外部文件不存在时返回 None（不缓存）
+    """
+    config = canonical_config(config_data)
+    inputs = {}
+    for path in _input_files(config):
+        full_path = os.path.join(base_dir, os.path.expanduser(str(path)))
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        # 外部文件按 (大小, 修改时间) 识别，文件被修改后缓存自然失效
+        inputs[str(path)] = [os.path.abspath(full_path), stat.st_size, stat.st_mtime_ns]
+    payload = {
+        'version': CACHE_VERSION,
+        'klayout': klayout.__version__,
+        'config': config,
+        'options': options,
+        'inputs': inputs,
+    }
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """生成结果的磁盘 LRU 缓存
+
+    每个缓存项是 directory/<key>/ 目录，包含输出文件、附带文件（如统计报告）和 meta.json。
+    写入时先在临时目录中准备好再整体改名，读取方不会看到不完整的缓存项。
+    响应体在返回后才读取文件，发送期间用 get/put 的 pin=True 固定缓存项，淘汰时跳过，release 之后再淘汰。
+    """
+
+    def __init__(self, directory, max_bytes):
+        """初始化缓存并加载磁盘上已有的缓存项
+
+        参数:
+            directory: 缓存目录
+            max_bytes: 容量（字节）
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> meta
+        self._pins = {}  # key -> 正在使用的次数
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        found = []
+        for key in os.listdir(self.directory):
+            meta_file = os.path.join(self.directory, key, META_FILE)
+            try:
+                with open(meta_file, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                found.append((os.path.getmtime(meta_file), key, meta))
+            except (OSError, ValueError):
+                # 不完整的缓存项（例如写入时进程退出）
+                shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+        for _, key, meta in sorted(found):
+            self._entries[key] = meta
+            self.current_bytes += meta['bytes']
+        self._evict()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.directory, key)
+
+    def _entry(self, key, meta):
+        entry_dir = self._entry_dir(key)
+        return {
+            'output_file': os.path.join(entry_dir, meta['filename']),
+            'filename': meta['filename'],
+            'etag': meta['etag'],
+            'files': {name: os.path.join(entry_dir, name) for name in meta['files']},
+        }
+
+    def get(self, key, pin=False):
+        """查找缓存项
+
+        参数:
+            key: 缓存键
+            pin: 命中时固定缓存项，用完后调用 release(key)
+
+        返回:
+            dict | None: {"output_file", "filename", "etag", "files": {名称: 路径}}，未命中为 None
+        """
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if pin:
+                self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            os.utime(os.path.join(self._entry_dir(key), META_FILE))  # 重启后按最近使用时间恢复 LRU 顺序
+        except OSError:
+            pass
+        return self._entry(key, meta)
+
+    def put(self, key, output_file, extra_files=(), pin=False):
+        """把生成结果加入缓存
+
+        参数:
+            key: 缓存键
+            output_file: 输出文件
+            extra_files: 附带文件路径（不存在的忽略）
+            pin: 加入后固定缓存项（同 get）
+
+        返回:
+            dict | None: 与 get() 相同的缓存项；结果超过容量时不缓存，返回 None
+        """
+        files = [path for path in extra_files if os.path.exists(path)]
+        nbytes = os.path.getsize(output_file) + sum(os.path.getsize(path) for path in files)
+        if nbytes > self.max_bytes:
+            return None
+
+        # 复制和计算哈希在锁外完成，准备好后整体改名
+        temp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+        try:
+            filename = os.path.basename(output_file)
+            shutil.copyfile(output_file, os.path.join(temp_dir, filename))
+            for path in files:
+                shutil.copyfile(path, os.path.join(temp_dir, os.path.basename(path)))
+            meta = {
+                'filename': filename,
+                'etag': file_digest(output_file),
+                'files': [os.path.basename(path) for path in files],
+                'bytes': nbytes,
+                'created': time.time(),
+            }
+            with open(os.path.join(temp_dir, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            with self._lock:
+                existing = self._entries.get(key)
+                if existing is None:
+                    os.replace(temp_dir, self._entry_dir(key))
+                    self._entries[key] = meta
+                    self.current_bytes += nbytes
+                    self._evict(keep=key)
+                else:
+                    meta = existing  # 相同请求并发生成，保留先写入的结果
+                if pin:
+                    self._pins[key] = self._pins.get(key, 0) + 1
+                return self._entry(key, meta)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def put_bytes(self, key, filename, data):
+        """把内存中的结果（例如渲染好的预览图）加入缓存，参数和返回值同 put"""
+        with tempfile.TemporaryDirectory(prefix='.tmp-', dir=self.directory) as temp_dir:
+            path = os.path.join(temp_dir, filename)
+            with open(path, 'wb') as f:
+                f.write(data)
+            return self.put(key, path)
+
+    def release(self, key):
+        """解除 get/put 的固定，超出容量时淘汰之前被跳过的缓存项"""
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+                return
+            self._pins.pop(key, None)
+            self._evict()
+
+    def _evict(self, keep=None):
+        # 按最久未使用的顺序淘汰，跳过正在发送的缓存项（暂时超出容量，release 时再淘汰）
+        for key in list(self._entries):
+            if self.current_bytes <= self.max_bytes:
+                break
+            if key == keep or key in self._pins:
+                continue
+            meta = self._entries.pop(key)
+            self.current_bytes -= meta['bytes']
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for key in list(self._entries):
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """缓存统计: entries, bytes, max_bytes, hits, misses"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
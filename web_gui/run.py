@@ -9,6 +9,7 @@ import os
 import sys
 import json
 import argparse
+import multiprocessing
 import webbrowser
 import threading
 import time
@@ -67,7 +68,9 @@ def main():
             if auto_open is not None and not has_flag('--no-browser'):
                 args.no_browser = not bool(auto_open)
 
-    # 导入应用
+    # 导入应用；--config 指定的文件同时作为任务队列和结果缓存的配置（app 导入时读取）
+    if config_data is not None:
+        os.environ['SUMMER_GDS_WEBGUI_CONFIG'] = os.path.abspath(args.config)
     from app import app
 
     # 启动浏览器(除非禁用)
@@ -84,6 +87,9 @@ def main():
     app.run(host=args.host, port=args.port, debug=args.debug)
 
 if __name__ == '__main__':
+    # 打包环境中任务进程池（spawn）启动的工作进程会重新执行本程序，需要在这里转入工作进程的入口
+    multiprocessing.freeze_support()
+
     # 添加当前目录到路径
     sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
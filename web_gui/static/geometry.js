@@ -0,0 +1,61 @@
+// 二进制几何解码与绘制（/api/geometry，格式见 gds_utils/geometry.py）
+// 坐标和偏移表直接作为 ArrayBuffer 上的 TypedArray 视图使用，不复制、不解析 JSON
+window.GeometryDecoder = {
+
+    MAGIC: 'SGEO',
+    VERSION: 1,
+    COORD_ARRAYS: { 1: Int32Array, 2: Float32Array },
+
+    // 解码 ArrayBuffer，返回 { origin: [x, y], scale, layers: [{ layer, datatype, offsets, coords }] }
+    // 第 i 个多边形的顶点为 coords[2k], coords[2k + 1]（k 从 offsets[i] 到 offsets[i + 1] - 1），
+    // 微米坐标 = origin + 存储值 * scale
+    decode(buffer) {
+        const view = new DataView(buffer);
+        const magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+        if (magic !== this.MAGIC || view.getUint16(4, true) !== this.VERSION) {
+            throw new Error('不是可识别的几何数据');
+        }
+        const CoordArray = this.COORD_ARRAYS[view.getUint8(6)];
+        const layerCount = view.getUint32(8, true);
+        const result = {
+            origin: [view.getFloat64(16, true), view.getFloat64(24, true)],
+            scale: view.getFloat64(32, true),
+            layers: []
+        };
+        let position = 40;
+        for (let i = 0; i < layerCount; i++) {
+            const polygonCount = view.getUint32(position + 8, true);
+            const pointCount = view.getUint32(position + 12, true);
+            const layer = {
+                layer: view.getUint32(position, true),
+                datatype: view.getUint32(position + 4, true),
+                offsets: new Uint32Array(buffer, position + 16, polygonCount + 1),
+                coords: null
+            };
+            position += 16 + (polygonCount + 1) * 4;
+            layer.coords = new CoordArray(buffer, position, pointCount * 2);
+            position += pointCount * 8;
+            result.layers.push(layer);
+        }
+        return result;
+    },
+
+    // 在 canvas 上绘制一个图层，transform 为 { scale: 像素/微米, x: 原点的屏幕 x, y: 原点的屏幕 y }（y 轴向上）
+    drawLayer(ctx, geometry, layer, transform, fillStyle) {
+        const k = geometry.scale * transform.scale;
+        const ox = transform.x + geometry.origin[0] * transform.scale;
+        const oy = transform.y - geometry.origin[1] * transform.scale;
+        const { offsets, coords } = layer;
+        ctx.beginPath();
+        for (let i = 0; i + 1 < offsets.length; i++) {
+            const start = offsets[i], end = offsets[i + 1];
+            ctx.moveTo(ox + coords[2 * start] * k, oy - coords[2 * start + 1] * k);
+            for (let j = start + 1; j < end; j++) {
+                ctx.lineTo(ox + coords[2 * j] * k, oy - coords[2 * j + 1] * k);
+            }
+            ctx.closePath();
+        }
+        ctx.fillStyle = fillStyle;
+        ctx.fill('nonzero');
+    }
+};
@@ -10,8 +10,7 @@ let config = {
             precision: 0.01
         },
         layer_mapping: {
-            save: true,
-            file: "layer_mapping.txt"
+            save: true
         }
     },
     gds: {
@@ -689,6 +688,15 @@ function updateJSONFromForm() {
                     generated_at: new Date().toISOString(),
                     version: '1.0'
                 };
+
+                // 由后端生成器生成顶点；vertices 只留在页面内供联动系统和预览使用，发送请求前去掉（见 requestPayload）
+                shape.vertices_gen = {
+                    shape_type: 'circle',
+                    center_x: centerX,
+                    center_y: centerY,
+                    radius: radius,
+                    segments: segments
+                };
             } else {
                 // 如果不是圆形，标记为顶点源
                 shape._metadata = {
@@ -895,6 +903,18 @@ function handleFileUpload(event) {
     });
 }
 
+// 生成/验证请求的配置: 有 vertices_gen 的形状由后端生成顶点，不再发送展开后的 vertices
+function requestPayload(config) {
+    return {
+        ...config,
+        shapes: (config.shapes || []).map(shape => {
+            if (!shape.vertices_gen) return shape;
+            const { vertices, ...rest } = shape;
+            return rest;
+        })
+    };
+}
+
 // 验证配置
 function validateConfig() {
     // 显示加载提示
@@ -906,14 +926,16 @@ function validateConfig() {
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify(config)
+        body: JSON.stringify(requestPayload(config))
     })
     .then(response => response.json())
     .then(data => {
-        if (data.valid) {
+        if (data.valid && data.warnings && data.warnings.length) {
+            showAlert(`配置验证通过，但有警告: ${data.warnings.join('; ')}`, 'warning');
+        } else if (data.valid) {
             showAlert('配置验证通过', 'success');
         } else {
-            showAlert(`配置验证失败: ${data.errors.join(', ')}`, 'danger');
+            showAlert(`配置验证失败: ${data.errors.join('; ')}`, 'danger');
         }
     })
     .catch(error => {
@@ -932,7 +954,7 @@ function generateGDS() {
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify(config)
+        body: JSON.stringify(requestPayload(config))
     })
     .then(response => {
         // 检查响应状态
@@ -0,0 +1,80 @@
+"""分块流式返回生成结果
+
+输出文件按固定大小的块读取并发送，不把整个文件读入内存；可选在发送时 gzip 压缩。
+Range 请求只支持单个字节区间，多区间或其他单位按整体返回处理（HTTP 允许忽略 Range）。
+"""
+
+import os
+import zlib
+from werkzeug.http import parse_range_header
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 MiB
+GZIP_LEVEL = 6
+GZIP_ETAG_SUFFIX = '-gz'
+
+
+class RangeNotSatisfiable(ValueError):
+    """请求的字节区间超出文件长度"""
+
+
+def byte_range(header, size):
+    """解析 Range 请求头
+
+    参数:
+        header: Range 请求头，None 或空串表示没有 Range
+        size: 文件长度（字节）
+
+    返回:
+        tuple | None: (start, stop) 半开区间；没有 Range、格式无法识别或多区间时返回 None（整体返回）
+
+    异常:
+        RangeNotSatisfiable: 单个字节区间的起点超出文件长度
+    """
+    if not header:
+        return None
+    parsed = parse_range_header(header)
+    if parsed is None or parsed.units != 'bytes' or len(parsed.ranges) != 1:
+        return None
+    result = parsed.range_for_length(size)
+    if result is None:
+        raise RangeNotSatisfiable(f"请求的区间 {header} 超出文件长度 {size}")
+    return result
+
+
+def iter_file(path, start=0, stop=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """按块读取文件的 [start, stop) 部分
+
+    参数:
+        path: 文件路径（迭代开始时才打开）
+        start, stop: 字节区间，stop 为 None 时读到文件末尾
+        chunk_size: 块大小（字节）
+    """
+    with open(path, 'rb') as f:
+        if stop is None:
+            stop = os.fstat(f.fileno()).st_size
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def iter_gzip(chunks, level=GZIP_LEVEL):
+    """把字节块流压缩为 gzip 格式，内存中只保留压缩器的窗口"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encoded_etag(etag):
+    """gzip 编码响应的 ETag
+
+    压缩后的字节与原文件不同，Range / If-Range 的偏移也不同，两种编码不能共用同一个强 ETag。
+    """
+    return f"{etag}{GZIP_ETAG_SUFFIX}" if etag else etag